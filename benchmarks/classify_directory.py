@@ -0,0 +1,32 @@
+"""
+Classifies every CSV / XLSX file of a directory from its header region
+(services.document_identifier.classify_directory) and reports the time taken.
+
+Usage:
+    python -m benchmarks.classify_directory <directory> [--workers 8]
+"""
+import argparse
+import os
+import time
+
+from services.document_identifier import classify_directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Header-only classification of a directory")
+    parser.add_argument("directory", help="Directory of CSV / XLSX files (not recursive)")
+    parser.add_argument("--workers", type=int, default=None, help="Threads reading the headers")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = classify_directory(args.directory, max_workers=args.workers)
+    seconds = time.perf_counter() - start
+
+    for path, result in results.items():
+        print(f"{os.path.basename(path)}: {result['document_type']} {result.get('confidence', '')}")
+    print(f"files:           {len(results):,}")
+    print(f"classified in:   {seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
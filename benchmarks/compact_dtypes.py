@@ -0,0 +1,60 @@
+"""
+Reports GL frame memory with and without compact dtypes, and the exactness of
+integer minor-unit totals.
+
+Usage:
+    python -m benchmarks.compact_dtypes [--rows 1000000]
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from readers.compact import compact_gl_frame
+
+
+def make_canonical_gl_frame(n_rows, seed=0):
+    """Builds a frame shaped like read_gl_excel_dynamic's output (text columns as strings)."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01", periods=300).strftime("%Y-%m-%d %H:%M:%S").to_numpy()
+    cents = rng.integers(-500_000, 500_000, n_rows)
+    amounts = cents / 100
+    df = pd.DataFrame({
+        "Account": rng.choice([f"Account {i}" for i in range(200)], n_rows),
+        "Date": rng.choice(dates, n_rows),
+        "Transaction Type": rng.choice(["Invoice", "Bill", "Journal Entry", "Payment", "Deposit"], n_rows),
+        "#": rng.integers(0, 100_000, n_rows).astype(str),
+        "Name": rng.choice([f"Vendor {i}" for i in range(2000)], n_rows),
+        "Memo/Description": np.char.add("Invoice ", rng.integers(0, 500_000, n_rows).astype(str)),
+        "Split": rng.choice(["Accounts Receivable", "Accounts Payable", "Checking"], n_rows),
+        "Amount": amounts.astype(str),
+        "Balance": np.cumsum(amounts),
+    })
+    df["parsed_date"] = pd.to_datetime(df["Date"])
+    df["parsed_amount"] = amounts
+    return df, int(cents.sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact dtype memory report")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of synthetic GL rows")
+    args = parser.parse_args()
+
+    df, exact_total = make_canonical_gl_frame(args.rows)
+    before = df.memory_usage(deep=True).sum()
+    float_total = df["parsed_amount"].sum()
+
+    compact = compact_gl_frame(df.copy())
+    after = compact.memory_usage(deep=True).sum()
+    minor_total = int(compact["amount_minor"].sum())
+
+    print(f"rows:                {args.rows:,}")
+    print(f"object/float64:      {before / 2**20:8.1f} MiB ({before / args.rows:.0f} bytes/row)")
+    print(f"compact:             {after / 2**20:8.1f} MiB ({after / args.rows:.0f} bytes/row)")
+    print(f"reduction:           {before / after:.1f}x")
+    print(f"float64 total:       {float_total!r} (off by {abs(float_total * 100 - exact_total):.6f} cents)")
+    print(f"minor-unit total:    {minor_total / 100:.2f} (exact: {minor_total == exact_total})")
+
+
+if __name__ == "__main__":
+    main()
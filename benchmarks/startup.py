@@ -0,0 +1,135 @@
+"""
+Checks the startup-time budget of the short-lived entry points: the CLI's
+--help and the CSV paths (classification and row-based validation).
+
+Each command runs in a fresh interpreter several times; the median time above
+a bare `python -c pass` is compared with its budget, and the heavy libraries
+the command must not import are checked. Exits with status 1 when a budget is
+exceeded or a forbidden library was loaded.
+
+Usage:
+    python -m benchmarks.startup [--runs 7] [--out startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Median seconds above the bare interpreter start allowed per command
+STARTUP_BUDGETS = {
+    "main.py --help": 0.25,
+    "classify_file[csv]": 0.25,
+    "validate_upload[csv]": 0.5,
+}
+
+# Libraries each command must not import (numpy backs the row validators' findings)
+FORBIDDEN_MODULES = {
+    "main.py --help": ["pandas", "numpy", "openpyxl", "pyarrow"],
+    "classify_file[csv]": ["pandas", "numpy", "openpyxl", "pyarrow"],
+    "validate_upload[csv]": ["pandas", "openpyxl", "pyarrow"],
+}
+
+DEFAULT_RUNS = 7
+
+# Prints the loaded heavy modules as JSON on stderr once the command is done
+_REPORT_MODULES = (
+    "import atexit, json, sys\n"
+    "atexit.register(lambda: sys.stderr.write('\\nMODULES ' + json.dumps(sorted(m for m in "
+    "('pandas', 'numpy', 'openpyxl', 'pyarrow') if m in sys.modules)) + '\\n'))\n"
+)
+
+
+def _csv_file(directory):
+    path = os.path.join(directory, "startup_gl.csv")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("Date,Account,Description,Amount\n")
+        for i in range(200):
+            f.write(f"2024-01-{i % 28 + 1:02d},Cash,Invoice {i},{i * 1.5:.2f}\n")
+    return path
+
+
+def startup_commands(csv_path):
+    """
+    Python source run by each command, in a fresh interpreter from the repository root.
+    """
+    return {
+        "main.py --help": (
+            "import sys; sys.argv = ['main.py', '--help']\n"
+            "import runpy\n"
+            "try:\n"
+            "    runpy.run_path('main.py', run_name='__main__')\n"
+            "except SystemExit:\n"
+            "    pass\n"
+        ),
+        "classify_file[csv]": (
+            "from services.document_identifier import classify_file\n"
+            f"classify_file({csv_path!r})\n"
+        ),
+        "validate_upload[csv]": (
+            "from services.validation import validate_upload\n"
+            f"validate_upload({csv_path!r})\n"
+        ),
+    }
+
+
+def time_command(source, runs=DEFAULT_RUNS):
+    """
+    Runs `source` in `runs` fresh interpreters.
+
+    Returns:
+        (median seconds, heavy modules loaded by the last run)
+    """
+    times, modules = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-c", _REPORT_MODULES + source], cwd=REPO_ROOT,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        times.append(time.perf_counter() - start)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Command failed:\n{source}\n{completed.stderr}")
+        marker = completed.stderr.rsplit("MODULES ", 1)
+        modules = json.loads(marker[1]) if len(marker) == 2 else []
+    return statistics.median(times), modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup-time budget check")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Interpreter starts per command")
+    parser.add_argument("--out", help="Optional JSON file receiving the measurements")
+    args = parser.parse_args()
+
+    baseline, _ = time_command("pass", args.runs)
+    print(f"{'bare interpreter':<24} {baseline:7.3f}s")
+    failures, records = [], []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, source in startup_commands(_csv_file(directory)).items():
+            seconds, modules = time_command(source, args.runs)
+            overhead = seconds - baseline
+            forbidden = [m for m in modules if m in FORBIDDEN_MODULES[name]]
+            print(f"{name:<24} {seconds:7.3f}s (+{overhead:.3f}s, budget {STARTUP_BUDGETS[name]:.3f}s)"
+                  + (f" imported {', '.join(forbidden)}" if forbidden else ""))
+            records.append({"command": name, "seconds": seconds, "overhead_seconds": overhead,
+                            "budget_seconds": STARTUP_BUDGETS[name], "heavy_modules": modules})
+            if overhead > STARTUP_BUDGETS[name]:
+                failures.append(f"{name}: {overhead:.3f}s over the interpreter start "
+                                f"(budget {STARTUP_BUDGETS[name]:.3f}s)")
+            if forbidden:
+                failures.append(f"{name}: imported {', '.join(forbidden)}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"runs": args.runs, "interpreter_seconds": baseline, "results": records}, f, indent=2)
+    for message in failures:
+        print(f"OVER BUDGET: {message}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
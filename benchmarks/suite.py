@@ -0,0 +1,202 @@
+"""
+Times and memory-profiles the readers, validators, document identification and
+the HTML report on synthetic ledgers (see benchmarks.synthetic_ledgers), and
+saves the numbers as JSON. Given an earlier JSON file as baseline, exits with
+status 1 if any case got slower or hungrier beyond the tolerance.
+
+Usage:
+    python -m benchmarks.suite [--sizes 1k 10k 100k] [--out bench.json]
+                               [--baseline old.json] [--tolerance 0.25]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from benchmarks.synthetic_ledgers import ensure_ledger, GENERATOR_VERSION
+from readers.csv_reader import iter_csv_rows
+from readers.gl_reader import read_gl_excel_dynamic
+from readers.monthly_tb_reader import read_monthly_tb_excel_dynamic
+from readers.single_tb_reader import read_single_tb_excel_dynamic
+from report import generate_html_report
+from services.document_identifier import identify_document_type, classify_file
+from validators.general_ledger_validator import validate_gl
+from validators.trial_balance_validator import validate_trial_balance
+
+# Bump whenever the cases or the measurements change meaning (results are only
+# compared with a baseline of the same version)
+SUITE_VERSION = 1
+
+DEFAULT_SIZES = ["1k", "10k", "100k"]
+DEFAULT_REPEAT = 3
+
+# Relative slowdown / memory growth over the baseline reported as a regression...
+DEFAULT_TOLERANCE = 0.25
+# ...ignoring differences below these floors (timer and allocator noise)
+MIN_SECONDS_DELTA = 0.05
+MIN_PEAK_MIB_DELTA = 1.0
+
+_SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_size(text):
+    """'1k' -> 1000, '5M' -> 5000000, '250' -> 250."""
+    text = str(text).strip().lower().replace("_", "")
+    if text and text[-1] in _SIZE_SUFFIXES:
+        return int(float(text[:-1]) * _SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def measure(func, repeat=DEFAULT_REPEAT, memory=True):
+    """
+    Runs func() `repeat` times for timing, then once more under tracemalloc.
+
+    Returns:
+        (result, {"seconds", "cpu_seconds", "peak_mib"}): the best wall and CPU
+        time of the timed runs and the peak traced allocation (None without memory).
+    """
+    walls, cpus, result = [], [], None
+    for _ in range(max(repeat, 1)):
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = func()
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+
+    peak = None
+    if memory:
+        # A separate run: tracing slows the code down, so it is not timed
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return result, {"seconds": min(walls), "cpu_seconds": min(cpus), "peak_mib": peak}
+
+
+def synthetic_results(n_messages):
+    """Validation results with `n_messages` row-level findings, for the report cases."""
+    errors = [f"Row {i + 1}: Invalid date format '2024-13-45'." for i in range(n_messages // 2)]
+    warnings = [f"Row {i + 1}: Empty Memo/Description." for i in range(n_messages - len(errors))]
+    return {"gl.xlsx": {"errors": errors, "warnings": warnings},
+            "tb.xlsx": {"errors": ["Trial Balance is out of balance by 0.01."], "warnings": []}}
+
+
+def run_size(rows, data_dir, seed=0, repeat=DEFAULT_REPEAT, memory=True):
+    """
+    Runs every case on the synthetic files of one size.
+
+    Returns:
+        list: {"case", "rows", "seconds", "cpu_seconds", "peak_mib"} per case.
+    """
+    records = []
+
+    def record(case, func):
+        result, numbers = measure(func, repeat, memory)
+        records.append({"case": case, "rows": rows, **numbers})
+        print(f"{case:<32} {rows:>10,} {numbers['seconds']:9.3f}s"
+              + (f" {numbers['peak_mib']:9.1f} MiB" if numbers["peak_mib"] is not None else ""), flush=True)
+        return result
+
+    single_path = ensure_ledger(data_dir, "single_tb", rows, seed)
+    monthly_path = ensure_ledger(data_dir, "monthly_tb", rows, seed)
+    gl_path = ensure_ledger(data_dir, "gl", rows, seed)
+    csv_path = ensure_ledger(data_dir, "gl_csv", rows, seed)
+
+    single = record("read_single_tb_excel_dynamic", lambda: read_single_tb_excel_dynamic(single_path))
+    monthly = record("read_monthly_tb_excel_dynamic", lambda: read_monthly_tb_excel_dynamic(monthly_path))
+    gl, parse_info = record("read_gl_excel_dynamic", lambda: read_gl_excel_dynamic(gl_path))
+
+    record("validate_trial_balance[single]", lambda: validate_trial_balance(single))
+    record("validate_trial_balance[monthly]", lambda: validate_trial_balance(monthly))
+    record("validate_gl", lambda: validate_gl(gl, parse_info=parse_info))
+
+    record("identify_document_type[csv]", lambda: identify_document_type(iter_csv_rows(csv_path)))
+    record("classify_file[xlsx]", lambda: classify_file(gl_path))
+
+    results = synthetic_results(rows)
+    record("generate_html_report", lambda: generate_html_report(results))
+    return records
+
+
+def compare(records, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Lists the (case, rows) whose time or peak memory grew by more than
+    `tolerance` (relative) over the baseline records.
+
+    Returns:
+        list: one message per regression.
+    """
+    previous = {(r["case"], r["rows"]): r for r in baseline}
+    regressions = []
+    for r in records:
+        old = previous.get((r["case"], r["rows"]))
+        if old is None:
+            continue
+        for field, unit, floor in (("seconds", "s", MIN_SECONDS_DELTA), ("peak_mib", " MiB", MIN_PEAK_MIB_DELTA)):
+            if r.get(field) is None or old.get(field) is None:
+                continue
+            if r[field] > old[field] * (1 + tolerance) and r[field] - old[field] > floor:
+                regressions.append(f"{r['case']} ({r['rows']:,} rows): {field} {old[field]:.3f}{unit} -> "
+                                   f"{r[field]:.3f}{unit} (+{(r[field] / old[field] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reader / validator / report benchmark suite")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES,
+                        help="Row counts to run (suffixes k and M allowed, e.g. 1k 100k 5M)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per case (the best is kept)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic ledgers")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "financial_validation_benchmarks"),
+                        help="Directory the generated ledgers are kept in between runs")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run of each case")
+    parser.add_argument("--out", default="benchmark_results.json", help="JSON file receiving the results")
+    parser.add_argument("--baseline", help="Earlier results JSON; exit with status 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative time / memory growth over the baseline treated as a regression")
+    args = parser.parse_args()
+
+    records = []
+    for size in args.sizes:
+        records.extend(run_size(parse_size(size), args.data_dir, args.seed, args.repeat, not args.no_memory))
+
+    output = {
+        "suite_version": SUITE_VERSION,
+        "generator_version": GENERATOR_VERSION,
+        "seed": args.seed,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "libraries": {"pandas": pd.__version__, "numpy": np.__version__, "openpyxl": openpyxl.__version__},
+        "results": records,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if (baseline.get("suite_version"), baseline.get("generator_version"), baseline.get("seed")) != \
+                (SUITE_VERSION, GENERATOR_VERSION, args.seed):
+            sys.exit(f"{args.baseline} was produced by another suite / generator version or seed; not comparable.")
+        regressions = compare(records, baseline["results"], args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION: {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Deterministic synthetic ledgers shaped like the exports the readers expect:
+title rows above the header, QuickBooks-style GL sections, the 2-row
+month / Debit-Credit header of the wide monthly TB, and a sprinkling of bad
+cells so the validators' error paths are exercised too.
+
+The same (kind, rows, seed) always produces the same workbook, so timings
+taken on different versions of the code read identical input.
+
+Usage:
+    python -m benchmarks.synthetic_ledgers gl 100000 gl.xlsx [--seed 0]
+"""
+import argparse
+import csv
+import datetime
+import os
+
+import numpy as np
+from openpyxl import Workbook
+
+# Bump whenever the generated content changes, so stored files are regenerated
+GENERATOR_VERSION = 1
+
+# Share of GL rows with an unparseable date or amount
+BAD_CELL_RATE = 0.002
+
+# Months (Debit/Credit column pairs) of the wide monthly TB; its size is accounts x months
+MONTHLY_TB_MONTHS = 24
+
+# GL rows per account section (a section header above, a total row below)
+GL_ROWS_PER_ACCOUNT = 5000
+
+GL_HEADER = [None, "Date", "Transaction Type", "Num", "Name", "Memo/Description", "Split", "Amount", "Balance"]
+_TRANSACTION_TYPES = np.array(["Invoice", "Bill", "Journal Entry", "Payment", "Deposit"], dtype=object)
+_SPLITS = np.array(["Accounts Receivable", "Accounts Payable", "Checking", "Undeposited Funds"], dtype=object)
+
+
+def _title_rows(ws, title):
+    # Junk above the header, as in real exports
+    ws.append(["ACME Holdings Ltd."])
+    ws.append([title])
+    ws.append(["Generated by the benchmark suite"])
+    ws.append([])
+
+
+def _balanced_amounts(rng, n_accounts):
+    """Debit/credit pairs that balance: account 2k is debited what 2k+1 is credited."""
+    amounts = np.round(rng.uniform(1, 50_000, (n_accounts + 1) // 2), 2)
+    return np.repeat(amounts, 2)[:n_accounts]
+
+
+def write_single_tb(path, rows, seed=0):
+    """
+    Writes a single TB of `rows` accounts (Account / Debit / Credit) that balances
+    when `rows` is even.
+    """
+    rng = np.random.default_rng(seed)
+    amounts = _balanced_amounts(rng, rows)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Trial Balance")
+    _title_rows(ws, "Trial Balance")
+    ws.append(["Account", "Debit", "Credit"])
+    for i in range(rows):
+        amount = float(amounts[i])
+        ws.append([f"{10000 + i} Account {i}", amount if i % 2 == 0 else None, amount if i % 2 else None])
+    wb.save(path)
+
+
+def write_monthly_tb(path, rows, seed=0, months=MONTHLY_TB_MONTHS):
+    """
+    Writes a wide monthly TB of about `rows` account-months: rows // months
+    accounts (rounded down to an even number, so every month balances), each
+    with a Debit/Credit pair under every month header.
+    """
+    rng = np.random.default_rng(seed)
+    n_accounts = max(rows // months // 2 * 2, 2)
+    labels = [datetime.date(2023 + m // 12, m % 12 + 1, 1).strftime("%b. %Y") for m in range(months)]
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Monthly TB")
+    _title_rows(ws, "Trial Balance by Month")
+    ws.append([None] + [cell for label in labels for cell in (label, None)])
+    ws.append(["Account"] + ["Debit", "Credit"] * months)
+    amounts = np.stack([_balanced_amounts(rng, n_accounts) for _ in range(months)], axis=1)
+    for i in range(n_accounts):
+        row = [f"{10000 + i} Account {i}"]
+        for amount in amounts[i].tolist():
+            row += [amount, None] if i % 2 == 0 else [None, amount]
+        ws.append(row)
+    wb.save(path)
+
+
+def gl_rows(rows, seed=0):
+    """
+    Yields the sheet rows of a GL with `rows` transactions: per account a
+    section header, its transactions with a running balance, and a total row.
+    About BAD_CELL_RATE of the transactions get a bad date or amount.
+    """
+    rng = np.random.default_rng(seed)
+    start = datetime.datetime(2024, 1, 1)
+    days = rng.integers(0, 365, rows)
+    amounts = np.round(rng.uniform(-5000, 5000, rows), 2)
+    types = _TRANSACTION_TYPES[rng.integers(0, len(_TRANSACTION_TYPES), rows)]
+    splits = _SPLITS[rng.integers(0, len(_SPLITS), rows)]
+    names = rng.integers(0, 2000, rows)
+    bad = rng.random(rows) < BAD_CELL_RATE
+    bad_amount = bad & (rng.random(rows) < 0.5)
+
+    for first in range(0, rows, GL_ROWS_PER_ACCOUNT):
+        account = f"{40000 + first // GL_ROWS_PER_ACCOUNT} Account {first // GL_ROWS_PER_ACCOUNT}"
+        yield [account]
+        balance = 0.0
+        # Dates are sorted within a section, as the exports list them
+        section = range(first, min(first + GL_ROWS_PER_ACCOUNT, rows))
+        for i, day in zip(section, np.sort(days[first:first + len(section)]).tolist()):
+            amount = float(amounts[i])
+            if not bad_amount[i]:
+                balance = round(balance + amount, 2)
+            yield [
+                None,
+                "2024-13-45" if bad[i] and not bad_amount[i] else start + datetime.timedelta(days=day),
+                types[i],
+                str(100000 + i),
+                f"Vendor {names[i]}",
+                f"Invoice {100000 + i}",
+                splits[i],
+                "n/a" if bad_amount[i] else amount,
+                balance,
+            ]
+        yield [f"Total for {account}", None, None, None, None, None, None, balance]
+
+
+def write_gl(path, rows, seed=0):
+    """Writes a QuickBooks-style GL workbook of `rows` transactions (see gl_rows)."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("General Ledger")
+    _title_rows(ws, "General Ledger")
+    ws.append(GL_HEADER)
+    for row in gl_rows(rows, seed):
+        ws.append(row)
+    wb.save(path)
+
+
+def write_gl_csv(path, rows, seed=0):
+    """Writes the GL transactions as a flat CSV (header first, one account column)."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Account"] + GL_HEADER[1:])
+        account = None
+        for row in gl_rows(rows, seed):
+            if len(row) == 1:
+                account = row[0]
+            elif row[0] is None:
+                writer.writerow([account] + row[1:])
+
+
+# kind -> (writer, file extension)
+GENERATORS = {
+    "single_tb": (write_single_tb, ".xlsx"),
+    "monthly_tb": (write_monthly_tb, ".xlsx"),
+    "gl": (write_gl, ".xlsx"),
+    "gl_csv": (write_gl_csv, ".csv"),
+}
+
+
+def ensure_ledger(data_dir, kind, rows, seed=0):
+    """
+    Returns the path of the synthetic `kind` file of `rows` rows in `data_dir`,
+    generating it first if it is not there yet (files are reused across runs).
+    """
+    writer, extension = GENERATORS[kind]
+    path = os.path.join(data_dir, f"{kind}_{rows}_s{seed}_v{GENERATOR_VERSION}{extension}")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp{extension}"  # Written aside, so an interrupted run leaves no partial file
+        writer(tmp_path, rows, seed)
+        os.replace(tmp_path, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic ledger generator")
+    parser.add_argument("kind", choices=sorted(GENERATORS), help="Kind of file to generate")
+    parser.add_argument("rows", type=int, help="Number of rows (transactions, accounts or account-months)")
+    parser.add_argument("out", help="Output path")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+    GENERATORS[args.kind][0](args.out, args.rows, args.seed)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Deferred imports of the heavy libraries (pandas, numpy, openpyxl).
+
+Importing pandas alone takes most of a second, which every `--help`, every
+CSV classification and every short-lived worker would otherwise pay at
+startup. Modules bind these libraries with lazy_import() instead of `import`,
+and the real import happens on the first attribute access:
+
+    pd = lazy_import("pandas")   # nothing imported yet
+    pd.DataFrame(...)            # pandas is imported here
+"""
+import importlib
+
+
+class LazyModule:
+    """
+    Stands in for a module and imports it on first attribute access.
+
+    Attributes are cached on the instance, so later lookups cost a plain
+    attribute access. The import goes through importlib's module locks, so
+    concurrent first uses from several threads are safe.
+    """
+
+    def __init__(self, name):
+        self.__name = name
+
+    def __getattr__(self, attr):
+        value = getattr(importlib.import_module(self.__name), attr)
+        setattr(self, attr, value)
+        return value
+
+    def __repr__(self):
+        return f"<lazy module '{self.__name}'>"
+
+
+def lazy_import(name):
+    """
+    Returns a stand-in for module `name` that imports it when first used.
+    """
+    return LazyModule(name)
+
+
+def import_object(path):
+    """
+    Imports "package.module:attribute" and returns the attribute.
+    """
+    module_name, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
@@ -1,68 +1,180 @@
 import argparse
+import contextlib
+import datetime
+import json
 import os
+import sys
 
-from readers.single_tb_reader import read_single_tb_excel_dynamic
-from readers.monthly_tb_reader import read_monthly_tb_excel_dynamic
-from readers.gl_reader import read_gl_excel_dynamic
+from services.validation import validate_files
+from readers.cache import ParsedFileCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from readers.compact import DEFAULT_CURRENCY_PRECISION
+from report import write_html_report
+from services.reconciliation import reconcile_files, RECONCILIATION_THRESHOLD
+from services.duplicates import duplicate_files
+from validators.duplicate_validator import NEAR_DUPLICATE_DAYS
+from profiling import profiling, stage
 
-from validators.trial_balance_validator import validate_trial_balance
-from validators.general_ledger_validator import validate_gl
-from report import generate_html_report
+def serve(argv):
+    """
+    `main.py serve`: keeps warm worker processes and validates the files of
+    JSON-line jobs read from stdin or a Unix socket (see services.serve).
+    """
+    parser = argparse.ArgumentParser(prog="main.py serve",
+                                     description="Resident validation service (JSON lines in, JSON lines out)")
+    parser.add_argument("--socket", help="Unix socket path to listen on (default: read jobs from stdin)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Number of warm worker processes")
+    parser.add_argument("--no-cache", action="store_true", help="Always parse the Excel files, ignoring the cache")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Directory of the parsed-file cache")
+    parser.add_argument("--cache-size-mb", type=int, default=DEFAULT_MAX_BYTES // 1024 ** 2,
+                        help="Maximum size of the parsed-file cache (least recently used entries are evicted)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Use categoricals and exact integer minor units for amounts")
+    parser.add_argument("--currency-precision", type=int, default=DEFAULT_CURRENCY_PRECISION,
+                        help="Decimal places of the currency with --compact (2 = cents)")
+    args = parser.parse_args(argv)
+
+    import signal
+    from services.serve import ValidationServer
+
+    cache = None if args.no_cache else ParsedFileCache(args.cache_dir, max_bytes=args.cache_size_mb * 1024 ** 2)
+    reader_options = {"compact": True, "currency_precision": args.currency_precision} if args.compact else {}
+    server = ValidationServer(jobs=args.jobs, cache=cache, reader_options=reader_options)
+    print(f"Ready: {args.jobs} warm worker(s), reading jobs from {args.socket or 'stdin'}.", file=sys.stderr)
+    # Stopped by the orchestrator: shut the pool down and remove the socket
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        if args.socket:
+            server.serve_socket(args.socket)
+        else:
+            server.serve_stdin()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+def sheet_selector(text):
+    """--sheets value: an integer is a sheet index, anything else a name pattern (or 'all')."""
+    try:
+        return int(text)
+    except ValueError:
+        return text
 
 def main():
-    parser = argparse.ArgumentParser(description="Financial Validation CLI")
+    if sys.argv[1:2] == ["serve"]:
+        return serve(sys.argv[2:])
+
+    parser = argparse.ArgumentParser(description="Financial Validation CLI",
+                                     epilog="Run 'main.py serve --help' for the resident worker mode.")
     parser.add_argument("--single_tb", nargs="*", default=[], help="Paths to single TB Excel files")
     parser.add_argument("--monthly_tb", nargs="*", default=[], help="Paths to monthly TB Excel files")
     parser.add_argument("--gl", nargs="*", default=[], help="Paths to General Ledger Excel files")
+    parser.add_argument("--sheets", nargs="+", type=sheet_selector, metavar="SHEET",
+                        help="Validate these sheets of every Excel file instead of the active one: 'all', "
+                             "0-based indexes or name patterns (e.g. 'Entity *'). Findings are reported per "
+                             "sheet, and with --store each sheet is stored as the entity named after it. "
+                             "Reconciliation still reads the active sheets")
     parser.add_argument("--out", default="validation_report.html", help="Output HTML report")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of worker processes used to read and validate files in parallel")
+    parser.add_argument("--no-cache", action="store_true", help="Always parse the Excel files, ignoring the cache")
+    parser.add_argument("--clear-cache", action="store_true", help="Empty the parsed-file cache before running")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Directory of the parsed-file cache")
+    parser.add_argument("--cache-size-mb", type=int, default=DEFAULT_MAX_BYTES // 1024 ** 2,
+                        help="Maximum size of the parsed-file cache (least recently used entries are evicted)")
+    parser.add_argument("--store", help="Ledger store directory to add the parsed GL/TB data to")
+    parser.add_argument("--entity", default="default", help="Entity the files belong to in the ledger store")
+    parser.add_argument("--period", help="Month (YYYY-MM) of the single TB files, for the ledger store")
+    parser.add_argument("--compact", action="store_true",
+                        help="Use categoricals and exact integer minor units for amounts")
+    parser.add_argument("--currency-precision", type=int, default=DEFAULT_CURRENCY_PRECISION,
+                        help="Decimal places of the currency with --compact (2 = cents)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Re-check only new or changed months of monthly TBs (not combined with --store) "
+                             "and only the rows appended to GL exports since the last run (state kept in "
+                             "the cache directory)")
+    parser.add_argument("--reconcile", action="store_true",
+                        help="Also check that the GL activity per account and month matches the monthly TBs")
+    parser.add_argument("--reconcile-threshold", type=float, default=RECONCILIATION_THRESHOLD,
+                        help="Largest GL-vs-TB difference per account and month still considered reconciled")
+    parser.add_argument("--reconcile-out", help="CSV file receiving every reconciliation variance")
+    parser.add_argument("--duplicates", action="store_true",
+                        help="Also look for duplicate and near-duplicate postings across the GL files")
+    parser.add_argument("--duplicate-days", type=int, default=NEAR_DUPLICATE_DAYS,
+                        help="Largest date difference (days) of near-duplicate postings")
+    parser.add_argument("--duplicates-out", help="CSV file receiving every duplicate cluster")
+    parser.add_argument("--profile", metavar="OUT_JSON",
+                        help="Write the wall/CPU time, rows and peak memory of every stage, per file, to this JSON file")
+    parser.add_argument("--profile-no-memory", action="store_true",
+                        help="With --profile, skip the peak memory (allocation tracing slows the run down)")
 
     args = parser.parse_args()
+
+    cache = ParsedFileCache(args.cache_dir, max_bytes=args.cache_size_mb * 1024 ** 2)
+    if args.clear_cache:
+        cache.clear()
+    if args.no_cache:
+        cache = None
+
+    tasks = (
+        [("single_tb", path) for path in args.single_tb] +
+        [("monthly_tb", path) for path in args.monthly_tb] +
+        [("gl", path) for path in args.gl]
+    )
+
+    store = None
+    if args.store:
+        from services.ledger_store import LedgerStore
+        store = LedgerStore(args.store)
+
     results = {}
+    reader_options = {}
+    if args.compact:
+        reader_options = {"compact": True, "currency_precision": args.currency_precision}
+
+    incremental_dir = None
+    if args.incremental:
+        incremental_dir = os.path.join(os.path.expanduser(args.cache_dir), "incremental_state")
+
+    started = datetime.datetime.now()
+    stages = []
+    profile_memory = not args.profile_no_memory
+    # Stages of this process (reconciliation, report); off without --profile
+    with (profiling(memory=profile_memory) if args.profile else contextlib.nullcontext([])) as run_stages:
+        outcomes = validate_files(tasks, jobs=args.jobs, cache=cache, store=store, entity=args.entity,
+                                  period=args.period, reader_options=reader_options,
+                                  incremental_dir=incremental_dir, profile=bool(args.profile),
+                                  profile_memory=profile_memory, sheets=args.sheets)
+        for fname, outcome in outcomes:
+            # Each file's stages were recorded by the process that validated it
+            stages.extend(outcome.pop("profile", []))
+            results[fname] = outcome
+
+        if args.reconcile:
+            with stage("reconciliation"):
+                name, outcome = reconcile_files(args.gl, args.monthly_tb, cache=cache,
+                                                reader_options=reader_options,
+                                                threshold=args.reconcile_threshold, out=args.reconcile_out)
+            results[name] = outcome
+
+        if args.duplicates:
+            with stage("duplicate detection"):
+                name, outcome = duplicate_files(args.gl, cache=cache, reader_options=reader_options,
+                                                days=args.duplicate_days, out=args.duplicates_out,
+                                                sheets=args.sheets)
+            results[name] = outcome
+
+        # Write the HTML report (streamed to the file, findings grouped by rule)
+        write_html_report(results, args.out)
 
-    # Single TB
-    for path in args.single_tb:
-        fname = os.path.basename(path)
-        errors, warnings = [], []
-        try:
-            df_tb = read_single_tb_excel_dynamic(path)
-            e, w = validate_trial_balance(df_tb)
-            errors.extend(e)
-            warnings.extend(w)
-        except Exception as ex:
-            errors.append(str(ex))
-        results[fname] = {"errors": errors, "warnings": warnings}
-
-    # Monthly TB
-    for path in args.monthly_tb:
-        fname = os.path.basename(path)
-        errors, warnings = [], []
-        try:
-            df_monthly = read_monthly_tb_excel_dynamic(path)
-            for month_val, group_df in df_monthly.groupby("Month"):
-                e, w = validate_trial_balance(group_df)
-                errors.extend(e)
-                warnings.extend(w)
-        except Exception as ex:
-            errors.append(str(ex))
-        results[fname] = {"errors": errors, "warnings": warnings}
-
-    # GL
-    for path in args.gl:
-        fname = os.path.basename(path)
-        errors, warnings = [], []
-        try:
-            df_gl, parse_info = read_gl_excel_dynamic(path)
-            e, w = validate_gl(df_gl, parse_info=parse_info)
-            errors.extend(e)
-            warnings.extend(w)
-        except Exception as ex:
-            errors.append(str(ex))
-        results[fname] = {"errors": errors, "warnings": warnings}
-
-    # Generate HTML report
-    html = generate_html_report(results)
-    with open(args.out, "w", encoding="utf-8") as f:
-        f.write(html)
+    if args.profile:
+        with open(args.profile, "w", encoding="utf-8") as f:
+            json.dump({
+                "started": started.isoformat(timespec="seconds"),
+                "wall_seconds": (datetime.datetime.now() - started).total_seconds(),
+                "jobs": args.jobs,
+                "stages": stages + run_stages,
+            }, f, indent=2)
+        print(f"Stage profile written to '{args.profile}'.")
 
     print(f"Validation complete. See '{args.out}' for results.")
 
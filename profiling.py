@@ -0,0 +1,170 @@
+"""
+Lightweight per-stage instrumentation of the readers, validators and report.
+
+Code marks its stages with `stage()`; nothing is measured unless a
+`profiling()` block is active in the calling thread, so a disabled stage costs
+one attribute lookup. Inside `profiling()`, every stage records its wall time,
+CPU time (of the whole process), rows processed and peak traced memory.
+
+    with profiling(file="gl.xlsx") as records:
+        df, parse_info = read_gl_excel_dynamic("gl.xlsx")
+    # records: [{"file": "gl.xlsx", "stage": "read_gl_excel_dynamic / header detection", ...}, ...]
+"""
+import contextlib
+import threading
+import time
+import tracemalloc
+
+# Separator of the nested stage names in the records
+STAGE_SEPARATOR = " / "
+
+_local = threading.local()  # .profile: the _Profile collecting in this thread, if any
+
+
+class _NullStage:
+    """Stage returned while profiling is off: accepts `rows` and does nothing."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Profile:
+    def __init__(self, file, memory):
+        self.file = file
+        self.memory = memory
+        self.records = []
+        self.stack = []
+        self.peak = 0  # Traced peak outside / across the top-level stages, for an enclosing profile
+
+
+class _Stage:
+    __slots__ = ("profile", "name", "rows", "wall", "cpu", "start_memory", "peak")
+
+    def __init__(self, profile, name, rows):
+        self.profile = profile
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        profile = self.profile
+        if profile.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # The parent's peak so far is kept before the tracer's peak is reset for this stage
+            parent = profile.stack[-1] if profile.stack else profile
+            parent.peak = max(parent.peak, peak)
+            tracemalloc.reset_peak()
+            self.start_memory, self.peak = current, current
+        profile.stack.append(self)
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        profile = self.profile
+        peak_mib = None
+        if profile.memory:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            peak_mib = (self.peak - self.start_memory) / 2 ** 20
+        profile.stack.pop()
+        if profile.memory:
+            parent = profile.stack[-1] if profile.stack else profile
+            parent.peak = max(parent.peak, self.peak)
+            tracemalloc.reset_peak()
+        profile.records.append({
+            "file": profile.file,
+            "stage": STAGE_SEPARATOR.join([s.name for s in profile.stack] + [self.name]),
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            "rows": None if self.rows is None else int(self.rows),
+            "peak_mib": peak_mib,
+        })
+        return False
+
+
+def stage(name, rows=None):
+    """
+    Context manager timing one stage. Set `.rows` on the returned object once
+    the number of rows processed is known:
+
+        with stage("excel parsing") as s:
+            frame = pd.read_excel(...)
+            s.rows = len(frame)
+
+    Stages nest; a record's stage name is the path of the enclosing stages.
+    Without an active profiling() block this does nothing.
+    """
+    profile = getattr(_local, "profile", None)
+    if profile is None:
+        return _NULL_STAGE
+    return _Stage(profile, name, rows)
+
+
+@contextlib.contextmanager
+def profiling(file=None, memory=True):
+    """
+    Collects the stage records of the calling thread while the block runs.
+
+    A nested block collects separately (its records are not added to the
+    outer block's), so a worker's per-file records can be returned as they are.
+
+    Args:
+        file (str): File name put on every record.
+        memory (bool): Trace allocations (tracemalloc) for the stages' peak memory.
+                       Tracing slows Python allocations down noticeably, and it
+                       covers the whole process: leave it off when other threads
+                       are busy (e.g. in the web app).
+
+    Yields:
+        list: the records, filled as the stages finish:
+              {"file", "stage", "wall_seconds", "cpu_seconds", "rows", "peak_mib"}.
+    """
+    outer = getattr(_local, "profile", None)
+    if outer is not None and outer.memory and tracemalloc.is_tracing():
+        outer_stage = outer.stack[-1] if outer.stack else outer
+        outer_stage.peak = max(outer_stage.peak, tracemalloc.get_traced_memory()[1])
+    profile = _Profile(file, memory)
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _local.profile = profile
+    try:
+        yield profile.records
+    finally:
+        _local.profile = outer
+        if outer is not None and outer.memory and tracemalloc.is_tracing():
+            # The enclosing stage still sees the memory used by the nested block
+            outer_stage.peak = max(outer_stage.peak, profile.peak, tracemalloc.get_traced_memory()[1])
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def is_profiling():
+    """True while a profiling() block is active in the calling thread."""
+    return getattr(_local, "profile", None) is not None
+
+
+def merge_records(records):
+    """
+    Adds stage records collected elsewhere (e.g. by a profiling() block in a
+    worker process) to the calling thread's profile, nested under the stage
+    open there now and with its file name. Does nothing without a profile.
+    """
+    profile = getattr(_local, "profile", None)
+    if profile is None:
+        return
+    prefix = [s.name for s in profile.stack]
+    for record in records:
+        profile.records.append(dict(record, file=profile.file,
+                                    stage=STAGE_SEPARATOR.join(prefix + [record["stage"]])))
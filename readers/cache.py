@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import sys
+
+from lazy_imports import lazy_import
+from readers.workbook_loader import select_sheets, workbook_sheet_names
+
+pd = lazy_import("pandas")
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "financial-validation")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GiB
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+# Bump when the on-disk layout of entries changes
+CACHE_FORMAT = 2
+
+
+def file_digest(filepath_or_buffer):
+    """
+    Hashes the content of a file or binary buffer (BLAKE2b, read in 1 MiB blocks).
+    A buffer is hashed from the start and rewound afterwards.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    if hasattr(filepath_or_buffer, "read"):
+        filepath_or_buffer.seek(0)
+        for block in iter(lambda: filepath_or_buffer.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+        filepath_or_buffer.seek(0)
+        return digest.hexdigest()
+    with open(filepath_or_buffer, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParsedFileCache:
+    """
+    Content-addressed on-disk cache of reader output.
+
+    Entries are keyed by the file's content hash, the reader (module, name and
+    READER_VERSION) and the reader options. The normalized DataFrame is stored
+    in the Arrow IPC (Feather) format; the optional parse_info dict and the frame's
+    attrs (e.g. currency_precision) are stored next to it as JSON.
+    When the cache grows beyond `max_bytes`, least recently used entries are
+    evicted (a cache hit refreshes the entry's modification time).
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key(self, filepath, reader, options=None, digest=None):
+        """
+        Cache key of reading `filepath` with `reader` and `options`; pass the
+        file's `digest` when it is already known (e.g. one key per sheet).
+        """
+        module = sys.modules.get(reader.__module__)
+        version = getattr(module, "READER_VERSION", 0)
+        parts = {
+            "content": digest or file_digest(filepath),
+            "reader": f"{reader.__module__}.{reader.__qualname__}",
+            "version": version,
+            "options": options or {},
+            "format": CACHE_FORMAT,
+        }
+        encoded = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.blake2b(encoded, digest_size=20).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".arrow", base + ".json"
+
+    def get(self, key):
+        """
+        Returns (df, parse_info) for a cached entry, or None on a miss.
+        """
+        data_path, info_path = self._paths(key)
+        try:
+            df = pd.read_feather(data_path)
+            with open(info_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            parse_info = meta["parse_info"]
+            df.attrs.update(meta["attrs"])
+            os.utime(data_path)  # Mark as recently used
+        except (OSError, ValueError, KeyError):
+            return None
+        except ImportError:  # pyarrow is not installed
+            return None
+        return df, parse_info
+
+    def put(self, key, df, parse_info=None):
+        """
+        Stores a reader result. Frames Arrow cannot represent (e.g. mixed-type
+        columns) are silently not cached.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data_path, info_path = self._paths(key)
+        tmp_path = f"{data_path}.{os.getpid()}.tmp"
+        try:
+            df.to_feather(tmp_path)
+            meta = {
+                "parse_info": None if parse_info is None else {k: int(v) for k, v in parse_info.items()},
+                "attrs": dict(df.attrs),
+            }
+            with open(info_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, data_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        self.evict()
+        return True
+
+    def entries(self):
+        """
+        Lists cache entries as (mtime, total_bytes, key), oldest first.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".arrow"):
+                continue
+            key = name[:-len(".arrow")]
+            data_path, info_path = self._paths(key)
+            try:
+                stat = os.stat(data_path)
+                size = stat.st_size + (os.path.getsize(info_path) if os.path.exists(info_path) else 0)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, size, key))
+        entries.sort()
+        return entries
+
+    def evict(self):
+        """
+        Removes least recently used entries until the cache fits in max_bytes.
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+
+    def clear(self):
+        for _, _, key in self.entries():
+            self._remove(key)
+
+    def _remove(self, key):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def cached_read(reader, filepath, cache=None, returns_parse_info=False, **options):
+    """
+    Calls reader(filepath, **options), serving the result from `cache` when the
+    same file content was already read with the same reader version and options.
+
+    Args:
+        reader (callable): One of the dynamic Excel readers.
+        filepath: Path to the file, or a binary file-like object.
+        cache (ParsedFileCache): Cache to use; None disables caching.
+        returns_parse_info (bool): True for readers returning (df, parse_info).
+
+    Returns:
+        Whatever `reader` returns.
+    """
+    if options.get("sheets") is not None and cache is not None:
+        return _cached_read_sheets(reader, filepath, cache, returns_parse_info, **options)
+    if cache is None:
+        return reader(filepath, **options)
+
+    key = cache.key(filepath, reader, options)
+    hit = cache.get(key)
+    if hit is not None:
+        df, parse_info = hit
+        return (df, parse_info or {}) if returns_parse_info else df
+
+    result = reader(filepath, **options)
+    if returns_parse_info:
+        cache.put(key, result[0], result[1])
+    else:
+        cache.put(key, result)
+    return result
+
+
+def _cached_read_sheets(reader, filepath, cache, returns_parse_info, sheets, **options):
+    """
+    cached_read for a sheet selector: every sheet is cached on its own, and
+    only the sheets missing from the cache are read, in one pass over the workbook.
+
+    Returns:
+        {sheet name: result (or the exception raised for that sheet)}, in tab order.
+    """
+    names, active = workbook_sheet_names(filepath)
+    names = select_sheets(names, sheets, active)
+    digest = file_digest(filepath)
+    keys = {name: cache.key(filepath, reader, dict(options, sheet=name), digest=digest) for name in names}
+
+    results = {}
+    for name in names:
+        hit = cache.get(keys[name])
+        if hit is not None:
+            df, parse_info = hit
+            results[name] = (df, parse_info or {}) if returns_parse_info else df
+
+    missing = [name for name in names if name not in results]
+    if missing:
+        for name, result in reader(filepath, sheets=missing, **options).items():
+            results[name] = result
+            if isinstance(result, Exception):
+                continue
+            if returns_parse_info:
+                cache.put(keys[name], result[0], result[1])
+            else:
+                cache.put(keys[name], result)
+    return {name: results[name] for name in names}
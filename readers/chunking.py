@@ -0,0 +1,24 @@
+from itertools import islice
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def iter_chunks(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Groups an iterator of rows into lists of at most `chunk_size` rows.
+
+    Args:
+        rows (iterable): Any iterable of rows (e.g., from iter_csv_rows / iter_xlsx_rows).
+        chunk_size (int): Maximum number of rows per batch.
+
+    Yields:
+        list: The next batch of rows. The last batch may be shorter.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer.")
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,99 @@
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Number of decimal places of the ledger currency (2 = cents)
+DEFAULT_CURRENCY_PRECISION = 2
+
+# Text columns are stored as categoricals when at most this share of values is distinct
+CATEGORY_MAX_DISTINCT_RATIO = 0.5
+
+
+def to_minor_units(values, currency_precision=DEFAULT_CURRENCY_PRECISION):
+    """
+    Converts amounts to integer minor units (e.g., cents), rounding half to even.
+
+    Excel stores amounts as doubles, so rounding value * 10**precision to the
+    nearest integer recovers the exact amount for any realistic ledger value.
+
+    Returns:
+        Series of nullable Int64 (missing or non-numeric values become <NA>).
+    """
+    numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    scaled = np.rint(numbers * 10 ** currency_precision)
+    return pd.Series(scaled, index=getattr(values, "index", None)).astype("Int64")
+
+
+def from_minor_units(values, currency_precision=DEFAULT_CURRENCY_PRECISION):
+    """Converts integer minor units back to float currency units."""
+    return values.astype("float64") / 10 ** currency_precision
+
+
+def gl_amounts(df):
+    """
+    Amounts of a canonical GL frame as floats: its 'parsed_amount', or for a
+    compact frame (which only keeps 'amount_minor') the minor units converted back.
+
+    Returns:
+        Series of float64 (NaN where the amount did not parse).
+    """
+    if "parsed_amount" in df.columns:
+        return pd.to_numeric(df["parsed_amount"], errors="coerce").astype("float64")
+    return from_minor_units(df["amount_minor"], df.attrs.get("currency_precision", DEFAULT_CURRENCY_PRECISION))
+
+
+def to_category_if_repetitive(series, max_distinct_ratio=CATEGORY_MAX_DISTINCT_RATIO):
+    """
+    Returns `series` as a categorical if few of its values are distinct, else unchanged.
+    """
+    if len(series) == 0:
+        return series
+    codes, uniques = pd.factorize(series)
+    if len(uniques) > max_distinct_ratio * len(series):
+        return series
+    return pd.Series(pd.Categorical.from_codes(codes, uniques), index=series.index, name=series.name)
+
+
+def compact_gl_frame(df, currency_precision=DEFAULT_CURRENCY_PRECISION):
+    """
+    Shrinks a canonical GL frame:
+      - repetitive text columns (Account, Date, Transaction Type, Name, Split, ...) become categoricals;
+      - the raw 'Amount' text is only kept where it failed to parse (what validators report);
+      - 'amount_minor' / 'balance_minor' hold exact Int64 minor units, and the
+        float 'parsed_amount' is dropped (see gl_amounts).
+
+    The precision is recorded in df.attrs["currency_precision"].
+    """
+    text_cols = ["Account", "Date", "Transaction Type", "#", "Name", "Memo/Description", "Split"]
+    for col in text_cols:
+        if col in df.columns:
+            df[col] = to_category_if_repetitive(df[col])
+
+    if "Amount" in df.columns:
+        df["Amount"] = df["Amount"].where(df["parsed_amount"].isna()).astype("category")
+    df["amount_minor"] = to_minor_units(df["parsed_amount"], currency_precision)
+    del df["parsed_amount"]
+    if "Balance" in df.columns:
+        df["balance_minor"] = to_minor_units(df["Balance"], currency_precision)
+
+    df.attrs["currency_precision"] = currency_precision
+    return df
+
+
+def compact_tb_frame(df, currency_precision=DEFAULT_CURRENCY_PRECISION):
+    """
+    Shrinks a TB frame: 'Account' (and 'Month') become categoricals when repetitive,
+    and 'debit_minor' / 'credit_minor' hold exact int64 minor units.
+
+    The precision is recorded in df.attrs["currency_precision"].
+    """
+    for col in ["Account", "Month"]:
+        if col in df.columns:
+            df[col] = to_category_if_repetitive(df[col])
+
+    df["debit_minor"] = to_minor_units(df["Debit"], currency_precision).fillna(0).astype("int64")
+    df["credit_minor"] = to_minor_units(df["Credit"], currency_precision).fillna(0).astype("int64")
+
+    df.attrs["currency_precision"] = currency_precision
+    return df
@@ -1,30 +1,72 @@
+import codecs
 import csv
 
+from readers.chunking import iter_chunks, DEFAULT_CHUNK_SIZE
+
+def iter_csv_rows(filepath_or_buffer, header_row=0):
+    """
+    Streams rows from a CSV file, one dictionary at a time.
+
+    Args:
+        filepath_or_buffer: The path to the CSV file, or a binary (or text) file-like
+                            object such as an in-memory upload. A buffer is read
+                            from the start and left open.
+        header_row (int): 0-based index of the header record (e.g. the "header_row"
+                          found by classify_file); the records above it (titles,
+                          blank lines) are skipped.
+
+    Yields:
+        dict: One row of the CSV file, keyed by the header names.
+              Only the current row is held in memory.
+    """
+    if hasattr(filepath_or_buffer, 'read'):
+        filepath_or_buffer.seek(0)
+        if isinstance(filepath_or_buffer.read(0), str):
+            yield from _dict_rows(filepath_or_buffer, header_row)
+        else:
+            # Decode bytes incrementally (a UTF-8 BOM is dropped, as classify_file does);
+            # unlike TextIOWrapper this never closes the buffer
+            yield from _dict_rows(codecs.getreader('utf-8-sig')(filepath_or_buffer), header_row)
+        return
+
+    with open(filepath_or_buffer, mode='r', encoding='utf-8-sig', newline='') as csvfile:
+        yield from _dict_rows(csvfile, header_row)
+
+def _dict_rows(text_file, header_row):
+    # csv.reader consumes the lines of the skipped records only, so the
+    # DictReader continues from the header record on the same file
+    skipped = csv.reader(text_file)
+    for _ in range(header_row or 0):
+        if next(skipped, None) is None:
+            return
+    yield from csv.DictReader(text_file)
+
+def iter_csv_chunks(filepath_or_buffer, chunk_size=DEFAULT_CHUNK_SIZE, header_row=0):
+    """
+    Streams rows from a CSV file in lists of at most `chunk_size` dictionaries.
+    """
+    return iter_chunks(iter_csv_rows(filepath_or_buffer, header_row), chunk_size)
+
 def read_csv_file(file_path):
     """
     Reads data from a CSV file.
 
     Args:
-        file_path (str): The path to the CSV file.
+        file_path: The path to the CSV file, or a file-like object.
 
     Returns:
         list: A list of dictionaries, where each dictionary represents a row
               in the CSV file and keys are the header names.
               Returns an empty list if there's an error reading the file.
     """
-    data = []
     try:
-        with open(file_path, mode='r', encoding='utf-8') as csvfile:
-            csv_reader = csv.DictReader(csvfile)
-            for row in csv_reader:
-                data.append(row)
+        return list(iter_csv_rows(file_path))
     except FileNotFoundError:
         print(f"Error: File not found at path: {file_path}")
         return []  # Return empty list to indicate failure
     except Exception as e:
         print(f"Error reading CSV file: {e}")
         return []  # Return empty list to indicate failure
-    return data
 
 if __name__ == '__main__':
     # Example usage (for testing the reader module independently)
@@ -35,4 +77,4 @@ if __name__ == '__main__':
         for row in data[:5]: # Print first 5 rows as example
             print(row)
     else:
-        print(f"No data read from {example_file} or an error occurred.")
\ No newline at end of file
+        print(f"No data read from {example_file} or an error occurred.")
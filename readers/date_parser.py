@@ -0,0 +1,119 @@
+import datetime
+from functools import lru_cache
+
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Formats tried when sniffing, in order of preference. Month-first comes before
+# day-first so ambiguous dates resolve like pd.to_datetime's default.
+CANDIDATE_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d",
+    "%m/%d/%Y",
+    "%m/%d/%y",
+    "%d/%m/%Y",
+    "%d/%m/%y",
+    "%Y/%m/%d",
+    "%d.%m.%Y",
+    "%m-%d-%Y",
+    "%d-%b-%Y",
+    "%d %b %Y",
+    "%b %d, %Y",
+]
+
+# Number of distinct values examined when sniffing the dominant format
+SAMPLE_SIZE = 200
+
+
+@lru_cache(maxsize=65536)
+def matches_format(text, fmt):
+    """
+    True if `text` parses with datetime.strptime(text, fmt). Results are memoized,
+    so repeated dates are only parsed once.
+    """
+    try:
+        datetime.datetime.strptime(text, fmt)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+def sniff_date_format(values, formats=CANDIDATE_FORMATS, sample_size=SAMPLE_SIZE):
+    """
+    Returns the candidate format that parses the most of (up to `sample_size`)
+    distinct, non-empty values, or None if no format parses any of them.
+    """
+    sample = [v for v in values[:sample_size] if isinstance(v, str) and v]
+    best_format, best_count = None, 0
+    for fmt in formats:
+        count = sum(matches_format(v, fmt) for v in sample)
+        if count > best_count:
+            best_format, best_count = fmt, count
+            if count == len(sample):
+                break
+    return best_format
+
+
+def _factorize(series):
+    codes, uniques = pd.factorize(series)
+    return codes, np.asarray(uniques, dtype=object)
+
+
+def _map_back(codes, unique_values, index, missing_value):
+    values = np.append(unique_values, missing_value)  # code -1 (missing) -> missing_value
+    return pd.Series(values[codes], index=index)
+
+
+def parse_dates(series, formats=CANDIDATE_FORMATS, fallback=True, sample_size=SAMPLE_SIZE):
+    """
+    Converts a column of date text to datetime64, parsing each distinct value once.
+
+    1) The column is factorized, so only distinct values are parsed.
+    2) The dominant format is sniffed from a sample of the distinct values.
+    3) All distinct values are parsed with that format in one vectorized call.
+    4) If `fallback`, the few values the format rejects are parsed one by one
+       with pandas' format inference.
+    5) Results are mapped back to every row.
+
+    Empty strings and missing values become NaT.
+
+    Returns:
+        Series of datetime64[ns] aligned with `series`.
+    """
+    codes, uniques = _factorize(series)
+    parsed = pd.Series(pd.NaT, index=range(len(uniques)), dtype="datetime64[ns]")
+    if len(uniques) == 0:
+        return pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns]")
+
+    is_text = np.array([isinstance(v, str) for v in uniques])
+    non_empty = np.array([bool(v) for v in uniques]) if len(uniques) else np.array([], dtype=bool)
+
+    # Datetime-like values (e.g. from Excel cells) need no format
+    others = ~is_text & non_empty
+    if others.any():
+        parsed[others] = pd.to_datetime(pd.Series(uniques[others]), errors="coerce").to_numpy()
+
+    text_idx = np.flatnonzero(is_text & non_empty)
+    fmt = sniff_date_format(uniques[text_idx], formats, sample_size)
+    if fmt is not None and len(text_idx):
+        parsed.iloc[text_idx] = pd.to_datetime(pd.Series(uniques[text_idx]), format=fmt, errors="coerce").to_numpy()
+
+    if fallback:
+        outliers = text_idx[parsed.iloc[text_idx].isna().to_numpy()]
+        for i in outliers:
+            parsed.iat[i] = pd.to_datetime(uniques[i], errors="coerce")
+
+    result = _map_back(codes, parsed.to_numpy(), series.index, np.datetime64("NaT"))
+    return result.astype("datetime64[ns]")
+
+
+def invalid_format_mask(series, fmt):
+    """
+    Boolean mask of non-empty values that do not parse with datetime.strptime(value, fmt).
+    Each distinct value is checked once.
+    """
+    codes, uniques = _factorize(series)
+    invalid = np.array([bool(v) and not matches_format(v, fmt) for v in uniques], dtype=bool)
+    return _map_back(codes, invalid, series.index, False).astype(bool)
@@ -0,0 +1,39 @@
+# Leading bytes of the container formats we can tell apart
+XLSX_MAGIC = b"PK\x03\x04"  # ZIP archive (Office Open XML)
+XLS_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"  # OLE2 compound file (legacy .xls)
+
+# Bytes inspected to decide whether the content is CSV text
+SNIFF_SIZE = 8192
+
+
+def sniff_file_type(filepath_or_buffer):
+    """
+    Detects the file type from the content instead of the file name.
+
+    Only the first SNIFF_SIZE bytes are read; a buffer is rewound afterwards.
+
+    Returns:
+        str: "xlsx", "xls", "csv" (UTF-8 text without NUL bytes),
+             or None if the content is none of these.
+    """
+    if hasattr(filepath_or_buffer, "read"):
+        filepath_or_buffer.seek(0)
+        head = filepath_or_buffer.read(SNIFF_SIZE)
+        filepath_or_buffer.seek(0)
+    else:
+        with open(filepath_or_buffer, "rb") as f:
+            head = f.read(SNIFF_SIZE)
+
+    if head.startswith(XLSX_MAGIC):
+        return "xlsx"
+    if head.startswith(XLS_MAGIC):
+        return "xls"
+    if not head or b"\x00" in head:
+        return None
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as ex:
+        # A full sample may end in the middle of a multi-byte character
+        if len(head) < SNIFF_SIZE or ex.start < len(head) - 3:
+            return None
+    return "csv"
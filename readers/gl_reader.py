@@ -1,56 +1,79 @@
-import openpyxl
-import pandas as pd
+from lazy_imports import lazy_import
+from readers.date_parser import parse_dates
+from readers.compact import compact_gl_frame, DEFAULT_CURRENCY_PRECISION
+from readers.workbook_loader import load_excel_table, column_labels, read_workbook_sheets
+from profiling import stage
 
-def read_gl_excel_dynamic(filepath):
+pd = lazy_import("pandas")
+
+# Bump whenever the reader's output changes, so cached results are invalidated
+READER_VERSION = 4
+
+def read_gl_excel_dynamic(filepath_or_buffer, compact=False, currency_precision=DEFAULT_CURRENCY_PRECISION,
+                          sheets=None):
     """
     Reads a GL export from Excel, scanning the first ~20 rows with openpyxl
-    to find a row containing 'Date' and 'Amount'. Then uses skiprows=i-1 in Pandas
-    so that row becomes the header.
+    (read-only) to find a row containing 'Date' and 'Amount'. The sheet is then
+    parsed once, starting at that row, which becomes the header.
+
+    Args:
+      filepath_or_buffer: path or binary file-like object of the .xlsx export.
+      compact (bool): store repetitive text as categoricals and hold amounts in exact
+                      'amount_minor' / 'balance_minor' integer columns instead of
+                      'parsed_amount' (see readers.compact).
+      currency_precision (int): decimal places of the currency when compact (2 = cents).
+      sheets: optional sheet selector (see workbook_loader.select_sheets); by
+              default the active sheet is read.
 
     Returns:
       (df, parse_info)
-      - df: the cleaned pandas DataFrame.
+      - df: the cleaned pandas DataFrame. It has an 'Account' column when the export
+            has an account column or groups transactions under account section rows.
       - parse_info: a dictionary with details about parse errors 
                     (e.g., invalid_dates, invalid_amounts).
+      With `sheets`: {sheet name: (df, parse_info), or the exception raised for that sheet}.
     """
-    wb = openpyxl.load_workbook(filepath, data_only=True)
-    sheet = wb.active  # Use the active sheet or specify a sheet if needed
+    if sheets is not None:
+        return read_workbook_sheets(read_gl_excel_dynamic, filepath_or_buffer, sheets,
+                                    compact=compact, currency_precision=currency_precision)
+    with stage("read_gl_excel_dynamic") as reading:
+        df, parse_info = clean_gl_frame(load_gl_table(filepath_or_buffer), compact, currency_precision)
+        reading.rows = len(df)
+    return df, parse_info
 
-    header_row = None
-    max_rows_to_check = 20
+def load_gl_table(filepath_or_buffer):
+    """
+    Raw stage of read_gl_excel_dynamic: finds the header, maps the columns to
+    their canonical names and keeps the relevant ones. Values are the raw cell
+    strings (nothing is stripped or converted yet) and every sheet row below
+    the header is kept, so row i of the table is data row i + 1 of the export.
 
+    Returns:
+      DataFrame with the canonical columns present in the export.
+    """
     # Function to check if a cell's value matches 'Amount' (including synonyms)
     def _matches_amount(cell_value):
-        if cell_value is None:
-            return False
-        cell_value = str(cell_value).lower().strip()
         return cell_value in ["amount", "amt", "total amount"]
 
-    # 1) Identify the header row by scanning the first 20 rows
-    for i, row in enumerate(sheet.iter_rows(values_only=True), start=1):
-        if i > max_rows_to_check:
-            break
-        row_str_values = [str(cell).lower().strip() if cell else "" for cell in row]
-        if "date" in row_str_values and any(_matches_amount(val) for val in row):
-            header_row = i
-            break
-
-    if header_row is None:
-        raise ValueError(
+    # 1) Identify the header row by scanning the first 20 rows (read-only),
+    # 2) then parse the sheet once from that row on (all columns as strings)
+    header_rows, df = load_excel_table(
+        filepath_or_buffer,
+        is_header=lambda rows: "date" in rows[0] and any(_matches_amount(val) for val in rows[0]),
+        error_message=(
             "Could not find a row containing 'Date' and 'Amount' within the first 20 rows. "
             "Check the file format or merged cells."
         )
-
-    # 2) Read the Excel file with Pandas (all columns as strings)
-    df = pd.read_excel(
-        filepath,
-        skiprows=header_row - 1,
-        header=0,  # The detected row becomes the header
-        dtype=str
     )
 
+    with stage("column normalization", rows=len(df)):
+        return _canonical_gl_columns(header_rows, df)
+
+
+def _canonical_gl_columns(header_rows, df):
+    """Steps 3-5 of load_gl_table: labels, canonical names and kept columns."""
     # 3) Normalize column names to lowercase and strip extra spaces
-    df.columns = [col.lower().strip() for col in df.columns]
+    df.columns = column_labels(header_rows[0], df.shape[1])
 
     # 4) Map columns to canonical names
     col_map = {
@@ -63,6 +86,8 @@ def read_gl_excel_dynamic(filepath):
         "description": "Memo/Description",
         "memo/description": "Memo/Description",
         "split": "Split",
+        "account": "Account",
+        "account name": "Account",
         "amount": "Amount",
         "balance": "Balance"
     }
@@ -77,8 +102,16 @@ def read_gl_excel_dynamic(filepath):
             final_cols[c] = col_map[c]
     df.rename(columns=final_cols, inplace=True)
 
+    # 4b) Without an account column, take each row's account from the section
+    # header rows that QuickBooks-style exports put above the account's transactions
+    if "Account" not in df.columns:
+        section_accounts = _section_accounts(df)
+        if section_accounts is not None:
+            df["Account"] = section_accounts
+
     # 5) Keep only the relevant columns
     keep_cols = [
+        "Account",
         "Date",
         "Transaction Type",
         "#",
@@ -89,37 +122,74 @@ def read_gl_excel_dynamic(filepath):
         "Balance"
     ]
     existing_cols = [c for c in keep_cols if c in df.columns]
-    df = df[existing_cols]
+    return df[existing_cols]
 
+def clean_gl_frame(df, compact=False, currency_precision=DEFAULT_CURRENCY_PRECISION):
+    """
+    Clean stage of read_gl_excel_dynamic: strips the text columns, converts
+    dates and amounts and drops empty rows. Rows are cleaned independently of
+    each other, so any slice of load_gl_table's output can be cleaned on its own.
+
+    Returns:
+      (df, parse_info) as read_gl_excel_dynamic.
+    """
     # 6) Clean up text columns using .str.strip() so we don't call .strip() on a Series
-    text_cols = ["Date", "Transaction Type", "#", "Name", "Memo/Description", "Split"]
-    for col in text_cols:
-        if col in df.columns:
-            df[col] = df[col].fillna("").astype(str).str.strip()
+    text_cols = ["Account", "Date", "Transaction Type", "#", "Name", "Memo/Description", "Split"]
+    with stage("text cleanup", rows=len(df)):
+        for col in text_cols:
+            if col in df.columns:
+                df[col] = df[col].fillna("").astype(str).str.strip()
 
     # 7) Prepare a parse_info dictionary to track conversion issues
     parse_info = {"invalid_dates": 0, "invalid_amounts": 0}
 
-    # Convert Balance column to numeric if it exists
-    if "Balance" in df.columns:
-        df["Balance"] = pd.to_numeric(df["Balance"], errors="coerce")
-
-    # 8) Convert the Date column to datetime and store as 'parsed_date'
-    df["parsed_date"] = pd.to_datetime(df["Date"], errors="coerce")
-    invalid_date_mask = df["Date"].astype(bool) & df["parsed_date"].isna()
-    parse_info["invalid_dates"] = invalid_date_mask.sum()
-
-    # 9) Convert the Amount column to numeric and store as 'parsed_amount'
-    if "Amount" in df.columns:
-        df["parsed_amount"] = pd.to_numeric(df["Amount"], errors="coerce")
-        invalid_amount_mask = df["Amount"].astype(bool) & df["parsed_amount"].isna()
-        parse_info["invalid_amounts"] = invalid_amount_mask.sum()
-    else:
-        df["parsed_amount"] = None
+    with stage("date/amount coercion", rows=len(df)):
+        # Convert Balance column to numeric if it exists
+        if "Balance" in df.columns:
+            df["Balance"] = pd.to_numeric(df["Balance"], errors="coerce")
+
+        # 8) Convert the Date column to datetime and store as 'parsed_date'
+        # (dominant format sniffed once, each distinct date parsed once)
+        df["parsed_date"] = parse_dates(df["Date"])
+        invalid_date_mask = df["Date"].astype(bool) & df["parsed_date"].isna()
+        parse_info["invalid_dates"] = invalid_date_mask.sum()
+
+        # 9) Convert the Amount column to numeric and store as 'parsed_amount'
+        if "Amount" in df.columns:
+            df["parsed_amount"] = pd.to_numeric(df["Amount"], errors="coerce")
+            invalid_amount_mask = df["Amount"].astype(bool) & df["parsed_amount"].isna()
+            parse_info["invalid_amounts"] = invalid_amount_mask.sum()
+        else:
+            df["parsed_amount"] = None
 
     # 10) Remove rows that are completely empty (both parsed_date and parsed_amount missing)
     mask_keep = df["parsed_date"].notna() | df["parsed_amount"].notna()
     df = df[mask_keep].copy()
     df.reset_index(drop=True, inplace=True)
 
+    # 11) Optionally shrink the frame (categoricals + exact integer minor units)
+    if compact:
+        with stage("compaction", rows=len(df)):
+            df = compact_gl_frame(df, currency_precision)
+
     return df, parse_info
+
+def _section_accounts(df):
+    """
+    Derives the account of every row from section header rows: rows whose
+    first (unmapped) column holds a label and whose other cells are all empty.
+    'Total for ...' rows close a section and are not treated as headers.
+
+    Returns a Series of account names (forward-filled), or None if the export
+    has no such sections.
+    """
+    first_col = df.columns[0]
+    if not first_col.startswith("unnamed"):
+        return None
+
+    labels = df[first_col].fillna("").astype(str).str.strip()
+    others_empty = df.drop(columns=[first_col]).isna().all(axis=1)
+    is_section = (labels != "") & others_empty & ~labels.str.lower().str.startswith("total")
+    if not is_section.any():
+        return None
+    return labels.where(is_section).ffill().fillna("")
@@ -1,95 +1,209 @@
-import pandas as pd
 import datetime, re
 
-def read_monthly_tb_excel_dynamic(filepath):
+from lazy_imports import lazy_import
+from readers.date_parser import parse_dates
+from readers.compact import compact_tb_frame, DEFAULT_CURRENCY_PRECISION
+from readers.workbook_loader import load_excel_table, read_workbook_sheets
+from profiling import stage
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Bump whenever the reader's output changes, so cached results are invalidated
+READER_VERSION = 3
+
+def read_monthly_tb_excel_dynamic(filepath_or_buffer, compact=False, currency_precision=DEFAULT_CURRENCY_PRECISION,
+                                  sheets=None):
     """
     Reads a wide monthly TB with multiple Debit/Credit pairs:
       - 1 row for months (e.g., "Jan. 2024", "Feb. 2024", etc.)
       - 1 row below it with 'Debit'/'Credit' repeated.
 
     Dynamically scans the first 20 rows to find that 2-row header.
+    Accepts a path or a binary file-like object of the .xlsx workbook.
     Returns a DataFrame with columns: [Account, Month, Debit, Credit].
+    With compact=True, 'Account'/'Month' become categoricals and exact integer
+    'debit_minor' / 'credit_minor' columns (in 10**-currency_precision units) are added.
+    With a sheet selector (`sheets`, see workbook_loader.select_sheets), reads
+    each selected sheet and returns {sheet name: DataFrame or exception}.
     """
+    if sheets is not None:
+        return read_workbook_sheets(read_monthly_tb_excel_dynamic, filepath_or_buffer, sheets,
+                                    compact=compact, currency_precision=currency_precision)
 
-    # Read entire sheet with no header
-    temp_df = pd.read_excel(filepath, header=None, dtype=str)
-    nrows = len(temp_df)
+    with stage("read_monthly_tb_excel_dynamic") as reading:
+        accounts, df = load_monthly_tb_table(filepath_or_buffer)
 
-    header_row_pair = None
-    max_rows_to_check = min(20, nrows)
+        # Pair each month's Debit/Credit columns by position and build the long
+        # [Account, Month, Debit, Credit] frame directly from the arrays
+        with stage("month reshape and amount coercion", rows=len(df)):
+            pairs = month_column_pairs(df.columns)
+            df_result = reshape_month_pairs(accounts, df, pairs)
 
-    for i in range(max_rows_to_check - 1):
-        row1 = temp_df.iloc[i].fillna("").str.lower().str.strip().tolist()
-        row2 = temp_df.iloc[i+1].fillna("").str.lower().str.strip().tolist()
+        df_result = finish_monthly_frame(df_result, compact, currency_precision)
+        reading.rows = len(df_result)
+    return df_result
 
-        # Very simplistic check: row2 should have at least one "debit" and one "credit"
-        if "debit" in row2 and "credit" in row2:
-            header_row_pair = (i, i+1)
-            break
+def load_monthly_tb_table(filepath_or_buffer):
+    """
+    Loads the wide monthly TB: finds the 2-row header, drops empty rows/columns
+    and splits off the account column.
 
-    if not header_row_pair:
-        raise ValueError(
+    Returns:
+        (accounts, body): the account Series and the remaining columns (as strings),
+                          labelled with (MonthCol, Type) tuples.
+    """
+    # Scan the first 20 rows (read-only) for the 2-row header, then parse once.
+    # Very simplistic check: the second row should have at least one "debit" and one "credit"
+    header_rows, df = load_excel_table(
+        filepath_or_buffer,
+        is_header=lambda rows: "debit" in rows[1] and "credit" in rows[1],
+        header_span=2,
+        error_message=(
             "Could not find a 2-row header that includes 'Debit'/'Credit' across columns. "
             "Check the file format or row layout."
         )
-
-    # Now read again with multi-row header
-    df = pd.read_excel(
-        filepath,
-        header=[header_row_pair[0], header_row_pair[1]],
-        dtype=str
     )
+    with stage("column normalization", rows=len(df)):
+        df.columns = pd.MultiIndex.from_tuples(_header_tuples(header_rows))
 
-    # Drop entirely empty columns
-    df.dropna(how="all", axis=1, inplace=True)
-    # Drop entirely empty rows
-    df.dropna(how="all", axis=0, inplace=True)
+        # Drop entirely empty columns
+        df.dropna(how="all", axis=1, inplace=True)
+        # Drop entirely empty rows
+        df.dropna(how="all", axis=0, inplace=True)
 
     # Force the first column to be "Account"
-    old_first_col = df.columns[0]
-    df.rename(columns={old_first_col: ("Account", "Account")}, inplace=True)
-
-    # Melt from wide to long
-    df_long = df.melt(
-        id_vars=[("Account","Account")],
-        var_name=["MonthCol","Type"],
-        value_name="Amount"
-    )
+    accounts = df.pop(df.columns[0])
+    return accounts, df
 
-    df_long.rename(columns={("Account","Account"): "Account"}, inplace=True)
+def finish_monthly_frame(df_result, compact=False, currency_precision=DEFAULT_CURRENCY_PRECISION):
+    """
+    Final clean-up of a reshaped [Account, Month, Debit, Credit] frame: strips
+    accounts, drops blank ones, sorts by Month and Account and optionally compacts.
+    """
+    with stage("account cleanup", rows=len(df_result)):
+        # Clean up account
+        df_result["Account"] = df_result["Account"].astype(str).str.strip()
+        df_result = df_result[df_result["Account"] != ""]
 
-    # Parse the MonthCol (e.g., 'Jan. 2024') => datetime or keep as string
-    df_long["Month"] = df_long["MonthCol"].apply(_parse_month_year)
-    df_long.drop(columns=["MonthCol"], inplace=True)
+        # Sort by Month if wanted
+        df_result = df_result.sort_values(by=["Month", "Account"], ignore_index=True)
 
-    # Pivot so we get separate Debit/Credit columns
-    df_result = df_long.pivot_table(
-        index=["Account","Month"],
-        columns="Type",
-        values="Amount",
-        aggfunc="sum"
-    ).reset_index()
+    if compact:
+        with stage("compaction", rows=len(df_result)):
+            df_result = compact_tb_frame(df_result, currency_precision)
 
-    # Ensure columns exist
-    for col in ["Debit","Credit"]:
-        if col not in df_result.columns:
-            df_result[col] = 0.0
+    return df_result
 
-    df_result = df_result[["Account","Month","Debit","Credit"]]
+def month_column_pairs(columns):
+    """
+    Groups (MonthCol, Type) columns by month header, in order of first appearance.
 
-    # Convert numeric
-    df_result["Debit"] = pd.to_numeric(df_result["Debit"], errors="coerce").fillna(0.0)
-    df_result["Credit"] = pd.to_numeric(df_result["Credit"], errors="coerce").fillna(0.0)
+    Returns:
+        list: (month_header, debit_positions, credit_positions) per month, with the
+              positions of that month's 'Debit' and 'Credit' columns in `columns`.
+              Other column types (e.g. notes) are ignored.
+    """
+    pairs = {}
+    for position, (month_header, col_type) in enumerate(columns):
+        debit_positions, credit_positions = pairs.setdefault(month_header, ([], []))
+        if col_type == "Debit":
+            debit_positions.append(position)
+        elif col_type == "Credit":
+            credit_positions.append(position)
+    return [(header, debits, credits) for header, (debits, credits) in pairs.items()]
+
+def reshape_month_pairs(accounts, body, pairs):
+    """
+    Builds the long [Account, Month, Debit, Credit] frame for the given month pairs.
 
-    # Clean up account
-    df_result["Account"] = df_result["Account"].astype(str).str.strip()
-    df_result = df_result[df_result["Account"] != ""]
+    Each month header is parsed once and each Debit/Credit column is converted
+    to numbers once; the long frame is then assembled with np.tile / np.repeat.
+    Every account gets a row for every month (missing or non-numeric values are 0).
+    Duplicate accounts, or headers naming the same month, are summed.
 
-    # Sort by Month if wanted
-    df_result.sort_values(by=["Month", "Account"], inplace=True, ignore_index=True)
+    Args:
+        accounts (Series): Account label of each body row.
+        body (DataFrame): The month columns, as strings, aligned with `accounts`.
+        pairs (list): Output of month_column_pairs (or a subset of it).
+    """
+    keep = accounts.notna().to_numpy()
+    account_values = accounts.to_numpy()[keep]
+    n_rows = len(account_values)
+
+    month_map = parse_month_headers([header for header, _, _ in pairs])
+    months = np.empty(len(pairs), dtype=object)
+    months[:] = [month_map[header] for header, _, _ in pairs]
+
+    # Convert every Debit/Credit column to numbers in one call
+    used = sorted({pos for _, debits, credits in pairs for pos in debits + credits})
+    column_of = {pos: i for i, pos in enumerate(used)}
+    raw = body.iloc[:, used].to_numpy(dtype=object)[keep]
+    numeric = pd.to_numeric(pd.Series(raw.ravel()), errors="coerce").fillna(0.0).to_numpy()
+    numeric = numeric.reshape(raw.shape)
+
+    def _column_totals(positions):
+        if not positions:
+            return np.zeros(n_rows)
+        return numeric[:, [column_of[pos] for pos in positions]].sum(axis=1)
+
+    debit = np.column_stack([_column_totals(debits) for _, debits, _ in pairs]) if pairs else np.zeros((n_rows, 0))
+    credit = np.column_stack([_column_totals(credits) for _, _, credits in pairs]) if pairs else np.zeros((n_rows, 0))
+
+    df_result = pd.DataFrame({
+        "Account": np.tile(account_values, len(pairs)),
+        "Month": np.repeat(months, n_rows),
+        "Debit": debit.T.ravel(),
+        "Credit": credit.T.ravel(),
+    })
+
+    if pd.Index(account_values).has_duplicates or len(set(map(str, months))) < len(months):
+        df_result = df_result.groupby(["Account", "Month"], sort=False, as_index=False)[["Debit", "Credit"]].sum()
 
     return df_result
 
+def _header_tuples(header_rows):
+    """
+    Turns the raw month row and Debit/Credit row into (MonthCol, Type) column tuples.
+
+    A month label usually sits above its Debit column only (or spans a merged
+    cell), so it is carried forward to the following Credit column.
+    """
+    month_row, type_row = header_rows
+    tuples = []
+    current_month = None
+    for i, (month, col_type) in enumerate(zip(month_row, type_row)):
+        if month is not None and str(month).strip():
+            current_month = month
+        if col_type is not None and str(col_type).strip().lower() in ("debit", "credit"):
+            col_type = str(col_type).strip().capitalize()
+        tuples.append((
+            current_month if current_month is not None else f"Unnamed: {i}_level_0",
+            col_type if col_type is not None else f"Unnamed: {i}_level_1"
+        ))
+    return tuples
+
+def parse_month_headers(headers):
+    """
+    Maps each distinct month header to the first day of its month.
+
+    'Jan. 2024'-style labels go through _parse_month_year; anything else
+    (e.g., '2024-01-31' or a date cell) goes through the shared date parser.
+    Headers that parse neither way are kept as they are.
+
+    Returns:
+        dict: header -> datetime.date (or the original header)
+    """
+    mapping = {header: _parse_month_year(header) for header in headers}
+    unresolved = [h for h, month in mapping.items() if not isinstance(month, datetime.date)
+                  or isinstance(month, datetime.datetime)]
+    if unresolved:
+        parsed = parse_dates(pd.Series(unresolved, dtype=object))
+        for header, value in zip(unresolved, parsed):
+            if not pd.isna(value):
+                mapping[header] = datetime.date(value.year, value.month, 1)
+    return mapping
+
 def _parse_month_year(text):
     """
     Converts strings like 'Jan. 2024' to a date object of the 1st of that month.
@@ -1,39 +1,43 @@
-import pandas as pd
+from lazy_imports import lazy_import
+from readers.compact import compact_tb_frame, DEFAULT_CURRENCY_PRECISION
+from readers.workbook_loader import load_excel_table, column_labels, read_workbook_sheets
+from profiling import stage
 
-def read_single_tb_excel_dynamic(filepath_or_buffer):
+pd = lazy_import("pandas")
+
+# Bump whenever the reader's output changes, so cached results are invalidated
+READER_VERSION = 2
+
+def read_single_tb_excel_dynamic(filepath_or_buffer, compact=False, currency_precision=DEFAULT_CURRENCY_PRECISION,
+                                 sheets=None):
     """
     Reads a single trial balance (one set of Debit/Credit columns) from Excel.
     Dynamically finds the row where "Debit" and "Credit" appear as headers.
 
     Returns a DataFrame with columns ["Account", "Debit", "Credit"].
+    With compact=True, 'Account' may be categorical and exact integer
+    'debit_minor' / 'credit_minor' columns (in 10**-currency_precision units) are added.
+    With a sheet selector (`sheets`, see workbook_loader.select_sheets), reads
+    each selected sheet and returns {sheet name: DataFrame or exception}.
     """
+    if sheets is not None:
+        return read_workbook_sheets(read_single_tb_excel_dynamic, filepath_or_buffer, sheets,
+                                    compact=compact, currency_precision=currency_precision)
+    with stage("read_single_tb_excel_dynamic") as reading:
+        df = _read_single_tb(filepath_or_buffer, compact, currency_precision)
+        reading.rows = len(df)
+    return df
 
-    temp_df = pd.read_excel(filepath_or_buffer, header=None, dtype=str)
-    header_row_index = None
-    max_rows_to_check = min(20, len(temp_df))
-
-    for i in range(max_rows_to_check):
-        row_values = temp_df.iloc[i].fillna("").str.lower().str.strip().tolist()
-        if "debit" in row_values and "credit" in row_values:
-            header_row_index = i
-            # Debug: print(f"Detected header at row {i}: {row_values}")
-            break
-
-    if header_row_index is None:
-        raise ValueError(
-            "Could not find a row containing 'Debit' and 'Credit' within the first 20 rows."
-        )
 
-    # Now read again, telling Pandas that row is the header
-    df = pd.read_excel(
+def _read_single_tb(filepath_or_buffer, compact, currency_precision):
+    header_rows, df = load_excel_table(
         filepath_or_buffer,
-        header=header_row_index,
-        skiprows=header_row_index + 1,
-        dtype=str
+        is_header=lambda rows: "debit" in rows[0] and "credit" in rows[0],
+        error_message="Could not find a row containing 'Debit' and 'Credit' within the first 20 rows."
     )
 
     # Lowercase columns
-    df.columns = [col.lower().strip() for col in df.columns]
+    df.columns = column_labels(header_rows[0], df.shape[1])
 
     # Identify account column (improved synonyms)
     possible_acct_cols = [
@@ -60,12 +64,17 @@ def read_single_tb_excel_dynamic(filepath_or_buffer):
     df = df[["Account", "Debit", "Credit"]]
 
     # Convert numeric
-    df["Debit"] = pd.to_numeric(df["Debit"], errors="coerce").fillna(0.0)
-    df["Credit"] = pd.to_numeric(df["Credit"], errors="coerce").fillna(0.0)
+    with stage("amount coercion", rows=len(df)):
+        df["Debit"] = pd.to_numeric(df["Debit"], errors="coerce").fillna(0.0)
+        df["Credit"] = pd.to_numeric(df["Credit"], errors="coerce").fillna(0.0)
 
     # Clean up account
     df["Account"] = df["Account"].astype(str).str.strip()
     df = df[df["Account"] != ""]
 
     df.reset_index(drop=True, inplace=True)
+
+    if compact:
+        with stage("compaction", rows=len(df)):
+            df = compact_tb_frame(df, currency_precision)
     return df
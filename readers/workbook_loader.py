@@ -0,0 +1,494 @@
+import fnmatch
+import multiprocessing
+import os
+import posixpath
+import threading
+import tracemalloc
+import zipfile
+from xml.etree import ElementTree
+
+from lazy_imports import lazy_import
+from profiling import stage, profiling, is_profiling, merge_records
+
+openpyxl = lazy_import("openpyxl")
+pd = lazy_import("pandas")
+
+MAX_HEADER_ROWS_TO_CHECK = 20
+
+# Sheet selector choosing every worksheet of a workbook
+ALL_SHEETS = "all"
+
+# Worker processes of the pool reading workbook sheets (see sheet_pool), for a
+# process that is not itself a worker of another pool (see sheet_workers)
+MAX_SHEET_WORKERS = os.cpu_count() or 1
+
+# Start method of the sheet pool workers: a fresh interpreter, so the pool does
+# not inherit the locks and threads of a (possibly multi-threaded) parent
+SHEET_POOL_START_METHOD = "spawn"
+
+_sheet_workers = None  # Budget set by set_sheet_workers, see sheet_workers
+
+
+def open_workbook(filepath_or_buffer):
+    """
+    Opens an Excel workbook in openpyxl's read-only (streaming) mode.
+
+    Read-only worksheets parse their XML lazily, so scanning the first rows
+    does not decode the rest of the sheet.
+    """
+    if hasattr(filepath_or_buffer, "seek"):
+        filepath_or_buffer.seek(0)
+    return openpyxl.load_workbook(filepath_or_buffer, read_only=True, data_only=True)
+
+
+def normalize_header_row(row):
+    """
+    Converts raw header cell values to lowercase, stripped strings ("" for empty cells).
+    """
+    return [str(cell).lower().strip() if cell is not None else "" for cell in row]
+
+
+def column_labels(header_row, width):
+    """
+    Builds unique, lowercase column labels from a raw header row, the same way
+    pandas would: empty cells become 'unnamed: <i>' and repeated names get a
+    '.1', '.2', ... suffix.
+    """
+    labels = []
+    seen = {}
+    values = normalize_header_row(header_row)[:width]
+    values += [""] * (width - len(values))
+    for i, label in enumerate(values):
+        if not label:
+            label = f"unnamed: {i}"
+        if label in seen:
+            seen[label] += 1
+            label = f"{label}.{seen[label]}"
+        else:
+            seen[label] = 0
+        labels.append(label)
+    return labels
+
+
+def find_header(sheet, is_header, header_span=1, max_rows_to_check=MAX_HEADER_ROWS_TO_CHECK):
+    """
+    Scans at most `max_rows_to_check` rows of a read-only worksheet for the header.
+
+    Args:
+        sheet: an openpyxl worksheet opened with read_only=True.
+        is_header (callable): receives a list of `header_span` consecutive rows, each
+            normalized with `normalize_header_row`, and returns True if they form the header.
+        header_span (int): number of rows making up the header (2 for the monthly TB).
+
+    Returns:
+        (index, raw_rows) where index is the 0-based position of the first header row
+        and raw_rows the unnormalized header rows, or (None, None) if nothing matched.
+    """
+    raw = list(sheet.iter_rows(max_row=max_rows_to_check, values_only=True))
+    normalized = [normalize_header_row(row) for row in raw]
+    for i in range(len(raw) - header_span + 1):
+        if is_header(normalized[i:i + header_span]):
+            return i, [list(row) for row in raw[i:i + header_span]]
+    return None, None
+
+
+class WorkbookSheet:
+    """
+    One worksheet of a workbook that is already open (see read_workbook_sheets).
+    The readers accept it in place of a path or buffer and read just that sheet.
+    """
+
+    def __init__(self, excel_file, name):
+        self.excel_file = excel_file  # pd.ExcelFile over the open read-only workbook
+        self.name = name
+
+
+def select_sheets(names, sheets, active=None):
+    """
+    Resolves a sheet selector against the worksheet names of a workbook.
+
+    Args:
+        names (list): Worksheet names, in tab order.
+        sheets: None (the active sheet), ALL_SHEETS, a 0-based index (negative
+                counts from the end), a name or glob pattern matched without
+                regard to case (e.g. "Entity *"; Excel does not allow * ? [ ] in
+                sheet names), or a list of those.
+        active (str): Name of the active sheet (defaults to the first).
+
+    Returns:
+        list: The selected names, in tab order.
+    """
+    if not names:
+        raise ValueError("The workbook has no worksheets.")
+    if sheets is None:
+        return [active if active in names else names[0]]
+    selected = set()
+    for selector in (sheets if isinstance(sheets, (list, tuple)) else [sheets]):
+        if isinstance(selector, int):
+            if not -len(names) <= selector < len(names):
+                raise ValueError(f"Sheet index {selector} is out of range: the workbook has {len(names)} sheet(s).")
+            selected.add(names[selector])
+        elif selector == ALL_SHEETS:
+            selected.update(names)
+        else:
+            matches = [name for name in names if fnmatch.fnmatchcase(name.lower(), str(selector).lower())]
+            if not matches:
+                shown = ", ".join(names[:10]) + (", ..." if len(names) > 10 else "")
+                raise ValueError(f"No sheet matches '{selector}' (sheets: {shown}).")
+            selected.update(matches)
+    return [name for name in names if name in selected]
+
+
+def set_sheet_workers(max_workers):
+    """
+    Sets the number of sheets this process reads at the same time. Callers
+    spreading files over their own process pool (validate_files, the serve
+    workers) give each worker its share of the CPUs, so the sheet pools of all
+    workers together do not exceed them.
+    """
+    global _sheet_workers
+    _sheet_workers = max(int(max_workers), 1)
+
+
+def sheet_workers():
+    """
+    Sheet reading budget of this process: the one given to set_sheet_workers,
+    else 1 inside a worker process (its parent already spreads the work over
+    the CPUs), else MAX_SHEET_WORKERS.
+    """
+    if _sheet_workers is not None:
+        return _sheet_workers
+    return 1 if multiprocessing.parent_process() is not None else MAX_SHEET_WORKERS
+
+
+def read_workbook_sheets(reader, filepath_or_buffer, sheets, max_workers=None, **options):
+    """
+    Runs `reader` on each sheet chosen by `sheets`.
+
+    The header detection and parsing of the sheets of a workbook on disk run
+    concurrently in the processes of sheet_pool (parsing is pure Python, so
+    threads would only take turns). The selected sheets are split into one
+    batch per worker, and each worker opens the workbook from its path once
+    for its batch. A buffer, a single sheet or max_workers=1 is read in this
+    process, with the workbook opened once for all of its sheets.
+
+    Args:
+        reader (callable): One of the dynamic Excel readers.
+        filepath_or_buffer: path or file-like object of an .xlsx workbook.
+        sheets: sheet selector (see select_sheets).
+        max_workers (int): Largest number of sheets read at the same time
+                           (default: sheet_workers()).
+        options: Keyword arguments passed on to `reader`.
+
+    Returns:
+        dict: {sheet name: reader result}, in tab order. A sheet that could not
+              be read maps to the exception it raised, so one bad sheet (e.g. a
+              cover page) does not lose the others.
+    """
+    max_workers = max_workers or sheet_workers()
+    if not hasattr(filepath_or_buffer, "seek") and max_workers > 1:
+        # The sheet names come straight from the archive; the workers load the workbook itself
+        all_names, active = workbook_sheet_names(filepath_or_buffer)
+        names = select_sheets(all_names, sheets, active)
+        if len(names) > 1:
+            return _read_sheets_in_pool(reader, filepath_or_buffer, names, max_workers, options)
+
+    with stage("workbook opening"):
+        wb = open_workbook(filepath_or_buffer)
+        excel_file = pd.ExcelFile(wb, engine="openpyxl")
+    try:
+        names = select_sheets([ws.title for ws in wb.worksheets], sheets, wb.active.title)
+        return {name: _read_sheet(reader, excel_file, name, options) for name in names}
+    finally:
+        excel_file.close()
+
+
+_sheet_pools = {}  # max_workers -> ProcessPoolExecutor, see sheet_pool
+_sheet_pools_lock = threading.Lock()
+
+
+def sheet_pool(max_workers=MAX_SHEET_WORKERS):
+    """
+    Process pool reading workbook sheets, created on first use (with
+    SHEET_POOL_START_METHOD) and shared by every later read_workbook_sheets
+    call of this process, so a run with many workbooks starts its workers once.
+    """
+    with _sheet_pools_lock:
+        if max_workers not in _sheet_pools:
+            from concurrent.futures import ProcessPoolExecutor
+
+            _sheet_pools[max_workers] = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context(SHEET_POOL_START_METHOD))
+        return _sheet_pools[max_workers]
+
+
+def _read_sheets_in_pool(reader, path, names, max_workers, options):
+    from concurrent.futures.process import BrokenProcessPool
+
+    executor = sheet_pool(max_workers)
+    workers = min(max_workers, len(names))
+    profile, memory = is_profiling(), tracemalloc.is_tracing()
+    futures = [executor.submit(_read_sheets_in_worker, reader, path, names[i::workers], options, profile, memory)
+               for i in range(workers)]
+    outcomes = {}
+    try:
+        for future in futures:
+            results, records = future.result()
+            merge_records(records)
+            outcomes.update(results)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); the next call starts a new pool
+        with _sheet_pools_lock:
+            if _sheet_pools.get(max_workers) is executor:
+                del _sheet_pools[max_workers]
+        raise
+    return {name: outcomes[name] for name in names}
+
+
+def _read_sheet(reader, excel_file, name, options):
+    with stage(f"sheet {name}"):
+        try:
+            return reader(WorkbookSheet(excel_file, name), **options)
+        except Exception as ex:
+            return ex
+
+
+def _read_sheets_in_worker(reader, path, names, options, profile, memory):
+    """
+    Reads a batch of sheets in a sheet_pool worker, opening the workbook from
+    its path once for the batch.
+
+    Returns:
+        ({sheet name: result}, stage records)
+    """
+    if not profile:
+        return _read_sheet_batch(reader, path, names, options), []
+    with profiling(memory=memory) as records:
+        results = _read_sheet_batch(reader, path, names, options)
+    return results, records
+
+
+def _read_sheet_batch(reader, path, names, options):
+    with stage("workbook opening"):
+        excel_file = pd.ExcelFile(open_workbook(path), engine="openpyxl")
+    try:
+        return {name: _read_sheet(reader, excel_file, name, options) for name in names}
+    finally:
+        excel_file.close()
+
+
+def load_excel_table(filepath_or_buffer, is_header, header_span=1, error_message=None,
+                     max_rows_to_check=MAX_HEADER_ROWS_TO_CHECK):
+    """
+    Finds the header with a bounded read-only scan, then parses the sheet exactly once.
+
+    The workbook is opened a single time; pandas reuses the already opened
+    read-only workbook for the full parse, starting at the detected header row.
+
+    Args:
+        filepath_or_buffer: path or file-like object of an .xlsx workbook (its
+            active sheet is read), or a WorkbookSheet of an already open one.
+        is_header (callable): see `find_header`.
+        header_span (int): number of header rows.
+        error_message (str): message of the ValueError raised if no header is found.
+
+    Returns:
+        (header_rows, body)
+        - header_rows: list of `header_span` raw header rows, padded to the body width.
+        - body: DataFrame of the rows below the header, all values as strings,
+                with positional integer column labels.
+    """
+    shared = isinstance(filepath_or_buffer, WorkbookSheet)
+    with stage("header detection"):
+        if shared:
+            wb = filepath_or_buffer.excel_file.book
+            sheet = wb[filepath_or_buffer.name]
+        else:
+            wb = open_workbook(filepath_or_buffer)
+            sheet = wb.active  # Use the active sheet, as the readers always have
+        header_index, header_rows = find_header(sheet, is_header, header_span, max_rows_to_check)
+
+    if header_index is None:
+        if not shared:
+            wb.close()
+        raise ValueError(error_message or "Could not find the header row in the first "
+                                          f"{max_rows_to_check} rows.")
+
+    # Single full parse; pandas closes the workbook when it is done (a shared
+    # workbook stays open for its other sheets)
+    with stage("excel parsing") as parsing:
+        frame = pd.read_excel(
+            filepath_or_buffer.excel_file if shared else wb,
+            engine="openpyxl",
+            sheet_name=sheet.title,
+            header=None,
+            skiprows=header_index,
+            dtype=str
+        )
+        parsing.rows = len(frame)
+
+    width = frame.shape[1]
+    header_rows = [(row + [None] * width)[:width] for row in header_rows]
+    body = frame.iloc[header_span:].reset_index(drop=True)
+    return header_rows, body
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _column_index(cell_ref):
+    """
+    Converts the letters of a cell reference ('C4') to a 0-based column index.
+    """
+    index = 0
+    for char in cell_ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + (ord(char.upper()) - ord("A") + 1)
+    return index - 1
+
+
+def _workbook_sheets(archive):
+    """
+    Lists the sheets of an open .xlsx archive from its workbook part.
+
+    Returns:
+        (sheets, active_tab): sheets is a list of (name, archive member, is_worksheet)
+                              in tab order; active_tab the position of the active one.
+    """
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    active_tab = 0
+    entries = []
+    for element in workbook.iter():
+        name = _local_name(element.tag)
+        if name == "workbookView":
+            active_tab = int(element.get("activeTab", 0))
+        elif name == "sheet":
+            rel_id = next(value for key, value in element.attrib.items() if _local_name(key) == "id")
+            entries.append((element.get("name"), rel_id))
+
+    rels = {rel.get("Id"): rel for rel in ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))}
+    sheets = []
+    for name, rel_id in entries:
+        target = rels[rel_id].get("Target")
+        path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+        sheets.append((name, path, rels[rel_id].get("Type", "").endswith("/worksheet")))
+    return sheets, min(active_tab, len(sheets) - 1)
+
+
+def _active_sheet_path(archive):
+    """
+    Resolves the archive member holding the workbook's active sheet.
+    """
+    sheets, active_tab = _workbook_sheets(archive)
+    return sheets[active_tab][1]
+
+
+def workbook_sheet_names(filepath_or_buffer):
+    """
+    Reads the worksheet names straight from the .xlsx archive, without loading
+    any sheet or the shared strings (chart sheets are left out).
+
+    Returns:
+        (names, active): names in tab order, and the name of the active sheet.
+    """
+    if hasattr(filepath_or_buffer, "seek"):
+        filepath_or_buffer.seek(0)
+    with zipfile.ZipFile(filepath_or_buffer) as archive:
+        sheets, active_tab = _workbook_sheets(archive)
+    return [name for name, _, is_worksheet in sheets if is_worksheet], sheets[active_tab][0]
+
+
+def _shared_strings(archive, needed):
+    """
+    Streams the shared string table only as far as the largest index in `needed`.
+    """
+    if not needed or "xl/sharedStrings.xml" not in archive.namelist():
+        return {}
+    last = max(needed)
+    strings = {}
+    index = 0
+    with archive.open("xl/sharedStrings.xml") as f:
+        for _, element in ElementTree.iterparse(f):
+            if _local_name(element.tag) != "si":
+                continue
+            if index in needed:
+                strings[index] = _string_item_text(element)
+            element.clear()
+            if index >= last:
+                break
+            index += 1
+    return strings
+
+
+def _string_item_text(element):
+    """
+    Text of a shared (<si>) or inline (<is>) string: a plain <t>, or the <t> of
+    each rich-text run (<r>). Phonetic hints (<rPh>) are skipped.
+    """
+    parts = []
+    for child in element:
+        name = _local_name(child.tag)
+        if name == "t":
+            parts.append(child.text or "")
+        elif name == "r":
+            parts.extend(t.text or "" for t in child if _local_name(t.tag) == "t")
+    return "".join(parts)
+
+
+def read_xlsx_head(filepath_or_buffer, max_rows=MAX_HEADER_ROWS_TO_CHECK):
+    """
+    Reads the first `max_rows` rows of the active sheet straight from the .xlsx
+    XML, stopping as soon as they are read.
+
+    Unlike openpyxl (even in read-only mode), this never loads the full shared
+    string table or scans the sheet for its size, so the cost does not grow
+    with the file. Meant for classification; values are the raw cell text
+    (numbers and dates unconverted), with gaps filled like openpyxl's iter_rows.
+
+    Returns:
+        list: up to `max_rows` lists of cell values (None for empty cells).
+    """
+    if hasattr(filepath_or_buffer, "seek"):
+        filepath_or_buffer.seek(0)
+    with zipfile.ZipFile(filepath_or_buffer) as archive:
+        rows = []
+        shared_refs = set()
+        with archive.open(_active_sheet_path(archive)) as sheet:
+            row = None
+            for _, element in ElementTree.iterparse(sheet):
+                name = _local_name(element.tag)
+                if name == "c":
+                    row = row if row is not None else []
+                    ref = element.get("r")
+                    column = _column_index(ref) if ref else len(row)
+                    cell_type = element.get("t")
+                    value = None
+                    if cell_type == "inlineStr":
+                        inline = next((child for child in element if _local_name(child.tag) == "is"), None)
+                        value = _string_item_text(inline) if inline is not None else None
+                    else:
+                        v = next((child for child in element if _local_name(child.tag) == "v"), None)
+                        if v is not None and v.text is not None:
+                            value = v.text
+                            if cell_type == "s":
+                                value = ("shared", int(value))
+                                shared_refs.add(value[1])
+                    row.extend([None] * (column + 1 - len(row)))
+                    row[column] = value
+                    element.clear()
+                elif name == "row":
+                    row_number = int(element.get("r", len(rows) + 1))
+                    rows.extend([] for _ in range(min(row_number - 1, max_rows) - len(rows)))
+                    if len(rows) < max_rows:
+                        rows.append(row or [])
+                    row = None
+                    element.clear()
+                    if len(rows) >= max_rows:
+                        break
+                elif name == "sheetData":
+                    break
+
+        strings = _shared_strings(archive, shared_refs)
+    return [[strings.get(value[1]) if isinstance(value, tuple) else value for value in row] for row in rows]
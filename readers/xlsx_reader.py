@@ -1,39 +1,67 @@
-import openpyxl
+from readers.chunking import iter_chunks, DEFAULT_CHUNK_SIZE
+from readers.workbook_loader import open_workbook, select_sheets
 
-def read_xlsx_file(file_path):
+def iter_xlsx_rows(filepath_or_buffer, sheet=None):
+    """
+    Streams rows from one sheet of an XLSX (Excel) file, one dictionary at a time.
+
+    The workbook is opened in openpyxl's read-only mode, so rows are parsed
+    as they are consumed instead of loading the whole sheet.
+
+    Args:
+        filepath_or_buffer: The path to the XLSX file, or a binary file-like object
+                            such as an in-memory upload.
+        sheet: Name, name pattern or 0-based index of the sheet to read (the first
+               match of a pattern); the active sheet by default.
+
+    Yields:
+        dict: One data row, keyed by the header names from the first row.
+    """
+    workbook = open_workbook(filepath_or_buffer)
+    try:
+        names = [worksheet.title for worksheet in workbook.worksheets]
+        worksheet = workbook.active if sheet is None else workbook[select_sheets(names, sheet)[0]]
+        rows = worksheet.iter_rows(values_only=True)
+        header_row = next(rows, None)  # Assume headers are in the first row
+        if header_row is None:
+            return
+        headers = [(i, header) for i, header in enumerate(header_row) if header]  # Skip empty headers
+
+        for row_values in rows:
+            yield {
+                header: row_values[i] if i < len(row_values) else None  # Handle potential shorter rows
+                for i, header in headers
+            }
+    finally:
+        workbook.close()
+
+def iter_xlsx_chunks(filepath_or_buffer, chunk_size=DEFAULT_CHUNK_SIZE, sheet=None):
+    """
+    Streams rows from an XLSX file in lists of at most `chunk_size` dictionaries.
+    """
+    return iter_chunks(iter_xlsx_rows(filepath_or_buffer, sheet), chunk_size)
+
+def read_xlsx_file(file_path, sheet=None):
     """
     Reads data from an XLSX (Excel) file.
 
     Args:
-        file_path (str): The path to the XLSX file.
+        file_path: The path to the XLSX file, or a binary file-like object.
+        sheet: Sheet to read (see iter_xlsx_rows); the active sheet by default.
 
     Returns:
         list: A list of dictionaries, where each dictionary represents a row
               in the XLSX file. The keys are the header names from the first row.
               Returns an empty list if there's an error reading the file.
     """
-    data = []
     try:
-        workbook = openpyxl.load_workbook(file_path)
-        sheet = workbook.active  # Get the active sheet
-
-        header_row = [cell.value for cell in sheet[1]]  # Assume headers are in the first row
-
-        for row_num in range(2, sheet.max_row + 1):  # Start from row 2 (after headers)
-            row_values = [cell.value for cell in sheet[row_num]]
-            row_dict = {}
-            for i, header in enumerate(header_row):
-                if header: # Ensure header is not None
-                    row_dict[header] = row_values[i] if i < len(row_values) else None # Handle potential shorter rows
-            data.append(row_dict)
-
+        return list(iter_xlsx_rows(file_path, sheet))
     except FileNotFoundError:
         print(f"Error: File not found at path: {file_path}")
         return []  # Return empty list to indicate failure
     except Exception as e:
         print(f"Error reading XLSX file: {e}")
         return []  # Return empty list to indicate failure
-    return data
 
 if __name__ == '__main__':
     # Example usage (for testing the XLSX reader module independently)
@@ -44,4 +72,4 @@ if __name__ == '__main__':
         for row in data[:5]: # Print first 5 rows as example
             print(row)
     else:
-        print(f"No data read from {example_file} or an error occurred.")
\ No newline at end of file
+        print(f"No data read from {example_file} or an error occurred.")
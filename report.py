@@ -1,20 +1,179 @@
 import datetime
+import html
+import io
+import re
 
-def generate_html_report(results_dict):
+from profiling import stage
+
+# Sample occurrences listed under each grouped finding
+SAMPLES_PER_FINDING = 10
+# Distinct findings kept per file and severity; the rest are only counted
+MAX_FINDINGS_PER_SECTION = 200
+# Sections with more distinct findings than this start collapsed
+COLLAPSE_THRESHOLD = 20
+
+# Per-row messages of the validators, split into the rule they break, the row and
+# the offending value, so that e.g. 400k "Row N: Invalid date ..." errors become one
+# finding. Tried in order; a message matching none is a finding of its own.
+FINDING_PATTERNS = [
+    re.compile(r"^Row (?P<row>\d+): (?P<rule>Missing required field: '[^']*')\.$"),
+    re.compile(r"^Row (?P<row>\d+): (?P<rule>Invalid debit or credit value): (?P<value>.*)\. Must be a number\.$"),
+    re.compile(r"^Row (?P<row>\d+): (?P<rule>.*?),? got: '(?P<value>.*)'\.$"),
+    re.compile(r"^Row (?P<row>\d+): (?P<rule>.*? field): '(?P<value>.*)'\.$"),
+    re.compile(r"^Row (?P<row>\d+): (?P<rule>.*)$"),
+]
+
+
+def split_finding(message):
     """
-    Generates an HTML report summarizing validation results.
-    results_dict format:
-      {
-         "fileA.xlsx": {"errors": [...], "warnings": [...]},
-         "fileB.xlsx": {"errors": [...], "warnings": [...]},
-      }
-    Returns an HTML string.
+    Splits a validation message into (rule, row, value); row and value may be None.
+    """
+    for pattern in FINDING_PATTERNS:
+        match = pattern.match(message)
+        if match:
+            groups = match.groupdict()
+            return groups["rule"], groups.get("row"), groups.get("value")
+    return message, None, None
+
+
+def group_findings(messages, samples=SAMPLES_PER_FINDING, max_findings=MAX_FINDINGS_PER_SECTION):
+    """
+    Groups messages by rule, in order of first appearance.
+
+    Memory stays bounded whatever the number of messages: at most `max_findings`
+    rules are kept, each with at most `samples` (row, value) samples.
+
+    Returns:
+        (findings, overflow)
+        - findings: list of {"rule", "count", "samples": [(row, value), ...]}
+        - overflow: (distinct rules, occurrences) beyond `max_findings`, only counted
+    """
+    findings = {}
+    overflow_rules = set()
+    overflow_count = 0
+    for message in messages:
+        rule, row, value = split_finding(str(message))
+        finding = findings.get(rule)
+        if finding is None:
+            if len(findings) >= max_findings:
+                # Hashes only, so even millions of distinct messages stay small
+                overflow_rules.add(hash(rule))
+                overflow_count += 1
+                continue
+            finding = findings[rule] = {"rule": rule, "count": 0, "samples": []}
+        finding["count"] += 1
+        if (row is not None or value is not None) and len(finding["samples"]) < samples:
+            finding["samples"].append((row, value))
+    return list(findings.values()), (len(overflow_rules), overflow_count)
+
+
+def _summarize(messages):
+    """
+    Grouped findings of a section: straight from the arrays of a Findings-backed
+    message list (validators.findings), else by parsing the message strings.
+    """
+    if hasattr(messages, "findings"):
+        groups = messages.findings.summary(messages.severity, SAMPLES_PER_FINDING)
+        shown, hidden = groups[:MAX_FINDINGS_PER_SECTION], groups[MAX_FINDINGS_PER_SECTION:]
+        return shown, (len(hidden), sum(group["count"] for group in hidden))
+    return group_findings(messages)
+
+
+def _write_section(out, css_class, title, messages):
+    findings, (overflow_rules, overflow_count) = _summarize(messages)
+    total = sum(f["count"] for f in findings) + overflow_count
+    distinct = len(findings) + overflow_rules
+    summary = f"{title}: {total} ({distinct} distinct)"
+
+    if distinct > COLLAPSE_THRESHOLD:
+        out.write(f"<details><summary class='{css_class}'><strong>{summary}</strong></summary>\n<ul>\n")
+    else:
+        out.write(f"<h3 class='{css_class}'>{summary}</h3>\n<ul>\n")
+
+    for finding in findings:
+        count = f" <span class='count'>&times; {finding['count']}</span>" if finding["count"] > 1 else ""
+        out.write(f"<li>{html.escape(finding['rule'])}{count}")
+        if finding["samples"]:
+            samples = ", ".join(
+                (f"row {row}" if row is not None else "") +
+                (": " if row is not None and value is not None else "") +
+                (f"'{value}'" if value is not None else "")
+                for row, value in finding["samples"]
+            )
+            more = finding["count"] - len(finding["samples"])
+            more = f" and {more} more" if more > 0 else ""
+            out.write(f"<div class='samples'>{html.escape(samples)}{more}</div>")
+        out.write("</li>\n")
+
+    if overflow_count:
+        out.write(f"<li><em>... and {overflow_rules} more distinct findings "
+                  f"({overflow_count} occurrences) not shown.</em></li>\n")
+    out.write("</ul>\n")
+    if distinct > COLLAPSE_THRESHOLD:
+        out.write("</details>\n")
+
+
+def write_html_report(results_dict, out):
     """
+    Writes the HTML validation report incrementally to `out`.
+
+    Identical findings are grouped by rule with a count and a few sample rows,
+    so the report size and memory stay bounded however many rows fail.
+
+    Args:
+        results_dict (dict): {"fileA.xlsx": {"errors": [...], "warnings": [...]}, ...}; a
+            multi-sheet workbook's entry also has "sheets": {sheet name: {"errors": [...],
+            "warnings": [...]}}, reported as one subsection per sheet.
+        out: path of the HTML file to write, or a text file object.
+    """
+    if isinstance(out, str):
+        with open(out, "w", encoding="utf-8") as f:
+            write_html_report(results_dict, f)
+        return
+
+    messages = sum(sum(_counts(v)) for v in results_dict.values())
+    with stage("write_html_report", rows=messages):
+        _write_report(results_dict, out)
+
+
+def _counts(outcome):
+    """(errors, warnings) of a file's outcome, its sheets included."""
+    parts = [outcome] + list(outcome.get("sheets", {}).values())
+    return (sum(len(part.get("errors", [])) for part in parts),
+            sum(len(part.get("warnings", [])) for part in parts))
+
+
+def _write_outcome(out, outcome):
+    errors = outcome.get("errors", [])
+    warnings = outcome.get("warnings", [])
+    if errors:
+        _write_section(out, "error", "Errors", errors)
+    if warnings:
+        _write_section(out, "warning", "Warnings", warnings)
+
+
+def _write_sheets(out, sheets):
+    """One subsection per sheet with findings; the clean sheets are listed together."""
+    clean = []
+    for sheet, outcome in sheets.items():
+        if not any(_counts(outcome)):
+            clean.append(sheet)
+            continue
+        out.write(f"<div class='sheet-section'><h3>Sheet: {html.escape(str(sheet))}</h3>\n")
+        _write_outcome(out, outcome)
+        out.write("</div>\n")
+    if clean:
+        out.write(f"<p>No issues found in {len(clean)} sheet(s): "
+                  f"{html.escape(', '.join(map(str, clean)))}.</p>\n")
+
+
+def _write_report(results_dict, out):
     now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    total_errors = sum(len(v["errors"]) for v in results_dict.values())
-    total_warnings = sum(len(v["warnings"]) for v in results_dict.values())
+    counts = [_counts(v) for v in results_dict.values()]
+    total_errors = sum(e for e, _ in counts)
+    total_warnings = sum(w for _, w in counts)
 
-    html = [
+    out.write("\n".join([
         "<html>",
         "<head>",
         "<title>Validation Report</title>",
@@ -23,31 +182,41 @@ def generate_html_report(results_dict):
         ".error { color: red; }",
         ".warning { color: orange; }",
         ".file-section { margin-bottom: 20px; }",
+        ".sheet-section { margin-left: 1.5em; }",
+        ".count { color: #555; }",
+        ".samples { color: #555; font-size: smaller; }",
+        "summary { cursor: pointer; margin: 1em 0; }",
         "</style>",
         "</head>",
         "<body>",
         f"<h1>Financial Validation Report</h1>",
         f"<p>Generated on: {now}</p>",
         f"<p><strong>Total Errors: {total_errors}, Total Warnings: {total_warnings}</strong></p>",
-        "<hr/>"
-    ]
+        "<hr/>",
+    ]) + "\n")
 
     for fname, outcome in results_dict.items():
-        errors = outcome.get("errors", [])
-        warnings = outcome.get("warnings", [])
-        html.append(f"<div class='file-section'><h2>{fname}</h2>")
-        if errors:
-            html.append("<h3 class='error'>Errors:</h3><ul>")
-            for e in errors:
-                html.append(f"<li>{e}</li>")
-            html.append("</ul>")
-        if warnings:
-            html.append("<h3 class='warning'>Warnings:</h3><ul>")
-            for w in warnings:
-                html.append(f"<li>{w}</li>")
-            html.append("</ul>")
-        if not errors and not warnings:
-            html.append("<p>No issues found.</p>")
-        html.append("</div>")
-    html.append("</body></html>")
-    return "\n".join(html)
+        out.write(f"<div class='file-section'><h2>{html.escape(str(fname))}</h2>\n")
+        _write_outcome(out, outcome)
+        if "sheets" in outcome:
+            _write_sheets(out, outcome["sheets"])
+        elif not outcome.get("errors") and not outcome.get("warnings"):
+            out.write("<p>No issues found.</p>\n")
+        out.write("</div>\n")
+    out.write("</body></html>")
+
+
+def generate_html_report(results_dict):
+    """
+    Generates an HTML report summarizing validation results.
+    results_dict format:
+      {
+         "fileA.xlsx": {"errors": [...], "warnings": [...]},
+         "fileB.xlsx": {"errors": [...], "warnings": [...],
+                        "sheets": {"Entity 01": {"errors": [...], "warnings": [...]}, ...}},
+      }
+    Returns an HTML string (see write_html_report to write it to a file directly).
+    """
+    buffer = io.StringIO()
+    write_html_report(results_dict, buffer)
+    return buffer.getvalue()
@@ -1,42 +1,192 @@
+import codecs
+import csv
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from readers.file_type import sniff_file_type
+from readers.workbook_loader import read_xlsx_head, normalize_header_row, MAX_HEADER_ROWS_TO_CHECK
+
+# Keywords to identify document types (case-insensitive), in order of precedence
+DOCUMENT_KEYWORDS = {
+    "Trial Balance": ["account number", "account name", "debit", "credit", "trial balance"],
+    "General Ledger": ["account", "description", "amount", "date", "transaction", "general ledger"],
+    "P&L": ["revenue", "sales", "cost of goods sold", "expenses", "net income", "profit and loss",
+            "income statement"],  # Profit & Loss Statement
+    "Balance Sheet": ["assets", "liabilities", "equity", "balance sheet", "statement of financial position"],
+}
+# Number of a type's keywords the headers must contain to be identified as that type
+KEYWORD_THRESHOLD = 2
+
+# Header cells the Excel readers look for (see the readers' header checks)
+_GL_AMOUNT_HEADERS = ("amount", "amt", "total amount")
+
+
+def _compile_keywords(keyword_sets):
+    """
+    Builds one regex finding every keyword occurrence in a single pass.
+
+    The alternation sits in a lookahead so a match is tried at every position
+    (keywords may overlap), longest keyword first. A match also credits the
+    shorter keywords it contains ('account name' contains 'account').
+    """
+    keywords = sorted({kw for kws in keyword_sets.values() for kw in kws}, key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(re.escape(kw) for kw in keywords) + "))")
+    contained = {kw: {other for other in keywords if other in kw} for kw in keywords}
+    return pattern, contained
+
+_KEYWORD_PATTERN, _CONTAINED_KEYWORDS = _compile_keywords(DOCUMENT_KEYWORDS)
+
+
+def matched_keywords(headers):
+    """
+    Returns the set of keywords found in any of the (lowercase) headers.
+    """
+    found = set()
+    # Headers are joined with newlines, which no keyword contains
+    for match in _KEYWORD_PATTERN.finditer("\n".join(headers)):
+        found |= _CONTAINED_KEYWORDS[match.group(1)]
+    return found
+
+
+def classify_headers(headers):
+    """
+    Identifies the document type from a list of lowercase column headers.
+
+    Returns:
+        (document_type, confidence)
+        - document_type: "Trial Balance", "General Ledger", "P&L", "Balance Sheet" or "Unknown".
+          The first type (in DOCUMENT_KEYWORDS order) with at least KEYWORD_THRESHOLD
+          keywords present wins.
+        - confidence: {document type: share of its keywords present, 0.0 to 1.0}
+    """
+    found = matched_keywords(headers)
+    counts = {doc_type: len(found.intersection(keywords)) for doc_type, keywords in DOCUMENT_KEYWORDS.items()}
+    confidence = {doc_type: counts[doc_type] / len(keywords) for doc_type, keywords in DOCUMENT_KEYWORDS.items()}
+    document_type = next((doc_type for doc_type, count in counts.items() if count >= KEYWORD_THRESHOLD), "Unknown")
+    return document_type, confidence
+
+
 def identify_document_type(data):
     """
     Identifies the type of financial document based on column headers.
 
     Args:
-        data (list): A list of dictionaries representing the data read from a file.
-                       Each dictionary is assumed to represent a row, and keys are column headers.
+        data (iterable): A list of dictionaries, or a row iterator such as
+                       iter_csv_rows / iter_xlsx_rows. Each dictionary is assumed to
+                       represent a row, and keys are column headers. Only the first
+                       row is consumed.
 
     Returns:
         str: The identified document type. Possible values:
              "Trial Balance", "General Ledger", "P&L", "Balance Sheet", "Unknown".
              Returns "Unknown" if the document type cannot be confidently identified.
     """
-    if not data or not data[0]:  # Check if data is empty or has no headers
+    first_row = next(iter(data), None) if data is not None else None
+    if not first_row:  # Check if data is empty or has no headers
         return "Unknown"
 
-    headers = [header.lower() for header in data[0].keys() if header] # Get headers, lowercase for easier matching
-
-    # Keywords to identify document types (case-insensitive)
-    trial_balance_keywords = ["account number", "account name", "debit", "credit", "trial balance"]
-    general_ledger_keywords = ["account", "description", "amount", "date", "transaction", "general ledger"]
-    profit_loss_keywords = ["revenue", "sales", "cost of goods sold", "expenses", "net income", "profit and loss", "income statement"]
-    balance_sheet_keywords = ["assets", "liabilities", "equity", "balance sheet", "statement of financial position"]
-
-    def has_keywords(headers_list, keywords_list, threshold=2):
-        """Checks if at least 'threshold' keywords from keywords_list are present in headers_list."""
-        count = sum(1 for keyword in keywords_list if any(keyword in header for header in headers_list))
-        return count >= threshold
-
-    if has_keywords(headers, trial_balance_keywords):
-        return "Trial Balance"
-    elif has_keywords(headers, general_ledger_keywords):
-        return "General Ledger"
-    elif has_keywords(headers, profit_loss_keywords):
-        return "P&L" # Profit & Loss Statement
-    elif has_keywords(headers, balance_sheet_keywords):
-        return "Balance Sheet"
+    headers = [str(header).lower() for header in first_row.keys() if header] # Get headers, lowercase for easier matching
+    return classify_headers(headers)[0]
+
+
+def read_header_rows(filepath_or_buffer, max_rows=MAX_HEADER_ROWS_TO_CHECK, file_type=None):
+    """
+    Reads only the first `max_rows` rows of a CSV or XLSX file (path or binary buffer).
+
+    Returns:
+        list: rows normalized with normalize_header_row (lowercase stripped strings).
+    """
+    file_type = file_type or sniff_file_type(filepath_or_buffer)
+    if file_type == "xlsx":
+        rows = read_xlsx_head(filepath_or_buffer, max_rows)
+    elif file_type == "csv":
+        if hasattr(filepath_or_buffer, "read"):
+            filepath_or_buffer.seek(0)
+            rows = list(islice(csv.reader(codecs.getreader("utf-8-sig")(filepath_or_buffer)), max_rows))
+            filepath_or_buffer.seek(0)
+        else:
+            with open(filepath_or_buffer, mode="r", encoding="utf-8-sig", newline="") as f:
+                rows = list(islice(csv.reader(f), max_rows))
     else:
-        return "Unknown"
+        raise ValueError(f"Unsupported file content (detected type: {file_type}).")
+    return [normalize_header_row(row) for row in rows]
+
+
+def _reader_kind(document_type, header):
+    """
+    Names the Excel reader ("single_tb", "monthly_tb" or "gl") whose header check
+    the given normalized header row passes, or None.
+    """
+    if document_type == "Trial Balance" and "debit" in header and "credit" in header:
+        # A monthly TB repeats the Debit/Credit pair under each month
+        return "monthly_tb" if header.count("debit") > 1 else "single_tb"
+    if document_type == "General Ledger" and "date" in header and any(h in _GL_AMOUNT_HEADERS for h in header):
+        return "gl"
+    return None
+
+
+def classify_file(filepath_or_buffer, max_rows=MAX_HEADER_ROWS_TO_CHECK):
+    """
+    Classifies a CSV or XLSX file from its header region only, however large the file.
+
+    The first `max_rows` rows are scanned for the header the same way the Excel
+    readers hunt for it (exports often start with title rows): the first row
+    identified as a known document type is taken as the header.
+
+    Returns:
+        dict with
+        - "document_type": as identify_document_type.
+        - "confidence": {document type: share of its keywords in the header row}
+          (for "Unknown", the best share reached by any scanned row).
+        - "header_row": 0-based index of the header row, or None.
+        - "kind": "single_tb", "monthly_tb" or "gl" when the matching Excel reader
+          can read the file, else None.
+        - "file_type": "csv" or "xlsx", detected from the content.
+    """
+    file_type = sniff_file_type(filepath_or_buffer)
+    rows = read_header_rows(filepath_or_buffer, max_rows, file_type)
+
+    best = {doc_type: 0.0 for doc_type in DOCUMENT_KEYWORDS}
+    for index, row in enumerate(rows):
+        document_type, confidence = classify_headers([cell for cell in row if cell])
+        if document_type != "Unknown":
+            return {
+                "document_type": document_type,
+                "confidence": confidence,
+                "header_row": index,
+                "kind": _reader_kind(document_type, row),
+                "file_type": file_type,
+            }
+        best = {doc_type: max(best[doc_type], confidence[doc_type]) for doc_type in best}
+    return {"document_type": "Unknown", "confidence": best, "header_row": None, "kind": None,
+            "file_type": file_type}
+
+
+def classify_directory(directory, max_workers=None, extensions=(".csv", ".xlsx")):
+    """
+    Classifies every CSV / XLSX file in `directory` (not recursive) in parallel.
+
+    Returns:
+        dict: {file path: classify_file result}, in file name order. A file that
+              cannot be read gets {"document_type": "Unknown", "error": message}.
+    """
+    paths = sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(tuple(extensions)) and os.path.isfile(os.path.join(directory, name))
+    )
+
+    def _classify(path):
+        try:
+            return classify_file(path)
+        except Exception as ex:
+            return {"document_type": "Unknown", "error": str(ex)}
+
+    # Header reads are short and mostly I/O and decompression, so threads suffice
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(paths, executor.map(_classify, paths)))
+
 
 if __name__ == '__main__':
     # Example Usage and Testing
@@ -90,4 +240,4 @@ if __name__ == '__main__':
     print(f"Unknown Data identified as: {doc_type_unknown}") # Expected: Unknown
 
     doc_type_empty = identify_document_type([]) # Empty data
-    print(f"Empty Data identified as: {doc_type_empty}") # Expected: Unknown
\ No newline at end of file
+    print(f"Empty Data identified as: {doc_type_empty}") # Expected: Unknown
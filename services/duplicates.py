@@ -0,0 +1,49 @@
+from readers.cache import cached_read
+from readers.gl_reader import read_gl_excel_dynamic
+from validators.duplicate_validator import (
+    NEAR_DUPLICATE_DAYS, find_duplicate_transactions, duplicate_messages
+)
+
+# Name of the duplicate check in the validation results / report
+DUPLICATES_NAME = "Duplicate transactions"
+
+
+def duplicate_files(gl_paths, cache=None, reader_options=None, days=NEAR_DUPLICATE_DAYS, out=None, sheets=None):
+    """
+    Looks for duplicate postings within and across the GL exports of one run.
+
+    Args:
+        gl_paths (list): GL export paths.
+        cache (ParsedFileCache): Optional cache of parsed files.
+        reader_options (dict): Extra reader keyword arguments (e.g. compact=True).
+        days (int): Largest date difference of near-duplicates.
+        out (str): Optional CSV path receiving every clustered row.
+        sheets: Optional sheet selector: the selected sheets of every export are
+                compared, each as a source of its own ("path [sheet]").
+
+    Returns:
+        (DUPLICATES_NAME, {"errors": [...], "warnings": [...]}): duplicates are
+        reported as warnings, since a repeated posting may be legitimate.
+    """
+    errors, warnings = [], []
+    reader_options = reader_options or {}
+    try:
+        if sheets is None:
+            frames = [(path, cached_read(read_gl_excel_dynamic, path, cache, returns_parse_info=True,
+                                         **reader_options)[0])
+                      for path in gl_paths]
+        else:
+            frames = []
+            for path in gl_paths:
+                by_sheet = cached_read(read_gl_excel_dynamic, path, cache, returns_parse_info=True, sheets=sheets,
+                                       **reader_options)
+                # Sheets that could not be read are already reported with the file's own results
+                frames.extend((f"{path} [{sheet}]", result[0]) for sheet, result in by_sheet.items()
+                              if not isinstance(result, Exception))
+        duplicates = find_duplicate_transactions(frames, days)
+        warnings.extend(duplicate_messages(duplicates))
+        if out:
+            duplicates.to_csv(out, index=False)
+    except Exception as ex:
+        errors.append(str(ex))
+    return DUPLICATES_NAME, {"errors": errors, "warnings": warnings}
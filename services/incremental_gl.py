@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+
+from lazy_imports import lazy_import
+from readers import gl_reader
+from readers.cache import file_digest
+from readers.compact import DEFAULT_CURRENCY_PRECISION
+from readers.gl_reader import load_gl_table, clean_gl_frame
+from validators.general_ledger_validator import (
+    GL_REQUIRED_COLUMNS, MAX_ROWS_IN_MESSAGE, gl_error_masks, gl_summary_messages, summarize_masks,
+    running_balance_summary, running_balance_messages
+)
+
+pd = lazy_import("pandas")
+
+# Bump whenever the stored watermark or results change meaning
+STATE_VERSION = 2
+
+# Raw rows per watermark block; a changed row is located to within one block
+WATERMARK_BLOCK_ROWS = 4096
+
+
+def state_path(state_dir, filepath):
+    """
+    State file of a GL export: one JSON file per (absolute) file path.
+    """
+    name = hashlib.blake2b(os.path.abspath(filepath).encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(state_dir, f"gl_{name}.json")
+
+
+def table_watermark(table, row_hashes, rows=None):
+    """
+    Watermark of the first `rows` rows of a load_gl_table frame: the row count
+    and one digest per WATERMARK_BLOCK_ROWS rows, each over the column labels
+    and the per-row hashes of the raw cells (pd.util.hash_pandas_object of the
+    table). Comparing the block digests of two versions of an export locates
+    the rows that differ.
+
+    Returns:
+        {"rows": int, "blocks": [hex digest, ...]}
+    """
+    rows = len(table) if rows is None else rows
+    header = repr(list(table.columns)).encode("utf-8")
+    blocks = [
+        hashlib.blake2b(header + row_hashes[start:min(start + WATERMARK_BLOCK_ROWS, rows)].tobytes(),
+                        digest_size=16).hexdigest()
+        for start in range(0, rows, WATERMARK_BLOCK_ROWS)
+    ]
+    return {"rows": rows, "blocks": blocks}
+
+
+def changed_region(previous, current):
+    """
+    Data rows (1-based, below the header) covered by the blocks that differ
+    between a stored watermark and the current one of the same prefix length.
+
+    Returns:
+        (first_row, last_row), or None if every block matches.
+    """
+    changed = [i for i, (a, b) in enumerate(zip(previous["blocks"], current["blocks"])) if a != b]
+    if not changed:
+        return None
+    return changed[0] * WATERMARK_BLOCK_ROWS + 1, min((changed[-1] + 1) * WATERMARK_BLOCK_ROWS, previous["rows"])
+
+
+def rule_summary(df, row_offset=0):
+    """
+    validate_gl's per-rule counts over a cleaned GL frame, keeping only the
+    first MAX_ROWS_IN_MESSAGE row positions (shifted by `row_offset`).
+
+    Returns:
+        dict: rule -> {"count": int, "rows": [int, ...]}
+    """
+    summary = summarize_masks(gl_error_masks(df))
+    return {
+        rule: {"count": int(info["count"]), "rows": [int(r) + row_offset for r in info["rows"][:MAX_ROWS_IN_MESSAGE]]}
+        for rule, info in summary.items()
+    }
+
+
+def merge_rule_summaries(first, second):
+    """
+    Combines the rule summaries of two consecutive row ranges.
+    """
+    merged = {}
+    for rule in list(first) + [r for r in second if r not in first]:
+        a = first.get(rule, {"count": 0, "rows": []})
+        b = second.get(rule, {"count": 0, "rows": []})
+        merged[rule] = {"count": a["count"] + b["count"], "rows": (a["rows"] + b["rows"])[:MAX_ROWS_IN_MESSAGE]}
+    return merged
+
+
+def gl_messages(columns, rows, summary, balances):
+    """
+    validate_gl's (errors, warnings) for a frame with `columns` and `rows`
+    cleaned rows, from its rule summary and running_balance_summary.
+    """
+    if rows == 0:
+        return ["General Ledger data is empty."], []
+    missing_columns = [col for col in GL_REQUIRED_COLUMNS if col not in columns]
+    if missing_columns:
+        return [f"Missing required columns: {', '.join(missing_columns)}."], []
+    errors, warnings = gl_summary_messages(summary, columns)
+    return errors + running_balance_messages(balances), warnings
+
+
+def _load_state(path, options):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # A watermark taken by another reader version or with other options cannot be extended
+    if (state.get("state_version") != STATE_VERSION
+            or state.get("reader_version") != gl_reader.READER_VERSION
+            or state.get("options") != options):
+        return {}
+    return state
+
+
+def _save_state(path, state):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"  # Written aside, then swapped in atomically
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def validate_gl_incremental(filepath, state_dir, store=None, entity="default", source=None, compact=False,
+                            currency_precision=DEFAULT_CURRENCY_PRECISION):
+    """
+    Validates (and optionally stores) a cumulative GL export, cleaning and
+    checking only the rows appended since the last run.
+
+    The watermark of the previous run (see table_watermark) is compared with
+    the same number of leading rows of the current export. If they match, only
+    the rows after it are cleaned, validated and appended to the ledger store,
+    and their findings are merged with the stored ones. If an earlier row was
+    edited, removed or inserted, the whole export is re-ingested and a warning
+    names the data rows that changed. The findings are the same as validate_gl
+    over read_gl_excel_dynamic's output.
+
+    The raw sheet is still read in full: its cells are what the watermark is
+    checked against. An export whose content digest is unchanged is not read.
+
+    Args:
+        filepath (str): Path to the GL export.
+        state_dir (str): Directory holding the per-export watermark state.
+        store (LedgerStore): Optional ledger store the rows are ingested into.
+        entity (str): Entity of the export in the store.
+        source (str): Source name in the store (defaults to the file's base name).
+        compact, currency_precision: as read_gl_excel_dynamic.
+
+    Returns:
+        (errors, warnings, stats) where stats is {"mode": "unchanged" | "append" | "full",
+        "rows", "rechecked", "changed_rows": (first, last) data rows or None, "columns_changed"}.
+    """
+    source = source or os.path.basename(filepath)
+    options = {
+        "compact": compact,
+        "currency_precision": currency_precision,
+        # Rows were only appended to the store the watermark was taken for
+        "store": os.path.abspath(store.root) if store is not None else None,
+        "entity": entity if store is not None else None,
+        "source": source if store is not None else None,
+    }
+    path = state_path(state_dir, filepath)
+    state = _load_state(path, options)
+    digest = file_digest(filepath)
+
+    # 1) Unchanged file: nothing to read
+    if state and state.get("file_digest") == digest:
+        stats = {"mode": "unchanged", "rows": state["watermark"]["rows"], "rechecked": 0,
+                 "changed_rows": None, "columns_changed": False}
+        return state["errors"], state["warnings"], stats
+
+    # 2) Load the raw table and check the stored watermark against its leading rows
+    table = load_gl_table(filepath)
+    row_hashes = pd.util.hash_pandas_object(table, index=False).to_numpy()
+    previous = state.get("watermark")
+    changed_rows, columns_changed, append = None, False, False
+    if previous and list(table.columns) == state["columns"]:
+        if len(table) >= previous["rows"]:
+            changed_rows = changed_region(previous, table_watermark(table, row_hashes, previous["rows"]))
+            append = changed_rows is None
+        else:
+            changed_rows = (1, previous["rows"])  # Rows were removed; the region cannot be narrowed down
+    elif previous:
+        columns_changed = True
+
+    # 3) Clean and validate the appended rows only, or the whole export
+    start = previous["rows"] if append else 0
+    tail, _ = clean_gl_frame(table.iloc[start:].reset_index(drop=True), compact, currency_precision)
+    offset = state["cleaned_rows"] if append else 0
+    summary = rule_summary(tail, offset) if set(GL_REQUIRED_COLUMNS) <= set(tail.columns) else {}
+    if append:
+        summary = merge_rule_summaries(state["summary"], summary)
+    # Running balances continue from each account's state at the watermark
+    balances = running_balance_summary(tail, carry=state["balances"] if append else None, row_offset=offset)
+    cleaned_rows = offset + len(tail)
+    errors, warnings = gl_messages(list(tail.columns), cleaned_rows, summary, balances)
+
+    if store is not None and append:
+        store.append_gl(tail, entity, source)
+    elif store is not None:
+        store.ingest_gl(tail, entity, source)  # Replaces every row stored for the source
+
+    _save_state(path, {
+        "state_version": STATE_VERSION,
+        "reader_version": gl_reader.READER_VERSION,
+        "options": options,
+        "file_digest": digest,
+        "columns": list(table.columns),
+        "watermark": table_watermark(table, row_hashes),
+        "cleaned_rows": cleaned_rows,
+        "summary": summary,
+        "balances": balances.to_dict("records"),
+        "errors": errors,
+        "warnings": warnings,
+    })
+
+    stats = {"mode": "append" if append else "full", "rows": len(table), "rechecked": len(table) - start,
+             "changed_rows": changed_rows, "columns_changed": columns_changed}
+    reported = list(warnings)
+    if columns_changed:
+        reported.append("The columns changed since the last run; the whole ledger was re-validated.")
+    elif changed_rows:
+        reported.append(f"Data rows {changed_rows[0]}-{changed_rows[1]} changed since the last run; "
+                        f"the whole ledger was re-validated.")
+    return errors, reported, stats
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+
+from lazy_imports import lazy_import
+from readers import monthly_tb_reader
+from readers.cache import file_digest
+from readers.compact import DEFAULT_CURRENCY_PRECISION
+from readers.monthly_tb_reader import (
+    load_monthly_tb_table, month_column_pairs, parse_month_headers, reshape_month_pairs, finish_monthly_frame
+)
+from validators.trial_balance_validator import trial_balance_summary, unbalanced_period_messages
+
+pd = lazy_import("pandas")
+
+# Bump whenever the stored per-period results change meaning
+STATE_VERSION = 1
+
+
+def state_path(state_dir, filepath):
+    """
+    State file of a workbook: one JSON file per (absolute) workbook path.
+    """
+    name = hashlib.blake2b(os.path.abspath(filepath).encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(state_dir, f"monthly_tb_{name}.json")
+
+
+def _period_key(month):
+    return month.isoformat() if hasattr(month, "isoformat") else str(month)
+
+
+def group_pairs_by_month(pairs):
+    """
+    Groups month_column_pairs output by parsed month (several headers can name
+    the same month; reshape_month_pairs sums them, so they are one period).
+
+    Returns:
+        dict: month -> list of (month_header, debit_positions, credit_positions), in sheet order.
+    """
+    month_map = parse_month_headers([header for header, _, _ in pairs])
+    periods = {}
+    for pair in pairs:
+        periods.setdefault(month_map[pair[0]], []).append(pair)
+    return periods
+
+
+def period_fingerprints(accounts, body, periods):
+    """
+    Fingerprints every period from the raw cells it is built from: the account
+    column (shared by all periods), the period's header labels and Debit/Credit
+    layout, and a per-row hash of its Debit/Credit columns.
+
+    Returns:
+        dict: month -> hex digest
+    """
+    account_hash = pd.util.hash_array(accounts.to_numpy(dtype=object)).tobytes()
+    # Hash every body cell in one call; each period then digests its own columns
+    cell_hashes = pd.util.hash_array(body.to_numpy(dtype=object).ravel(order="F")).reshape(body.shape, order="F")
+    fingerprints = {}
+    for month, month_pairs in periods.items():
+        digest = hashlib.blake2b(account_hash, digest_size=20)
+        positions = []
+        for header, debits, credits in month_pairs:
+            digest.update(repr((str(header), len(debits), len(credits))).encode("utf-8"))
+            positions += debits + credits
+        if positions:
+            digest.update(cell_hashes[:, positions].tobytes(order="F"))
+        fingerprints[month] = digest.hexdigest()
+    return fingerprints
+
+
+def _load_state(path, options):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # Results computed by another reader version or with other options cannot be reused
+    if (state.get("state_version") != STATE_VERSION
+            or state.get("reader_version") != monthly_tb_reader.READER_VERSION
+            or state.get("options") != options):
+        return {}
+    return state
+
+
+def _save_state(path, options, digest, periods, order):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"  # Written aside, then swapped in atomically
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "state_version": STATE_VERSION,
+            "reader_version": monthly_tb_reader.READER_VERSION,
+            "options": options,
+            "file_digest": digest,
+            "periods": periods,
+            "order": order,
+        }, f)
+    os.replace(tmp_path, path)
+
+
+def validate_monthly_tb_incremental(filepath, state_dir, top_n=5, compact=False,
+                                    currency_precision=DEFAULT_CURRENCY_PRECISION):
+    """
+    Validates a monthly TB, re-checking only the months that changed since the last run.
+
+    An unchanged workbook (same content digest) is answered from the stored
+    results without being read. Otherwise the workbook is read (the cells are
+    needed to detect changes), but only new or changed months are reshaped and
+    balanced; stored results are reused for the others. The findings are the
+    same as validate_trial_balance over read_monthly_tb_excel_dynamic's output.
+
+    Args:
+        filepath (str): Path to the monthly TB workbook.
+        state_dir (str): Directory holding the per-workbook fingerprint/result state.
+        top_n (int): Contributing accounts reported per unbalanced month.
+        compact, currency_precision: as read_monthly_tb_excel_dynamic (compact
+                                     frames are balanced exactly in minor units).
+
+    Returns:
+        (errors, warnings, stats) where stats is {"periods", "rechecked", "reused"}.
+        (The reshaped Debit/Credit values are always numeric, so there are no warnings.)
+    """
+    options = {"top_n": top_n, "compact": compact, "currency_precision": currency_precision}
+    path = state_path(state_dir, filepath)
+    state = _load_state(path, options)
+    previous = state.get("periods", {})
+    digest = file_digest(filepath)
+
+    # 1) Unchanged file: nothing to read
+    if state and state.get("file_digest") == digest:
+        errors = [message for key in state["order"] for message in previous[key]["errors"]]
+        return errors, [], {"periods": len(previous), "rechecked": 0, "reused": len(previous)}
+
+    # 2) Load the wide table and fingerprint every month from its raw cells
+    accounts, body = load_monthly_tb_table(filepath)
+    periods = group_pairs_by_month(month_column_pairs(body.columns))
+    stats = {"periods": len(periods), "rechecked": 0, "reused": 0}
+    if not periods or not accounts.dropna().astype(str).str.strip().ne("").any():
+        return ["Trial Balance data is empty."], [], stats
+
+    fingerprints = period_fingerprints(accounts, body, periods)
+    changed = [month for month in periods
+               if previous.get(_period_key(month), {}).get("fingerprint") != fingerprints[month]]
+
+    # 3) Reshape and balance the new or changed months only
+    results = {}
+    if changed:
+        pairs = [pair for month in changed for pair in periods[month]]
+        df_changed = finish_monthly_frame(reshape_month_pairs(accounts, body, pairs), compact, currency_precision)
+        totals, contributors, _ = trial_balance_summary(df_changed, top_n=top_n)
+        messages = dict(unbalanced_period_messages(totals, contributors))
+        for month in changed:
+            results[_period_key(month)] = {
+                "fingerprint": fingerprints[month],
+                "errors": [messages[month]] if month in messages else [],
+            }
+
+    # 4) Merge with the stored results, in the full reader's period order (sorted by Month)
+    try:
+        ordered = sorted(periods)
+    except TypeError:
+        ordered = list(periods)
+    order = [_period_key(month) for month in ordered]
+    merged = {key: results.get(key) or previous[key] for key in order}
+    _save_state(path, options, digest, merged, order)
+
+    errors = [message for key in order for message in merged[key]["errors"]]
+    stats.update(rechecked=len(changed), reused=len(periods) - len(changed))
+    return errors, [], stats
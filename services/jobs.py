@@ -0,0 +1,83 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Finished jobs kept for status/result lookups before the oldest are dropped
+MAX_FINISHED_JOBS = 1000
+
+
+class JobQueue:
+    """
+    Runs submitted callables on a bounded pool of worker threads and keeps
+    their status and result for polling by job ID.
+
+    Job status moves from 'queued' to 'running' to 'done' (result available)
+    or 'failed' (error message available).
+    """
+
+    def __init__(self, max_workers=4, max_finished_jobs=MAX_FINISHED_JOBS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="validation-worker")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_finished_jobs = max_finished_jobs
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Queues func(*args, **kwargs) and returns the new job's ID immediately.
+        """
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = {
+                "id": job_id,
+                "status": "queued",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+        self._executor.submit(self._run, job_id, func, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, func, args, kwargs):
+        self._update(job_id, status="running", started_at=time.time())
+        try:
+            result = func(*args, **kwargs)
+        except Exception as ex:
+            self._update(job_id, status="failed", error=str(ex), finished_at=time.time())
+        else:
+            self._update(job_id, status="done", result=result, finished_at=time.time())
+        self._prune()
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def _prune(self):
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job["status"] in ("done", "failed")]
+            for job_id in finished[:max(0, len(finished) - self._max_finished_jobs)]:
+                del self._jobs[job_id]
+
+    def status(self, job_id):
+        """
+        Returns the job's status fields (without the result), or None for an unknown ID.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {key: value for key, value in job.items() if key != "result"}
+
+    def result(self, job_id):
+        """
+        Returns the full job record including 'result', or None for an unknown ID.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
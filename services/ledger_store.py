@@ -0,0 +1,276 @@
+import os
+import shutil
+from functools import lru_cache
+from urllib.parse import quote, unquote
+
+from lazy_imports import lazy_import
+from readers.compact import gl_amounts
+
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+ds = lazy_import("pyarrow.dataset")
+pafs = lazy_import("pyarrow.fs")
+pq = lazy_import("pyarrow.parquet")
+
+
+# Column layout of the stored datasets; missing columns are stored as nulls.
+# Built on first use, so importing the store does not import pyarrow.
+@lru_cache(maxsize=None)
+def gl_schema():
+    return pa.schema([
+        ("Account", pa.string()),
+        ("Date", pa.string()),
+        ("Transaction Type", pa.string()),
+        ("#", pa.string()),
+        ("Name", pa.string()),
+        ("Memo/Description", pa.string()),
+        ("Split", pa.string()),
+        ("Amount", pa.string()),
+        ("Balance", pa.float64()),
+        ("parsed_date", pa.timestamp("ns")),
+        ("parsed_amount", pa.float64()),
+    ])
+
+
+@lru_cache(maxsize=None)
+def tb_schema():
+    return pa.schema([
+        ("Account", pa.string()),
+        ("Month", pa.date32()),
+        ("Debit", pa.float64()),
+        ("Credit", pa.float64()),
+    ])
+
+
+@lru_cache(maxsize=None)
+def _partitioning():
+    return ds.partitioning(pa.schema([("entity", pa.string()), ("month", pa.string())]), flavor="hive")
+
+
+UNDATED_PARTITION = "undated"
+
+# Rows per Parquet row group; small enough for min/max statistics on Account
+# and dates to skip most of a partition file
+ROW_GROUP_SIZE = 65536
+
+
+class LedgerStore:
+    """
+    Local columnar store of validated GL and TB data.
+
+    Frames are written as Parquet files partitioned by entity and month:
+
+        <root>/<gl|tb>/entity=<entity>/month=<YYYY-MM>/<source>.parquet
+
+    Queries read through a memory-mapped pyarrow dataset. Entity and date
+    bounds prune whole partitions; date and account predicates are pushed
+    down to the row-group statistics of the remaining files (rows are sorted
+    by account within each file).
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._filesystem = pafs.LocalFileSystem(use_mmap=True)
+
+    # Ingestion
+
+    def ingest_gl(self, df, entity, source):
+        """
+        Stores a canonical GL frame (as returned by read_gl_excel_dynamic).
+
+        Args:
+            df (DataFrame): GL rows with 'parsed_date'.
+            entity (str): Legal entity / company the ledger belongs to.
+            source (str): Name of the export (e.g., file name). Re-ingesting the
+                          same source replaces its previous rows.
+
+        Returns:
+            int: Number of partitions written.
+        """
+        months = _month_labels(pd.to_datetime(df["parsed_date"]))
+        return self._write("gl", gl_schema(), _with_parsed_amount(df), months, entity, source,
+                           sort_by=["Account", "parsed_date"])
+
+    def append_gl(self, df, entity, source):
+        """
+        Adds GL rows to the rows already stored for `source` (e.g. the rows
+        appended to a cumulative export since it was last ingested). Only the
+        partitions of the months the new rows fall in are rewritten.
+
+        Returns:
+            int: Number of partitions written.
+        """
+        months = _month_labels(pd.to_datetime(df["parsed_date"]))
+        return self._write("gl", gl_schema(), _with_parsed_amount(df), months, entity, source,
+                           sort_by=["Account", "parsed_date"], append=True)
+
+    def ingest_tb(self, df, entity, source, period=None):
+        """
+        Stores a TB frame. Monthly TBs carry their 'Month' column; a single TB
+        needs the `period` (any date in the month) it belongs to.
+
+        Returns:
+            int: Number of partitions written.
+        """
+        df = df.copy()
+        if "Month" not in df.columns:
+            if period is None:
+                raise ValueError("A single trial balance needs the period it belongs to.")
+            df["Month"] = pd.Timestamp(period).date().replace(day=1)
+        df["Month"] = pd.to_datetime(df["Month"], errors="coerce")
+        months = _month_labels(df["Month"])
+        df["Month"] = df["Month"].dt.date
+        return self._write("tb", tb_schema(), df, months, entity, source, sort_by=["Account"])
+
+    def _write(self, dataset, schema, df, months, entity, source, sort_by, append=False):
+        if not append:
+            self.remove_source(dataset, entity, source)
+        file_name = _partition_value(source) + ".parquet"
+        written = 0
+        for month, part in df.groupby(months, sort=False):
+            directory = os.path.join(self.root, dataset, f"entity={_partition_value(entity)}", f"month={month}")
+            path = os.path.join(directory, file_name)
+            os.makedirs(directory, exist_ok=True)
+            if append and os.path.exists(path):
+                # Stored rows first, then a stable sort: the same file a full ingest would write
+                table = pa.concat_tables([
+                    pq.ParquetFile(path).read(),
+                    _conform(pa.Table.from_pandas(part, preserve_index=False), schema),
+                ])
+                table = table.sort_by([(c, "ascending") for c in sort_by if c in table.column_names])
+            else:
+                part = part.sort_values([c for c in sort_by if c in part.columns], kind="stable")
+                table = _conform(pa.Table.from_pandas(part, preserve_index=False), schema)
+            pq.write_table(table, path, row_group_size=ROW_GROUP_SIZE)
+            written += 1
+        return written
+
+    def remove_source(self, dataset, entity, source):
+        """
+        Deletes every partition file previously written for `source`.
+        """
+        entity_dir = os.path.join(self.root, dataset, f"entity={_partition_value(entity)}")
+        file_name = _partition_value(source) + ".parquet"
+        if not os.path.isdir(entity_dir):
+            return
+        for month_dir in os.listdir(entity_dir):
+            path = os.path.join(entity_dir, month_dir, file_name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    # Queries
+
+    def query_gl(self, entity=None, start=None, end=None, accounts=None, columns=None):
+        """
+        Returns the stored GL rows matching all given predicates.
+
+        Args:
+            entity (str or list): Entity name(s); None for all.
+            start, end: Inclusive bounds on 'parsed_date' (anything pd.Timestamp accepts).
+            accounts (list): Account names to keep; None for all.
+            columns (list): Columns to read; None for all.
+
+        Example:
+            store.query_gl(accounts=["Cash"], start="2024-07-01", end="2024-09-30")
+        """
+        date_filter = _date_bounds(ds.field("parsed_date"), start, end, pa.timestamp("ns"))
+        return self._query("gl", gl_schema(), entity, start, end, accounts, columns, date_filter)
+
+    def query_tb(self, entity=None, start=None, end=None, accounts=None, columns=None):
+        """
+        Returns the stored TB rows matching all given predicates ('Month' is the date).
+        """
+        date_filter = _date_bounds(ds.field("Month"), start, end, pa.date32())
+        return self._query("tb", tb_schema(), entity, start, end, accounts, columns, date_filter)
+
+    def _query(self, dataset, schema, entity, start, end, accounts, columns, date_filter):
+        path = os.path.join(self.root, dataset)
+        full_schema = schema.append(pa.field("entity", pa.string())).append(pa.field("month", pa.string()))
+        if not os.path.isdir(path):
+            return full_schema.empty_table().to_pandas()
+
+        data = ds.dataset(path, schema=full_schema, format="parquet",
+                          partitioning=_partitioning(), filesystem=self._filesystem)
+
+        predicates = []
+        if entity is not None:
+            entities = [entity] if isinstance(entity, str) else list(entity)
+            predicates.append(ds.field("entity").isin(entities))
+        # Month partitions are named YYYY-MM, so bounds prune them lexicographically
+        if start is not None:
+            predicates.append(ds.field("month") >= pd.Timestamp(start).strftime("%Y-%m"))
+        if end is not None:
+            predicates.append(ds.field("month") <= pd.Timestamp(end).strftime("%Y-%m"))
+        if date_filter is not None:
+            predicates.append(date_filter)
+        if accounts is not None:
+            predicates.append(ds.field("Account").isin(list(accounts)))
+
+        row_filter = None
+        for predicate in predicates:
+            row_filter = predicate if row_filter is None else row_filter & predicate
+
+        return data.to_table(columns=columns, filter=row_filter).to_pandas()
+
+    def partitions(self, dataset="gl"):
+        """
+        Lists the stored (entity, month) partitions of a dataset.
+        """
+        path = os.path.join(self.root, dataset)
+        if not os.path.isdir(path):
+            return []
+        found = []
+        for entity_dir in sorted(os.listdir(path)):
+            for month_dir in sorted(os.listdir(os.path.join(path, entity_dir))):
+                found.append((unquote(entity_dir.split("=", 1)[1]), month_dir.split("=", 1)[1]))
+        return found
+
+
+def _partition_value(value):
+    """Percent-encodes a value for use as a directory or file name."""
+    return quote(str(value), safe="")
+
+
+def _month_labels(dates):
+    """
+    'YYYY-MM' label per row (UNDATED_PARTITION for missing dates), formatting
+    each distinct month once.
+    """
+    keys = (dates.dt.year * 100 + dates.dt.month).fillna(-1).astype("int64")
+    labels = {key: UNDATED_PARTITION if key < 0 else f"{key // 100:04d}-{key % 100:02d}" for key in keys.unique()}
+    return keys.map(labels)
+
+
+def _with_parsed_amount(df):
+    """A GL frame with 'parsed_amount' (a compact frame only holds 'amount_minor')."""
+    if "parsed_amount" in df.columns or "amount_minor" not in df.columns:
+        return df
+    return df.assign(parsed_amount=gl_amounts(df))
+
+
+def _conform(table, schema):
+    """Casts a table to `schema`, adding missing columns as nulls."""
+    arrays = []
+    for field in schema:
+        if field.name in table.column_names:
+            arrays.append(table.column(field.name).cast(field.type))
+        else:
+            arrays.append(pa.nulls(table.num_rows, field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _date_bounds(field, start, end, arrow_type):
+    def scalar(value):
+        value = pd.Timestamp(value)
+        return pa.scalar(value.date() if arrow_type == pa.date32() else value, type=arrow_type)
+
+    predicate = None
+    if start is not None:
+        predicate = field >= scalar(start)
+    if end is not None:
+        upper = field <= scalar(end) if arrow_type == pa.date32() else field < scalar(pd.Timestamp(end) + pd.Timedelta(days=1))
+        predicate = upper if predicate is None else predicate & upper
+    return predicate
@@ -0,0 +1,248 @@
+from lazy_imports import lazy_import
+from readers.cache import cached_read
+from readers.compact import DEFAULT_CURRENCY_PRECISION
+from readers.gl_reader import read_gl_excel_dynamic
+from readers.monthly_tb_reader import read_monthly_tb_excel_dynamic
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Largest absolute GL-vs-TB difference of an account-month still considered reconciled
+RECONCILIATION_THRESHOLD = 0.01
+
+# Variances listed one by one in the findings (largest first); all of them are in the frame
+MAX_VARIANCE_MESSAGES = 1000
+
+# Largest account x month grid summed with a dense bincount (else the keys are
+# hashed): two 8-byte arrays of this size, about 16 MB, stay near the CPU caches
+MAX_DENSE_GROUPS = 1_000_000
+
+# Month code of a missing or invalid date (the int64 value of NaT; real dates,
+# including pre-1970 ones with negative codes, never take it)
+MISSING_MONTH = -2 ** 63
+
+# Name of the reconciliation entry in the validation results / report
+RECONCILIATION_NAME = "GL to TB reconciliation"
+
+
+def month_codes(values):
+    """
+    Months since 1970-01 of dates / datetimes / first-of-month dates, as int64
+    (negative before 1970; MISSING_MONTH where the value is missing or not a date).
+    """
+    values = pd.Series(values)
+    if values.dtype.kind != "M":
+        values = pd.to_datetime(values, errors="coerce")
+    dates = values.to_numpy(dtype="datetime64[M]")
+    codes = dates.astype(np.int64)
+    codes[np.isnat(dates)] = MISSING_MONTH
+    return codes
+
+
+def _account_codes(accounts):
+    """
+    Factorizes account labels (hash based; categoricals reuse their codes).
+
+    Returns:
+        (codes, labels, valid): valid is False for missing or blank accounts.
+    """
+    codes, labels = pd.factorize(accounts)
+    labels = np.asarray(labels, dtype=object)
+    blank = np.append(labels == "", True)  # code -1 (missing) -> blank
+    return codes, labels, ~blank[codes]
+
+
+def _grouped_sums(account_codes, labels, months, amounts):
+    """
+    Sums `amounts` per (account code, month code) with a bincount over a
+    combined integer key: dense (account x month span) when that grid is small,
+    else the key is hash-factorized first.
+
+    Returns:
+        DataFrame [Account, Month, Amount, Rows] with one row per group.
+    """
+    first_month = int(months.min()) if len(months) else 0
+    span = int(months.max()) - first_month + 1 if len(months) else 1
+    if len(labels) * span <= MAX_DENSE_GROUPS:
+        key = account_codes.astype(np.int64) * span + (months - first_month)
+        rows = np.bincount(key, minlength=len(labels) * span)
+        amount = np.bincount(key, weights=amounts, minlength=len(labels) * span)
+        keys = np.flatnonzero(rows)
+        rows, amount = rows[keys], amount[keys]
+    else:
+        group_codes, keys = pd.factorize(account_codes.astype(np.int64) * span + (months - first_month))
+        rows = np.bincount(group_codes, minlength=len(keys))
+        amount = np.bincount(group_codes, weights=amounts, minlength=len(keys))
+    return pd.DataFrame({
+        "Account": labels.take(keys // span),
+        "Month": keys % span + first_month,
+        "Amount": amount,
+        "Rows": rows,
+    })
+
+
+def gl_activity(df):
+    """
+    Aggregates a canonical GL frame (read_gl_excel_dynamic) to the net amount
+    posted per account and month.
+
+    Rows without an account, a valid date or a numeric amount are left out
+    (validate_gl reports them). Compact frames are summed in exact minor units.
+
+    Returns:
+        DataFrame [Account, Month, Amount, Rows]: Month is a month code (see
+        month_codes), Amount the sum of 'parsed_amount' (or of 'amount_minor'),
+        Rows the number of GL rows in the group.
+    """
+    if "Account" not in df.columns:
+        raise ValueError("The General Ledger has no 'Account' column; it cannot be reconciled.")
+    minor = "amount_minor" in df.columns
+    amounts = df["amount_minor"] if minor else df["parsed_amount"]
+    amounts = pd.to_numeric(amounts, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    # Accounts are already stripped by the reader
+    codes, labels, valid = _account_codes(df["Account"])
+    months = month_codes(df["parsed_date"])
+
+    keep = valid & (months != MISSING_MONTH) & ~np.isnan(amounts)
+    activity = _grouped_sums(codes[keep], labels, months[keep], amounts[keep])
+    if minor:
+        activity["Amount"] = np.rint(activity["Amount"]).astype(np.int64)
+    return activity
+
+
+def tb_net(df):
+    """
+    Net amount (Debit - Credit) per account and month of a monthly TB
+    (read_monthly_tb_excel_dynamic), in exact minor units for compact frames.
+
+    Returns:
+        DataFrame [Account, Month, Amount, Rows] (see gl_activity); months that
+        are not dates are left out.
+    """
+    minor = "debit_minor" in df.columns and "credit_minor" in df.columns
+    if minor:
+        net = (df["debit_minor"].to_numpy(dtype=np.int64) - df["credit_minor"].to_numpy(dtype=np.int64)).astype(float)
+    else:
+        net = (pd.to_numeric(df["Debit"], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+               - pd.to_numeric(df["Credit"], errors="coerce").fillna(0.0).to_numpy(dtype=float))
+    codes, labels, valid = _account_codes(df["Account"].astype(str).str.strip())
+    months = month_codes(df["Month"])
+
+    keep = valid & (months != MISSING_MONTH)
+    net_by_month = _grouped_sums(codes[keep], labels, months[keep], net[keep])
+    if minor:
+        net_by_month["Amount"] = np.rint(net_by_month["Amount"]).astype(np.int64)
+    return net_by_month
+
+
+def reconcile_gl_to_tb(activity, tb, threshold=RECONCILIATION_THRESHOLD, scale=1):
+    """
+    Compares GL activity with TB net amounts per account and month.
+
+    Both sides are joined on (Account, Month) with a hash join; an account
+    missing on one side counts as 0 there. Only the months present in the TB
+    are reconciled.
+
+    Args:
+        activity (DataFrame): gl_activity output (several GL files may be concatenated).
+        tb (DataFrame): tb_net output.
+        threshold (float): Largest absolute difference still considered reconciled.
+        scale (int): Minor units per currency unit of the amounts (1 for floats,
+                     100 for cents), so that the frame is in currency units.
+
+    Returns:
+        (variances, unmatched_rows)
+        - variances: DataFrame [Account, Month, GL, TB, Variance] of the account-months
+                     whose |GL - TB| exceeds `threshold`, largest variance first;
+                     Month is the first day of the month (datetime.date).
+        - unmatched_rows: number of GL rows in months the TB does not have.
+    """
+    activity = activity.groupby(["Account", "Month"], sort=False, as_index=False)[["Amount", "Rows"]].sum()
+    tb = tb.groupby(["Account", "Month"], sort=False, as_index=False)["Amount"].sum()
+
+    in_tb_months = activity["Month"].isin(tb["Month"].unique())
+    unmatched_rows = int(activity.loc[~in_tb_months, "Rows"].sum())
+
+    joined = activity.loc[in_tb_months, ["Account", "Month", "Amount"]].merge(
+        tb, on=["Account", "Month"], how="outer", suffixes=("_gl", "_tb")
+    )
+    gl = joined["Amount_gl"].fillna(0).to_numpy(dtype=float) / scale
+    tb_amount = joined["Amount_tb"].fillna(0).to_numpy(dtype=float) / scale
+    variance = gl - tb_amount
+    flagged = np.flatnonzero(np.abs(variance) > threshold + 1e-9)
+    flagged = flagged[np.argsort(-np.abs(variance[flagged]), kind="stable")]
+
+    months = joined["Month"].to_numpy(dtype=np.int64)[flagged].astype("datetime64[M]")
+    variances = pd.DataFrame({
+        "Account": joined["Account"].to_numpy()[flagged],
+        "Month": pd.to_datetime(months).date if len(flagged) else [],
+        "GL": gl[flagged],
+        "TB": tb_amount[flagged],
+        "Variance": variance[flagged],
+    })
+    return variances, unmatched_rows
+
+
+def variance_messages(variances, threshold=RECONCILIATION_THRESHOLD, max_messages=MAX_VARIANCE_MESSAGES):
+    """
+    Formats a reconcile_gl_to_tb result: one summary message, then one message
+    per account-month (largest first, at most `max_messages`).
+    """
+    if variances.empty:
+        return []
+    messages = [
+        f"{len(variances)} account-month(s) where GL activity differs from the Trial Balance by more than "
+        f"{threshold:.2f} (total absolute variance: {variances['Variance'].abs().sum():.2f})."
+    ]
+    for row in variances.head(max_messages).itertuples(index=False):
+        messages.append(f"{row.Account}, {row.Month:%Y-%m}: GL activity {row.GL:.2f}, "
+                        f"TB net {row.TB:.2f}, variance {row.Variance:.2f}.")
+    if len(variances) > max_messages:
+        messages.append(f"... and {len(variances) - max_messages} smaller variance(s) not listed.")
+    return messages
+
+
+def reconcile_files(gl_paths, tb_paths, cache=None, reader_options=None, threshold=RECONCILIATION_THRESHOLD,
+                    out=None):
+    """
+    Reconciles the GL exports with the monthly TBs of one run.
+
+    Each GL file is read and reduced to its per-account, per-month activity
+    before the next one is read, so only the aggregates of all files are held
+    at once. The activity of all GL files is compared with the combined TBs.
+
+    Args:
+        gl_paths (list): GL export paths.
+        tb_paths (list): Monthly TB paths.
+        cache (ParsedFileCache): Optional cache of parsed files.
+        reader_options (dict): Extra reader keyword arguments (e.g. compact=True).
+        threshold (float): Largest absolute difference still considered reconciled.
+        out (str): Optional CSV path receiving every variance.
+
+    Returns:
+        (RECONCILIATION_NAME, {"errors": [...], "warnings": [...]})
+    """
+    errors, warnings = [], []
+    reader_options = reader_options or {}
+    try:
+        if not gl_paths or not tb_paths:
+            raise ValueError("Reconciliation needs at least one General Ledger and one monthly Trial Balance.")
+
+        activity = [gl_activity(cached_read(read_gl_excel_dynamic, path, cache, returns_parse_info=True,
+                                            **reader_options)[0])
+                    for path in gl_paths]
+        tb = [tb_net(cached_read(read_monthly_tb_excel_dynamic, path, cache, **reader_options))
+              for path in tb_paths]
+
+        scale = 10 ** reader_options.get("currency_precision", DEFAULT_CURRENCY_PRECISION) if reader_options.get("compact") else 1
+        variances, unmatched_rows = reconcile_gl_to_tb(pd.concat(activity, ignore_index=True),
+                                                       pd.concat(tb, ignore_index=True), threshold, scale)
+        errors.extend(variance_messages(variances, threshold))
+        if unmatched_rows:
+            warnings.append(f"{unmatched_rows} GL row(s) fall in months the Trial Balance does not cover "
+                            f"and were not reconciled.")
+        if out:
+            variances.to_csv(out, index=False)
+    except Exception as ex:
+        errors.append(str(ex))
+    return RECONCILIATION_NAME, {"errors": errors, "warnings": warnings}
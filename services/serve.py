@@ -0,0 +1,194 @@
+"""
+Resident validation service: a pool of worker processes with the readers,
+validators and their libraries loaded once, fed with jobs as JSON lines.
+
+Each job line names a file and, optionally, its kind:
+
+    {"id": 1, "path": "/data/tb_2024_01.xlsx", "kind": "single_tb"}
+    {"id": 2, "path": "/data/gl.xlsx"}                  (kind detected from the header)
+    {"id": 3, "path": "/data/pack.xlsx", "kind": "single_tb", "sheets": "Entity *"}
+
+and gets one result line back as soon as it is done (not necessarily in
+submission order), in the shape write_html_report consumes per file:
+
+    {"id": 1, "file": "tb_2024_01.xlsx", "kind": "single_tb", "errors": [...], "warnings": [...]}
+
+(plus "sheets": {sheet name: {"errors": [...], "warnings": [...]}} for a job with a sheet selector)
+
+Jobs are read from stdin (results on stdout) or, with a socket path, from any
+number of connections to a local Unix socket (results on the same connection).
+"""
+import io
+import json
+import os
+import socket
+import stat
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from lazy_imports import import_object
+from services.validation import FILE_KINDS, FILE_KIND_HANDLERS, validate_file, validate_upload
+
+# Kind of a job whose file type is detected from its header region
+AUTO_KIND = "auto"
+
+# Pending connections of the Unix socket listener
+SOCKET_BACKLOG = 16
+
+# Tiny balanced sheet of every file kind (a header row, then data rows) that
+# warm_up runs through the kind's reader and validator
+WARM_UP_ROWS = {
+    "single_tb": [["Account", "Debit", "Credit"], ["Cash", 1.0, None], ["Sales", None, 1.0]],
+    "monthly_tb": [["Account", "2024-01-31", "2024-01-31"], [None, "Debit", "Credit"],
+                   ["Cash", 1.0, None], ["Sales", None, 1.0]],
+    "gl": [["Date", "Account", "Memo/Description", "Amount", "Balance"], ["2024-01-31", "Cash", "Warm-up", 1.0, 1.0]],
+}
+
+
+def warm_up(sheet_workers=1):
+    """
+    Worker initializer: imports every reader and validator and runs each file
+    kind once on a tiny in-memory workbook (WARM_UP_ROWS), so pandas, numpy and
+    openpyxl (and the code paths the first real file would load) are ready
+    before any job arrives.
+    Sets the worker's share of the CPUs for reading sheets (see set_sheet_workers).
+    """
+    from readers.workbook_loader import set_sheet_workers
+
+    set_sheet_workers(sheet_workers)
+    for reader, validator in FILE_KIND_HANDLERS.values():
+        import_object(reader), import_object(validator)
+    import openpyxl
+
+    for kind in FILE_KIND_HANDLERS:
+        wb = openpyxl.Workbook()
+        for row in WARM_UP_ROWS[kind]:
+            wb.active.append(row)
+        buffer = io.BytesIO()
+        wb.save(buffer)
+        validate_file(kind, buffer, name=f"warm-up-{kind}.xlsx")
+
+
+def run_job(job, options=None):
+    """
+    Validates the file of one job (in a worker process).
+
+    Args:
+        job (dict): {"path": ..., "kind": one of FILE_KINDS or "auto" (default), "id": any,
+                    "sheets": optional sheet selector (see validate_file)}.
+        options (dict): Keyword arguments for validate_file (cache, reader_options, ...).
+
+    Returns:
+        dict: {"id", "file", "kind", "errors": [...], "warnings": [...]}; auto-detected
+              jobs also carry "document_type".
+    """
+    options = dict(options or {}, sheets=job.get("sheets"))
+    path = job.get("path")
+    kind = job.get("kind") or AUTO_KIND
+    result = {"id": job.get("id"), "file": os.path.basename(path) if path else None, "kind": kind}
+    try:
+        if not path:
+            raise ValueError("The job has no 'path'.")
+        if kind == AUTO_KIND:
+            # Same detection as the web app: CSV and XLSX, classified from the header region
+            outcome = validate_upload(path, **options)
+            result["document_type"] = outcome.pop("document_type")
+        elif kind in FILE_KINDS:
+            _, outcome = validate_file(kind, path, **options)
+        else:
+            raise ValueError(f"Unknown file kind: {kind} (expected one of {', '.join(FILE_KINDS + [AUTO_KIND])}).")
+        result.update(outcome)
+    except Exception as ex:
+        result.update({"errors": [str(ex)], "warnings": []})
+    return result
+
+
+class ValidationServer:
+    """
+    Warm process pool shared by every job source (stdin or socket connections).
+    """
+
+    def __init__(self, jobs=1, **options):
+        self.options = options
+        from readers.workbook_loader import MAX_SHEET_WORKERS
+
+        self.executor = ProcessPoolExecutor(max_workers=max(jobs, 1), initializer=warm_up,
+                                            initargs=(MAX_SHEET_WORKERS // max(jobs, 1),))
+        # Wait until the workers are up (each runs warm_up before its first task)
+        for future in [self.executor.submit(os.getpid) for _ in range(max(jobs, 1))]:
+            future.result()
+
+    def handle_lines(self, lines, write):
+        """
+        Submits a job per JSON line of `lines` and calls write(result line) as each
+        finishes. Returns once every job of `lines` has been answered.
+        """
+        lock = threading.Lock()
+        pending = []
+
+        def _send(result):
+            with lock:
+                write(json.dumps(result, default=str) + "\n")
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                job = json.loads(line)
+                if not isinstance(job, dict):
+                    raise ValueError("a job must be a JSON object")
+            except ValueError as ex:
+                _send({"id": None, "file": None, "errors": [f"Invalid job line: {ex}"], "warnings": []})
+                continue
+            future = self.executor.submit(run_job, job, self.options)
+            future.add_done_callback(lambda f, job=job: _send(f.result() if f.exception() is None else {
+                "id": job.get("id"), "file": job.get("path"), "errors": [str(f.exception())], "warnings": []
+            }))
+            pending.append(future)
+        for future in pending:
+            future.exception()  # Wait; failures were already reported by the callback
+
+    def serve_stdin(self, stdin=sys.stdin, stdout=sys.stdout):
+        """
+        Reads job lines from stdin until EOF, writing result lines to stdout.
+        """
+        def _write(text):
+            stdout.write(text)
+            stdout.flush()
+        self.handle_lines(stdin, _write)
+
+    def serve_socket(self, path):
+        """
+        Accepts connections on a Unix socket at `path` until interrupted; each
+        connection sends job lines and receives its result lines.
+        """
+        if os.path.lexists(path):
+            if not stat.S_ISSOCK(os.lstat(path).st_mode):
+                raise ValueError(f"'{path}' exists and is not a socket; refusing to replace it.")
+            os.remove(path)  # A stale socket of an earlier run
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        listener.listen(SOCKET_BACKLOG)
+        try:
+            while True:
+                connection, _ = listener.accept()
+                threading.Thread(target=self._serve_connection, args=(connection,), daemon=True).start()
+        finally:
+            listener.close()
+            os.remove(path)
+
+    def _serve_connection(self, connection):
+        with connection, connection.makefile("r", encoding="utf-8") as reader, \
+                connection.makefile("w", encoding="utf-8") as writer:
+            def _write(text):
+                writer.write(text)
+                writer.flush()
+            try:
+                self.handle_lines(reader, _write)
+            except OSError:
+                pass  # The client went away
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,254 @@
+import os
+
+from lazy_imports import import_object
+from readers.cache import cached_read
+
+from readers.csv_reader import iter_csv_rows
+from readers.file_type import sniff_file_type
+
+from profiling import profiling, stage
+from services.document_identifier import classify_file
+from validators.trial_balance_validator import validate_trial_balance_debits_equal_credits
+from validators.general_ledger_validator import validate_general_ledger_data
+
+# Reader and validator of each file kind accepted by the CLI (in the order they are
+# reported), as "module:function" names imported when a file of that kind is validated
+FILE_KIND_HANDLERS = {
+    "single_tb": ("readers.single_tb_reader:read_single_tb_excel_dynamic",
+                  "validators.trial_balance_validator:validate_trial_balance"),
+    "monthly_tb": ("readers.monthly_tb_reader:read_monthly_tb_excel_dynamic",
+                   "validators.trial_balance_validator:validate_trial_balance"),
+    "gl": ("readers.gl_reader:read_gl_excel_dynamic",
+           "validators.general_ledger_validator:validate_gl"),
+}
+FILE_KINDS = list(FILE_KIND_HANDLERS)
+
+
+def file_kind_handlers(kind):
+    """
+    Imports and returns the (reader, validator) functions of a file kind.
+    """
+    if kind not in FILE_KIND_HANDLERS:
+        raise ValueError(f"Unknown file kind: {kind}")
+    reader, validator = FILE_KIND_HANDLERS[kind]
+    return import_object(reader), import_object(validator)
+
+
+def validate_file(kind, path, cache=None, store=None, entity="default", period=None, reader_options=None,
+                  name=None, incremental_dir=None, profile=False, profile_memory=True, sheets=None):
+    """
+    Reads and validates one file. Any exception is recorded in the file's errors,
+    so one bad file never aborts a batch.
+
+    Args:
+        kind (str): One of FILE_KINDS.
+        path: Path to the Excel file, or a binary file-like object of it.
+        cache (ParsedFileCache): Optional cache of parsed files; None always parses.
+        store (LedgerStore): Optional ledger store the parsed frame is ingested into.
+        entity (str): Entity the file belongs to in the store.
+        period: Month of a single TB in the store (single TBs are not stored without it).
+        reader_options (dict): Extra keyword arguments for the reader (e.g. compact=True).
+        name (str): File name used in the results (defaults to the path's base name;
+                    required for a buffer).
+        incremental_dir (str): State directory enabling incremental checks: only new or
+                               changed months of a monthly TB (not with a store, which
+                               needs the full frame) and only the rows appended to a
+                               GL export since the last run are re-checked.
+        profile (bool): Record the time, rows and memory of every stage (see
+                        profiling); the records are returned under "profile".
+        profile_memory (bool): Include the stages' peak memory when profiling.
+        sheets: Optional sheet selector (see readers.workbook_loader.select_sheets):
+                every selected sheet is read and validated on its own, and its
+                findings are returned under "sheets". In the store, each sheet is
+                the entity named after it. Incremental checks do not apply.
+
+    Returns:
+        (fname, {"errors": [...], "warnings": [...]}), plus "profile": [records] when profiling
+        and, with `sheets`, "sheets": {sheet name: {"errors": [...], "warnings": [...]}}
+        (the file's own errors then cover the workbook as a whole, e.g. no matching sheet).
+    """
+    fname = name or os.path.basename(path)
+    if profile:
+        # Collected in the process doing the work, so worker processes send their records back
+        with profiling(file=fname, memory=profile_memory) as records:
+            fname, outcome = validate_file(kind, path, cache, store, entity, period, reader_options, fname,
+                                           incremental_dir, sheets=sheets)
+        outcome["profile"] = records
+        return fname, outcome
+
+    reader_options = reader_options or {}
+    if sheets is not None:
+        return fname, _validate_sheets(kind, path, sheets, cache, store, period, reader_options, fname)
+
+    errors, warnings = [], []
+    try:
+        reader, validator = file_kind_handlers(kind)
+        if kind == "monthly_tb" and incremental_dir is not None and store is None:
+            from services.incremental_tb import validate_monthly_tb_incremental
+            e, w, _ = validate_monthly_tb_incremental(path, incremental_dir, **reader_options)
+        elif kind == "gl" and incremental_dir is not None:
+            from services.incremental_gl import validate_gl_incremental
+            e, w, _ = validate_gl_incremental(path, incremental_dir, store=store, entity=entity, source=fname,
+                                              **reader_options)
+        else:
+            result = cached_read(reader, path, cache, returns_parse_info=(kind == "gl"), **reader_options)
+            e, w = _check_result(kind, validator, result, store, entity, period, fname)
+        errors.extend(e)
+        warnings.extend(w)
+    except Exception as ex:
+        errors.append(str(ex))
+    return fname, {"errors": errors, "warnings": warnings}
+
+
+def _check_result(kind, validator, result, store=None, entity="default", period=None, source=None):
+    """
+    Validates one reader result and adds it to the store, if any.
+
+    Returns:
+        (errors, warnings)
+    """
+    if kind == "gl":
+        df_gl, parse_info = result
+        e, w = validator(df_gl, parse_info=parse_info)
+        if store is not None:
+            store.ingest_gl(df_gl, entity, source)
+    elif kind == "single_tb":
+        e, w = validator(result)
+        if store is not None:
+            if period is None:
+                w = w + ["Not added to the ledger store: no period given for this single TB."]
+            else:
+                store.ingest_tb(result, entity, source, period=period)
+    else:
+        # All periods of a monthly TB are checked in one grouped pass
+        e, w = validator(result)
+        if store is not None:
+            store.ingest_tb(result, entity, source)
+    return e, w
+
+
+def _validate_sheets(kind, path, sheets, cache, store, period, reader_options, fname):
+    """
+    validate_file for a sheet selector: the sheets are read concurrently
+    (see read_workbook_sheets) and each sheet is validated on its own.
+
+    Returns:
+        {"errors": [...], "warnings": [...], "sheets": {sheet name: {"errors": [...], "warnings": [...]}}}
+    """
+    try:
+        reader, validator = file_kind_handlers(kind)
+        results = cached_read(reader, path, cache, returns_parse_info=(kind == "gl"), sheets=sheets,
+                              **reader_options)
+    except Exception as ex:
+        return {"errors": [str(ex)], "warnings": [], "sheets": {}}
+
+    by_sheet = {}
+    for sheet, result in results.items():
+        try:
+            if isinstance(result, Exception):
+                raise result
+            with stage(f"sheet {sheet}"):
+                e, w = _check_result(kind, validator, result, store, sheet, period, fname)
+            by_sheet[sheet] = {"errors": e, "warnings": w}
+        except Exception as ex:
+            by_sheet[sheet] = {"errors": [str(ex)], "warnings": []}
+    return {"errors": [], "warnings": [], "sheets": by_sheet}
+
+
+def validate_files(tasks, jobs=1, **options):
+    """
+    Validates (kind, path) tasks, optionally spread over a process pool.
+
+    Results come back in task order whatever the number of jobs, so the
+    report is the same for any `jobs` value. Each worker reads the sheets of
+    a workbook with its share of the CPUs (see set_sheet_workers).
+
+    Args:
+        tasks (list): (kind, path) tuples.
+        jobs (int): Number of worker processes; 1 runs everything in this process.
+        options: Keyword arguments passed on to validate_file (cache, store, ...).
+
+    Returns:
+        list: (fname, {"errors": [...], "warnings": [...]}) in task order.
+    """
+    if jobs <= 1 or len(tasks) <= 1:
+        return [validate_file(kind, path, **options) for kind, path in tasks]
+
+    from concurrent.futures import ProcessPoolExecutor
+    from readers.workbook_loader import set_sheet_workers, MAX_SHEET_WORKERS
+
+    outcomes = []
+    workers = min(jobs, len(tasks))
+    with ProcessPoolExecutor(max_workers=workers, initializer=set_sheet_workers,
+                             initargs=(MAX_SHEET_WORKERS // workers,)) as executor:
+        futures = [executor.submit(validate_file, kind, path, **options) for kind, path in tasks]
+        for (kind, path), future in zip(tasks, futures):
+            try:
+                outcomes.append(future.result())
+            except Exception as ex:  # e.g. a worker process died
+                outcomes.append((os.path.basename(path), {"errors": [str(ex)], "warnings": []}))
+    return outcomes
+
+
+def validate_upload(source, filename=None, profile=False, **options):
+    """
+    Identifies, reads and validates one uploaded CSV or XLSX file.
+
+    The file type is detected from the content (magic bytes), not the name, and
+    the document is classified from its header region (classify_file).
+    Excel single / monthly trial balances and general ledgers go through the
+    same readers and validators as the CLI (see validate_file); CSV rows are
+    streamed through the row-based validators. Other document types are
+    identified only.
+
+    Args:
+        source: Path to the uploaded file, or a binary file-like object holding it
+                (e.g. the in-memory upload stream).
+        filename (str): Original name of the upload, used in messages.
+        profile (bool): Add the per-stage timings (see profiling) under "profile".
+                        Memory is not traced: other uploads share the process.
+        options: Keyword arguments passed on to validate_file.
+
+    Returns:
+        dict: {"document_type": ..., "errors": [...], "warnings": [...]}, plus the
+              per-sheet findings ("sheets") when a sheet selector is passed on.
+    """
+    filename = filename or os.path.basename(source)
+    if profile:
+        with profiling(file=filename, memory=False) as records:
+            result = validate_upload(source, filename, **options)
+        result["profile"] = records
+        return result
+
+    file_type = sniff_file_type(source)
+    if file_type == "xls":
+        raise ValueError(f"{filename} is a legacy .xls workbook; save it as .xlsx or .csv.")
+    if file_type not in ("csv", "xlsx"):
+        raise ValueError(f"{filename} is neither an XLSX workbook nor a CSV text file.")
+
+    # Only the header region is read to classify the file
+    with stage("classify_file"):
+        classification = classify_file(source)
+    document_type = classification["document_type"]
+    errors, warnings = [], []
+    if document_type not in ("Trial Balance", "General Ledger"):
+        warnings.append(f"No validation available for document type: {document_type}")
+    elif file_type == "xlsx":
+        if classification["kind"] is None:
+            warnings.append(f"Identified as a {document_type}, but no header row the readers "
+                            f"can use was found; not validated.")
+        else:
+            _, outcome = validate_file(classification["kind"], source, name=filename, **options)
+            if "sheets" in outcome:
+                return {"document_type": document_type, **outcome}
+            errors, warnings = outcome["errors"], outcome["warnings"]
+    elif document_type == "Trial Balance":
+        # Rows are read from the header the classification found (title rows above it are skipped)
+        with stage("validate_trial_balance_debits_equal_credits"):
+            rows = iter_csv_rows(source, classification["header_row"])
+            errors = list(validate_trial_balance_debits_equal_credits(rows)["errors"])
+    else:
+        with stage("validate_general_ledger_data"):
+            rows = iter_csv_rows(source, classification["header_row"])
+            errors = list(validate_general_ledger_data(rows)["errors"])
+    return {"document_type": document_type, "errors": errors, "warnings": warnings}
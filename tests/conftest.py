@@ -0,0 +1,40 @@
+"""
+Shared fixtures: small workbooks and deterministic ledgers from
+benchmarks.synthetic_ledgers, written to a per-test temporary directory.
+"""
+import os
+import sys
+
+import pytest
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_ledgers import ensure_ledger  # noqa: E402
+
+
+@pytest.fixture
+def write_workbook(tmp_path):
+    """
+    Returns a function writing `rows` (lists of cell values) to the first sheet
+    of a new .xlsx file in tmp_path: write_workbook(name, rows) -> path.
+    """
+    def _write_workbook(name, rows):
+        wb = Workbook()
+        for row in rows:
+            wb.active.append(row)
+        path = str(tmp_path / name)
+        wb.save(path)
+        return path
+    return _write_workbook
+
+
+@pytest.fixture
+def ledger_file(tmp_path):
+    """
+    Returns a function writing (once) and returning the path of a synthetic
+    ledger: ledger_file(kind, rows, seed=0), kind as in GENERATORS.
+    """
+    def _ledger_file(kind, rows, seed=0):
+        return ensure_ledger(str(tmp_path / "ledgers"), kind, rows, seed)
+    return _ledger_file
@@ -0,0 +1,98 @@
+import os
+
+import pandas as pd
+
+from readers import gl_reader
+from readers.cache import ParsedFileCache, cached_read, file_digest
+from readers.gl_reader import read_gl_excel_dynamic
+from readers.single_tb_reader import read_single_tb_excel_dynamic
+
+
+class CountingReader:
+    """Wraps a reader, counting the calls (the cache key uses the wrapped reader's identity)."""
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.calls = 0
+        self.__module__ = reader.__module__
+        self.__qualname__ = reader.__qualname__
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.reader(*args, **kwargs)
+
+
+def test_second_read_of_the_same_content_is_served_from_the_cache(tmp_path, ledger_file):
+    cache = ParsedFileCache(str(tmp_path / "cache"))
+    reader = CountingReader(read_gl_excel_dynamic)
+    path = ledger_file("gl", 300)
+
+    df1, info1 = cached_read(reader, path, cache, returns_parse_info=True)
+    df2, info2 = cached_read(reader, path, cache, returns_parse_info=True)
+
+    assert reader.calls == 1
+    pd.testing.assert_frame_equal(df1, df2)
+    assert {k: int(v) for k, v in info1.items()} == info2
+
+
+def test_key_depends_on_content_options_and_reader_version(tmp_path, ledger_file, monkeypatch):
+    cache = ParsedFileCache(str(tmp_path / "cache"))
+    path = ledger_file("gl", 300)
+    key = cache.key(path, read_gl_excel_dynamic)
+
+    assert cache.key(ledger_file("gl", 300, seed=1), read_gl_excel_dynamic) != key
+    assert cache.key(path, read_gl_excel_dynamic, {"compact": True}) != key
+    assert cache.key(path, read_single_tb_excel_dynamic) != key
+    monkeypatch.setattr(gl_reader, "READER_VERSION", gl_reader.READER_VERSION + 1)
+    assert cache.key(path, read_gl_excel_dynamic) != key
+
+
+def test_a_copy_of_a_file_hits_the_same_entry(tmp_path, ledger_file):
+    cache = ParsedFileCache(str(tmp_path / "cache"))
+    reader = CountingReader(read_single_tb_excel_dynamic)
+    path = ledger_file("single_tb", 40)
+    copy = tmp_path / "renamed.xlsx"
+    copy.write_bytes(open(path, "rb").read())
+
+    cached_read(reader, path, cache)
+    cached_read(reader, str(copy), cache)
+
+    assert reader.calls == 1
+    assert file_digest(path) == file_digest(str(copy))
+
+
+def test_compact_attrs_survive_the_cache(tmp_path, ledger_file):
+    cache = ParsedFileCache(str(tmp_path / "cache"))
+    path = ledger_file("single_tb", 40)
+
+    cached_read(read_single_tb_excel_dynamic, path, cache, compact=True)
+    df = cached_read(read_single_tb_excel_dynamic, path, cache, compact=True)
+
+    assert df.attrs["currency_precision"] == 2
+    assert df["debit_minor"].dtype == "int64"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    frame = pd.DataFrame({"Account": ["Cash"] * 1000, "Debit": range(1000)})
+    cache = ParsedFileCache(str(tmp_path / "cache"), max_bytes=10 ** 9)
+    for age, key in enumerate(("a", "b", "c")):
+        cache.put(key, frame)
+        os.utime(cache._paths(key)[0], (1000 + age, 1000 + age))
+    entry_size = cache.entries()[0][1]
+
+    cache.get("a")  # Refreshes "a", so "b" is now the oldest
+    cache.max_bytes = 2 * entry_size
+    cache.evict()
+
+    assert sorted(key for _, _, key in cache.entries()) == ["a", "c"]
+    assert cache.get("b") is None
+
+
+def test_no_cache_always_reads(ledger_file):
+    reader = CountingReader(read_single_tb_excel_dynamic)
+    path = ledger_file("single_tb", 40)
+
+    cached_read(reader, path, None)
+    cached_read(reader, path, None)
+
+    assert reader.calls == 2
@@ -0,0 +1,55 @@
+import datetime
+
+import pandas as pd
+
+from readers import date_parser
+from readers.date_parser import invalid_format_mask, parse_dates, sniff_date_format
+
+
+def test_outliers_of_the_dominant_format_fall_back_to_inference():
+    dates = pd.Series(["01/05/2024", "01/06/2024", "2024-01-07", "Jan 8, 2024", "01/05/2024", "2024/13/45", ""])
+
+    assert sniff_date_format(dates.unique()) == "%m/%d/%Y"
+    parsed = parse_dates(dates)
+
+    assert parsed.tolist()[:5] == [pd.Timestamp(f"2024-01-0{day}") for day in (5, 6, 7, 8, 5)]
+    assert parsed[5:].isna().all()
+
+
+def test_outliers_stay_missing_without_fallback():
+    parsed = parse_dates(pd.Series(["01/05/2024", "01/06/2024", "2024-01-07"]), fallback=False)
+
+    assert parsed[1] == pd.Timestamp("2024-01-06") and pd.isna(parsed[2])
+
+
+def test_cells_that_already_hold_dates_are_kept():
+    parsed = parse_dates(pd.Series([datetime.datetime(2024, 1, 5), "01/06/2024", None], index=[10, 11, 12]))
+
+    assert parsed.index.tolist() == [10, 11, 12]
+    assert parsed[10] == pd.Timestamp("2024-01-05") and parsed[11] == pd.Timestamp("2024-01-06")
+    assert pd.isna(parsed[12])
+
+
+def test_dominant_format_is_sniffed_from_the_distinct_values():
+    assert sniff_date_format(["13/01/2024", "25/12/2023", "01/02/2024"]) == "%d/%m/%Y"
+    assert sniff_date_format(["01/02/2024"]) == "%m/%d/%Y"  # Ambiguous: month first, like pd.to_datetime
+    assert sniff_date_format(["not a date", ""]) is None
+
+
+def test_each_distinct_value_is_parsed_once(monkeypatch):
+    calls = []
+    to_datetime = pd.to_datetime
+    counting = lambda values, **kw: calls.append(len(values)) or to_datetime(values, **kw)  # noqa: E731
+    monkeypatch.setattr(pd, "to_datetime", counting)
+    monkeypatch.setattr(date_parser.pd, "to_datetime", counting)  # The module's lazy proxy caches attributes
+
+    parsed = parse_dates(pd.Series(["2024-01-05", "2024-01-06"] * 5000))
+
+    assert calls == [2]
+    assert parsed.nunique() == 2 and len(parsed) == 10_000
+
+
+def test_invalid_format_mask_flags_non_empty_values_only():
+    mask = invalid_format_mask(pd.Series(["2024-01-05", "05/01/2024", "", None, "2024-01-05"]), "%Y-%m-%d")
+
+    assert mask.tolist() == [False, True, False, False, False]
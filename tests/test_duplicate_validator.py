@@ -0,0 +1,119 @@
+import time
+
+import pandas as pd
+
+from readers.compact import compact_gl_frame
+from validators.duplicate_validator import duplicate_messages, find_duplicate_transactions
+
+
+def gl_frame(rows):
+    """Canonical GL rows from (account, date, #, name, amount, memo) tuples."""
+    return pd.DataFrame(rows, columns=["Account", "parsed_date", "#", "Name", "parsed_amount", "Memo/Description"]
+                        ).assign(parsed_date=lambda df: pd.to_datetime(df["parsed_date"]))
+
+
+def clusters(duplicates, kind):
+    """Sets of (file, row) per cluster of one kind."""
+    group = duplicates[duplicates["Kind"] == kind]
+    return sorted(sorted(zip(cluster["File"], cluster["Row"])) for _, cluster in group.groupby("Cluster"))
+
+
+def test_exact_duplicates_across_files():
+    first = gl_frame([("Sales", "2024-01-05", "1001", "Acme", 150.0, "Invoice 1001"),
+                      ("Rent", "2024-01-05", "77", "Landlord", -2500.0, "January rent")])
+    second = gl_frame([("Sales", "2024-01-05", "1001", "Acme", 150.0, "Invoice 1001"),
+                       ("Cash", "2024-01-05", "1001", "Acme", 150.0, "Invoice 1001")])
+
+    duplicates = find_duplicate_transactions([("a.xlsx", first), ("b.xlsx", second)])
+
+    assert clusters(duplicates, "exact") == [[("a.xlsx", 1), ("b.xlsx", 1)]]
+    assert clusters(duplicates, "near") == []
+
+
+def test_near_pairs_are_found_whatever_came_before():
+    gl = gl_frame([("Sales", "2024-01-01", "1", "Acme", 150.0, "Office supplies"),
+                   ("Sales", "2024-01-04", "2", "Acme", 150.0, "Invoice 1001"),
+                   ("Sales", "2024-01-05", "3", "Acme", 150.0, "Invoice 1001")])
+
+    duplicates = find_duplicate_transactions([("gl.xlsx", gl)], days=3)
+
+    assert clusters(duplicates, "near") == [[("gl.xlsx", 2), ("gl.xlsx", 3)]]
+
+
+def test_near_clusters_chain_rows_within_days_of_each_other():
+    gl = gl_frame([("Sales", f"2024-01-{day:02d}", str(day), "Acme", 150.0, "Invoice 1001") for day in (1, 3, 5, 7, 20)])
+
+    duplicates = find_duplicate_transactions([("gl.xlsx", gl)], days=3)
+
+    # Every gap up to the 7th is 2 days; the 20th is alone
+    assert clusters(duplicates, "near") == [[("gl.xlsx", 1), ("gl.xlsx", 2), ("gl.xlsx", 3), ("gl.xlsx", 4)]]
+
+
+def test_large_runs_stay_fast():
+    same = gl_frame([("Payroll", "2024-01-31", str(i), "Staff", 1000.0, "Monthly payroll") for i in range(3000)])
+    similar = gl_frame([("Payroll", "2024-01-31", str(i), "Staff", 1000.0, f"Payroll employee {i}")
+                        for i in range(3000)])
+
+    start = time.perf_counter()
+    same_clusters = clusters(find_duplicate_transactions([("same.xlsx", same)]), "near")
+    similar_clusters = clusters(find_duplicate_transactions([("similar.xlsx", similar)]), "near")
+
+    assert time.perf_counter() - start < 10
+    assert [len(cluster) for cluster in same_clusters] == [3000]
+    assert similar_clusters and all(len(cluster) > 1 for cluster in similar_clusters)
+
+
+def test_memos_are_not_only_compared_with_the_first_row():
+    gl = gl_frame([("Sales", "2024-01-05", "1", "Acme", 150.0, "Office supplies"),
+                   ("Sales", "2024-01-06", "2", "Acme", 150.0, "Invoice 1001"),
+                   ("Sales", "2024-01-07", "3", "Acme", 150.0, "INVOICE 1001.")])
+
+    duplicates = find_duplicate_transactions([("gl.xlsx", gl)])
+
+    assert clusters(duplicates, "near") == [[("gl.xlsx", 2), ("gl.xlsx", 3)]]
+
+
+def test_compact_frames_match_float_frames():
+    rows = [("Sales", "2024-01-05", "1001", "Acme", 150.1, "Invoice 1001"),
+            ("Sales", "2024-01-05", "1001", "Acme", 150.1, "Invoice 1001"),
+            ("Sales", "2024-01-07", "1002", "Acme", 150.1, "Invoice 1001.")]
+
+    plain = find_duplicate_transactions([("gl.xlsx", gl_frame(rows))])
+    compact = find_duplicate_transactions([("gl.xlsx", compact_gl_frame(gl_frame(rows)))])
+
+    pd.testing.assert_frame_equal(compact, plain)
+
+
+def test_exact_groups_take_part_in_near_clusters_once():
+    gl = gl_frame([("Sales", "2024-01-05", "1001", "Acme", 150.0, "Invoice 1001"),
+                   ("Sales", "2024-01-05", "1001", "Acme", 150.0, "Invoice 1001"),
+                   ("Sales", "2024-01-07", "1001-A", "Acme", 150.0, "Invoice 1001."),
+                   ("Sales", "2024-01-07", "9", "Other", 150.0, "Unrelated memo text")])
+
+    duplicates = find_duplicate_transactions([("gl.xlsx", gl)])
+
+    assert clusters(duplicates, "exact") == [[("gl.xlsx", 1), ("gl.xlsx", 2)]]
+    assert clusters(duplicates, "near") == [[("gl.xlsx", 1), ("gl.xlsx", 3)]]
+
+
+def test_rows_without_date_or_amount_are_ignored():
+    gl = gl_frame([("Sales", None, "1", "Acme", 150.0, "Invoice"), ("Sales", None, "1", "Acme", 150.0, "Invoice"),
+                   ("Sales", "2024-01-05", "2", "Acme", 0.0, "Void"), ("Sales", "2024-01-05", "2", "Acme", 0.0, "Void")])
+
+    assert find_duplicate_transactions([("gl.xlsx", gl)]).empty
+    assert find_duplicate_transactions([]).empty
+
+
+def test_messages():
+    gl = gl_frame([("Sales", "2024-01-05", "1001", "Acme", 150.0, "Invoice 1001"),
+                   ("Sales", "2024-01-05", "1001", "Acme", 150.0, "Invoice 1001"),
+                   ("Sales", "2024-01-07", "1001-A", "Acme", 150.0, "Invoice 1001.")])
+
+    messages = duplicate_messages(find_duplicate_transactions([("gl.xlsx", gl)]))
+
+    assert messages == [
+        "1 duplicate posting group(s) covering 2 rows.",
+        "Duplicate posting: gl.xlsx row(s) 1, 2 (2024-01-05, #1001, Acme, 150.00).",
+        "1 possible duplicate posting group(s) covering 2 rows.",
+        "Possible duplicate posting: gl.xlsx row(s) 1, 3 (2024-01-05, #1001, Acme, 150.00).",
+    ]
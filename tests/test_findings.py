@@ -0,0 +1,56 @@
+import pickle
+
+import pandas as pd
+
+from validators.findings import WARNING, Findings
+
+RULES = {
+    "invalid_amount": ("Invalid amount in '{column}'", ": '{value}'."),
+    "missing_date": ("Missing '{column}'", "."),
+}
+
+
+def sample_findings():
+    findings = Findings(RULES)
+    amounts = pd.Series(["1.00", "n/a", "2.00", "x"])
+    findings.extend_mask("invalid_amount", [False, True, False, True], column="Amount", values=amounts)
+    findings.add("missing_date", row=0, column="Date")
+    findings.add_message("Export has no Balance column.", severity=WARNING)
+    return findings
+
+
+def test_findings_survive_pickling():
+    findings = sample_findings()
+
+    restored = pickle.loads(pickle.dumps(findings))
+
+    assert len(restored) == len(findings) == 4
+    assert list(restored.messages()) == list(findings.messages()) == [
+        "Row 2: Invalid amount in 'Amount': 'n/a'.",
+        "Row 4: Invalid amount in 'Amount': 'x'.",
+        "Row 1: Missing 'Date'.",
+    ]
+    assert restored.messages(WARNING) == ["Export has no Balance column."]
+
+
+def test_messages_pickle_as_plain_strings():
+    messages = sample_findings().messages(by_row=True)
+
+    restored = pickle.loads(pickle.dumps(messages))
+
+    assert type(restored) is list
+    assert restored == ["Row 1: Missing 'Date'.", "Row 2: Invalid amount in 'Amount': 'n/a'.",
+                        "Row 4: Invalid amount in 'Amount': 'x'."]
+
+
+def test_messages_are_rendered_only_when_read(monkeypatch):
+    findings = sample_findings()
+    rendered = []
+    message = Findings.message
+    monkeypatch.setattr(Findings, "message", lambda self, i: rendered.append(i) or message(self, i))
+
+    messages = findings.messages()
+    assert len(messages) == 3 and rendered == []
+
+    assert messages[1] == "Row 4: Invalid amount in 'Amount': 'x'."
+    assert rendered == [1]
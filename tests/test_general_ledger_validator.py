@@ -0,0 +1,26 @@
+import pandas as pd
+
+from validators.general_ledger_validator import validate_general_ledger_data, validate_general_ledger_frame
+
+
+def test_masks_match_the_row_loop_on_edge_cases():
+    amounts = ["5.00", "", None, "n/a", "0", " 12 ", "1e3", "1_000", "inf", "1,000", "--1", "nan"]
+    df = pd.DataFrame({
+        "Date": ["2024-01-05", "2024-13-01", "", None, "2024-1-5", "05/01/2024"] * 2,
+        "Account": ["Cash", "", None, "0", "Sales", "Rent"] * 2,
+        "Description": ["Fee"] * 12,
+        "Amount": amounts,
+    })
+
+    by_rows = validate_general_ledger_data(df.to_dict("records"))
+    by_masks = validate_general_ledger_frame(df)
+
+    assert by_masks["errors"] == by_rows["errors"]
+    assert by_masks["summary"]["invalid_amount"]["rows"].tolist() == [3, 9, 10]
+
+
+def test_clean_amounts_take_the_fast_path():
+    df = pd.DataFrame({"Date": ["2024-01-05"] * 3, "Account": ["Cash"] * 3, "Description": ["Fee"] * 3,
+                       "Amount": ["1.50", "-2", "3e2"]})
+
+    assert validate_general_ledger_frame(df)["errors"] == []
@@ -0,0 +1,103 @@
+import shutil
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from benchmarks.synthetic_ledgers import GL_HEADER, gl_rows
+from readers.gl_reader import read_gl_excel_dynamic
+from readers.monthly_tb_reader import read_monthly_tb_excel_dynamic
+from services.incremental_gl import validate_gl_incremental
+from services.incremental_tb import validate_monthly_tb_incremental
+from services.ledger_store import LedgerStore
+from validators.general_ledger_validator import validate_gl
+from validators.trial_balance_validator import validate_trial_balance
+
+
+def write_gl(path, rows):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("General Ledger")
+    ws.append(["ACME Holdings Ltd."])
+    ws.append([])
+    ws.append(GL_HEADER)
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+BASE_ROWS = list(gl_rows(60, seed=1))
+APPENDED_ROWS = [
+    ["49000 Suspense"],
+    [None, "2024-12-01", "Journal Entry", "9001", "Vendor 1", "Accrual", "Checking", 100.0, 100.0],
+    [None, "2024-12-02", "Journal Entry", "9002", "Vendor 2", "Accrual", "Checking", "n/a", 100.0],
+    [None, "2024-12-03", "Journal Entry", "9003", "Vendor 3", "Accrual", "Checking", 50.0, 999.0],
+]
+
+
+@pytest.fixture
+def gl_path(tmp_path):
+    path = str(tmp_path / "gl.xlsx")
+    write_gl(path, BASE_ROWS)
+    return path
+
+
+def full_gl_findings(path):
+    return validate_gl(*read_gl_excel_dynamic(path))
+
+
+def test_gl_unchanged_export_is_not_reread(gl_path, tmp_path):
+    state_dir = str(tmp_path / "state")
+    first = validate_gl_incremental(gl_path, state_dir)
+    second = validate_gl_incremental(gl_path, state_dir)
+
+    assert first[2]["mode"] == "full"
+    assert second[2]["mode"] == "unchanged"
+    assert second[:2] == first[:2] == full_gl_findings(gl_path)
+
+
+def test_gl_appended_rows_are_checked_alone_and_stored(gl_path, tmp_path):
+    state_dir, store = str(tmp_path / "state"), LedgerStore(str(tmp_path / "store"))
+    validate_gl_incremental(gl_path, state_dir, store=store)
+    write_gl(gl_path, BASE_ROWS + APPENDED_ROWS)
+
+    errors, warnings, stats = validate_gl_incremental(gl_path, state_dir, store=store)
+
+    assert stats["mode"] == "append"
+    assert stats["rechecked"] == len(APPENDED_ROWS)
+    assert (errors, warnings) == full_gl_findings(gl_path)
+    assert any("'49000 Suspense': running balance breaks" in error for error in errors)
+    assert len(store.query_gl(columns=["parsed_amount"])) == len(read_gl_excel_dynamic(gl_path)[0])
+
+
+def test_gl_edited_row_triggers_a_full_reingest(gl_path, tmp_path):
+    state_dir, store = str(tmp_path / "state"), LedgerStore(str(tmp_path / "store"))
+    validate_gl_incremental(gl_path, state_dir, store=store)
+    edited = [list(row) for row in BASE_ROWS]
+    edited[5][7] = "n/a"
+    write_gl(gl_path, edited + APPENDED_ROWS)
+
+    errors, warnings, stats = validate_gl_incremental(gl_path, state_dir, store=store)
+
+    assert stats["mode"] == "full"
+    assert stats["changed_rows"] is not None
+    assert errors == full_gl_findings(gl_path)[0]
+    assert any("changed since the last run" in warning for warning in warnings)
+    assert len(store.query_gl(columns=["parsed_amount"])) == len(read_gl_excel_dynamic(gl_path)[0])
+
+
+def test_monthly_tb_rechecks_only_changed_months(ledger_file, tmp_path):
+    path = str(tmp_path / "monthly.xlsx")
+    shutil.copy(ledger_file("monthly_tb", 96), path)
+    state_dir = str(tmp_path / "state")
+    errors, _, stats = validate_monthly_tb_incremental(path, state_dir)
+    assert (errors, stats) == ([], {"periods": 24, "rechecked": 24, "reused": 0})
+
+    # Unbalance the third month: the first account's Debit (title rows, 2 header rows, then accounts)
+    wb = load_workbook(path)
+    wb.active.cell(row=7, column=6).value += 10
+    wb.save(path)
+    errors, warnings, stats = validate_monthly_tb_incremental(path, state_dir)
+
+    assert stats == {"periods": 24, "rechecked": 1, "reused": 23}
+    assert len(errors) == 1
+    assert (errors, warnings) == validate_trial_balance(read_monthly_tb_excel_dynamic(path))
+    assert validate_monthly_tb_incremental(path, state_dir)[2]["rechecked"] == 0
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+from lazy_imports import lazy_import
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_heavy_modules(statement):
+    code = f"import sys; {statement}; print(sorted(m for m in ('pandas', 'numpy', 'openpyxl') if m in sys.modules))"
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                          cwd=REPO_ROOT).stdout.strip()
+
+
+def test_entry_points_import_without_the_heavy_libraries():
+    assert loaded_heavy_modules("import main, web_app, report, services.serve, services.validation, "
+                                "validators.duplicate_validator") == "[]"
+
+
+def test_csv_classification_stays_light(tmp_path):
+    path = tmp_path / "gl.csv"
+    path.write_text("Date,Account,Description,Amount\n2024-01-05,Cash,Fee,5.00\n")
+
+    statement = f"from services.document_identifier import classify_file; classify_file({str(path)!r})"
+    assert loaded_heavy_modules(statement) == "[]"
+
+
+def test_lazy_modules_import_on_first_use_and_cache_attributes():
+    json_module = lazy_import("json")
+
+    assert repr(json_module) == "<lazy module 'json'>"
+    assert json_module.dumps([1]) == "[1]"
+    assert "dumps" in vars(json_module)
@@ -0,0 +1,100 @@
+import datetime
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from readers.compact import compact_gl_frame
+from services.ledger_store import LedgerStore, UNDATED_PARTITION
+
+
+def gl_frame(rows):
+    """Canonical GL rows from (account, date or None, amount) tuples."""
+    return pd.DataFrame({
+        "Account": [account for account, _, _ in rows],
+        "Date": [date or "" for _, date, _ in rows],
+        "Amount": [str(amount) for _, _, amount in rows],
+        "parsed_date": pd.to_datetime([date for _, date, _ in rows]),
+        "parsed_amount": [float(amount) for _, _, amount in rows],
+    })
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LedgerStore(str(tmp_path / "store"))
+
+
+def test_gl_rows_are_partitioned_by_entity_and_month(store):
+    store.ingest_gl(gl_frame([("Cash", "2024-07-03", 10), ("Sales", "2024-08-01", -10), ("Cash", None, 1)]),
+                    "acme", "gl.xlsx")
+
+    assert store.partitions("gl") == [("acme", "2024-07"), ("acme", "2024-08"), ("acme", UNDATED_PARTITION)]
+
+
+def test_queries_filter_on_entity_dates_and_accounts(store):
+    store.ingest_gl(gl_frame([("Cash", "2024-07-03", 10), ("Cash", "2024-09-30", 20), ("Sales", "2024-08-01", -10),
+                              ("Cash", "2024-10-01", 30)]), "acme", "gl.xlsx")
+    store.ingest_gl(gl_frame([("Cash", "2024-08-15", 99)]), "other", "gl.xlsx")
+
+    q3_cash = store.query_gl(entity="acme", accounts=["Cash"], start="2024-07-01", end="2024-09-30")
+
+    assert sorted(q3_cash["parsed_amount"]) == [10.0, 20.0]
+    assert set(q3_cash["entity"]) == {"acme"}
+    assert len(store.query_gl()) == 5
+
+
+def test_compact_frames_store_their_amounts(store):
+    compact = compact_gl_frame(gl_frame([("Cash", "2024-07-03", 10.1), ("Sales", "2024-07-04", -10.1)]))
+    store.ingest_gl(compact, "acme", "gl.xlsx")
+
+    assert "parsed_amount" not in compact.columns
+    assert sorted(store.query_gl()["parsed_amount"]) == [-10.1, 10.1]
+
+
+def test_reingesting_a_source_replaces_its_rows(store):
+    store.ingest_gl(gl_frame([("Cash", "2024-07-03", 10), ("Cash", "2024-08-03", 10)]), "acme", "gl.xlsx")
+    store.ingest_gl(gl_frame([("Cash", "2024-07-03", 12)]), "acme", "gl.xlsx")
+    store.ingest_gl(gl_frame([("Cash", "2024-07-04", 1)]), "acme", "other.xlsx")
+
+    rows = store.query_gl(columns=["parsed_amount"])
+
+    assert sorted(rows["parsed_amount"]) == [1.0, 12.0]
+
+
+def test_append_matches_a_full_ingest(store, tmp_path):
+    first = [("Cash", "2024-07-03", 10), ("Sales", "2024-07-05", -10)]
+    appended = [("Cash", "2024-07-20", 5), ("Cash", "2024-08-01", 7)]
+    store.ingest_gl(gl_frame(first), "acme", "gl.xlsx")
+    store.append_gl(gl_frame(appended), "acme", "gl.xlsx")
+    full = LedgerStore(str(tmp_path / "full"))
+    full.ingest_gl(gl_frame(first + appended), "acme", "gl.xlsx")
+
+    pd.testing.assert_frame_equal(store.query_gl(), full.query_gl())
+
+
+def test_tb_periods(store):
+    monthly = pd.DataFrame({"Account": ["Cash", "Cash"], "Debit": [1.0, 2.0], "Credit": [0.0, 0.0],
+                            "Month": [datetime.date(2024, 1, 1), datetime.date(2024, 2, 1)]})
+    single = pd.DataFrame({"Account": ["Cash"], "Debit": [3.0], "Credit": [0.0]})
+    store.ingest_tb(monthly, "acme", "monthly.xlsx")
+    store.ingest_tb(single, "acme", "single.xlsx", period="2024-03-31")
+
+    rows = store.query_tb(start="2024-02-01")
+
+    assert sorted(rows["Debit"]) == [2.0, 3.0]
+    with pytest.raises(ValueError, match="period"):
+        store.ingest_tb(single, "acme", "single.xlsx")
+
+
+def test_empty_store_queries_return_no_rows(store):
+    assert store.query_gl(accounts=["Cash"]).empty
+
+
+def test_importing_the_store_does_not_import_pandas_or_pyarrow():
+    code = ("import sys; import services.ledger_store; "
+            "print(sorted(m for m in ('pandas', 'pyarrow') if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=__file__.rsplit("/tests/", 1)[0]).stdout
+
+    assert output.strip() == "[]"
@@ -0,0 +1,56 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from readers.monthly_tb_reader import month_column_pairs, read_monthly_tb_excel_dynamic, reshape_month_pairs
+
+
+def wide_body(columns, rows):
+    return pd.DataFrame(rows, columns=pd.MultiIndex.from_tuples(columns), dtype=object)
+
+
+def melt_and_pivot(accounts, body):
+    """The long frame the reader used to build with melt + pivot_table."""
+    wide = body.copy()
+    wide.insert(0, ("Account", ""), accounts.to_numpy())
+    long = wide.melt(id_vars=[("Account", "")])
+    long.columns = ["Account", "Month", "Type", "Value"]
+    long["Value"] = pd.to_numeric(long["Value"], errors="coerce").fillna(0.0)
+    return long.pivot_table(index=["Account", "Month"], columns="Type", values="Value", aggfunc="sum").reset_index()
+
+
+def test_pair_reshape_matches_melt_and_pivot():
+    columns = [("Jan 2024", "Debit"), ("Jan 2024", "Credit"), ("Feb 2024", "Debit"), ("Feb 2024", "Credit")]
+    accounts = pd.Series(["Cash", "Sales", "Cash"])
+    body = wide_body(columns, [["10", None, "1", "n/a"], [None, "10", "2", "3"], ["5", None, None, None]])
+
+    reshaped = reshape_month_pairs(accounts, body, month_column_pairs(body.columns))
+
+    expected = melt_and_pivot(accounts, body)
+    expected["Month"] = expected["Month"].map({"Jan 2024": datetime.date(2024, 1, 1),
+                                               "Feb 2024": datetime.date(2024, 2, 1)})
+    key = ["Account", "Month"]
+    got = reshaped.sort_values(key, ignore_index=True)
+    want = expected[key + ["Debit", "Credit"]].sort_values(key, ignore_index=True)
+    want.columns.name = None
+    pd.testing.assert_frame_equal(got, want, check_dtype=False)
+    assert np.allclose(got.loc[got["Account"] == "Cash", "Debit"], [15.0, 1.0])
+
+
+def test_monthly_tb_workbook_is_read_long(write_workbook):
+    path = write_workbook("monthly.xlsx", [
+        ["Monthly trial balance"],
+        ["Account", "Jan. 2024", None, "Feb. 2024", None],
+        [None, "Debit", "Credit", "Debit", "Credit"],
+        ["Cash", 100.0, None, 50.0, None],
+        ["Sales", None, 100.0, None, 50.0],
+    ])
+
+    df = read_monthly_tb_excel_dynamic(path)
+
+    assert list(df.columns) == ["Account", "Month", "Debit", "Credit"]
+    assert df.values.tolist() == [
+        ["Cash", datetime.date(2024, 1, 1), 100.0, 0.0], ["Sales", datetime.date(2024, 1, 1), 0.0, 100.0],
+        ["Cash", datetime.date(2024, 2, 1), 50.0, 0.0], ["Sales", datetime.date(2024, 2, 1), 0.0, 50.0],
+    ]
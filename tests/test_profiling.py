@@ -0,0 +1,45 @@
+import openpyxl
+
+from readers import workbook_loader
+from services.validation import validate_files
+
+
+def stages(outcome):
+    return sorted({(record["file"], record["stage"]) for record in outcome["profile"]})
+
+
+def test_records_come_back_from_file_workers(ledger_file):
+    tasks = [("gl", ledger_file("gl", 200)), ("monthly_tb", ledger_file("monthly_tb", 50))]
+
+    in_process = validate_files(tasks, jobs=1, profile=True, profile_memory=False)
+    pooled = validate_files(tasks, jobs=2, profile=True, profile_memory=False)
+
+    assert [name for name, _ in pooled] == [name for name, _ in in_process]
+    for (name, outcome), (_, expected) in zip(pooled, in_process):
+        assert stages(outcome) == stages(expected)
+        assert {file for file, _ in stages(outcome)} == {name}
+        assert all(record["wall_seconds"] >= 0 and "peak_mib" in record for record in outcome["profile"])
+
+
+def test_records_come_back_from_sheet_workers(tmp_path, monkeypatch):
+    path = str(tmp_path / "entities.xlsx")
+    wb = openpyxl.Workbook()
+    wb.active.title = "Entity 0"
+    wb.create_sheet("Entity 1")
+    for ws in wb.worksheets:
+        ws.append(["Account", "Debit", "Credit"])
+        ws.append(["1000 Cash", 10.0, None])
+        ws.append(["4000 Sales", None, 10.0])
+    wb.save(path)
+
+    monkeypatch.setattr(workbook_loader, "_sheet_workers", 2)  # Read the sheets in the sheet pool
+    [(name, outcome)] = validate_files([("single_tb", path)], profile=True, profile_memory=False, sheets="all")
+
+    assert outcome["sheets"] == {"Entity 0": {"errors": [], "warnings": []},
+                                 "Entity 1": {"errors": [], "warnings": []}}
+    names = [record["stage"] for record in outcome["profile"]]
+    assert names.count("workbook opening") == 2  # One per worker batch (an in-process read opens it once)
+    # Each worker's records are nested under the stage open in the parent and carry the parent's file name
+    for sheet in ("Entity 0", "Entity 1"):
+        assert any(stage.endswith(f"sheet {sheet} / read_single_tb_excel_dynamic") for stage in names)
+    assert {file for file, _ in stages(outcome)} == {"entities.xlsx"}
@@ -0,0 +1,141 @@
+import datetime
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from services.reconciliation import (
+    MISSING_MONTH, RECONCILIATION_NAME, gl_activity, month_codes, reconcile_files, reconcile_gl_to_tb, tb_net
+)
+
+
+def gl_frame(rows):
+    """Canonical GL rows from (account, date, amount) tuples."""
+    return pd.DataFrame({
+        "Account": [account for account, _, _ in rows],
+        "parsed_date": pd.to_datetime([date for _, date, _ in rows]),
+        "parsed_amount": [amount for _, _, amount in rows],
+    })
+
+
+def tb_frame(rows):
+    """Monthly TB rows from (account, first of month, debit, credit) tuples."""
+    return pd.DataFrame(rows, columns=["Account", "Month", "Debit", "Credit"])
+
+
+JAN, FEB = datetime.date(2024, 1, 1), datetime.date(2024, 2, 1)
+
+
+def test_month_codes_mark_missing_dates():
+    codes = month_codes(pd.Series([pd.Timestamp("1970-02-15"), pd.NaT, pd.Timestamp("2024-01-31")]))
+
+    assert codes.tolist() == [1, MISSING_MONTH, 54 * 12]
+
+
+def test_months_before_1970_are_reconciled():
+    activity = gl_activity(gl_frame([("Cash", "1969-12-15", 10.0), ("Cash", "1970-01-15", 5.0)]))
+
+    by_month = dict(zip(activity["Month"], activity["Amount"]))
+    assert by_month == {-1: 10.0, 0: 5.0}
+
+
+def test_gl_activity_sums_per_account_and_month_and_skips_bad_rows():
+    activity = gl_activity(gl_frame([
+        ("Cash", "2024-01-05", 10.0), ("Cash", "2024-01-20", 5.0), ("Cash", "2024-02-01", 1.0),
+        ("Sales", "2024-01-05", -15.0), ("Cash", None, 99.0), ("", "2024-01-05", 99.0), ("Cash", "2024-01-06", None),
+    ]))
+
+    by_key = {(row.Account, row.Month): (row.Amount, row.Rows) for row in activity.itertuples()}
+    jan, feb = month_codes([JAN, FEB]).tolist()
+    assert by_key == {("Cash", jan): (15.0, 2), ("Cash", feb): (1.0, 1), ("Sales", jan): (-15.0, 1)}
+
+
+def test_hashed_and_dense_sums_agree(monkeypatch):
+    gl = gl_frame([("Cash", "2024-01-05", 10.0), ("Sales", "2023-06-05", -3.0), ("Cash", "2024-01-20", 5.0)])
+    dense = gl_activity(gl)
+
+    monkeypatch.setattr("services.reconciliation.MAX_DENSE_GROUPS", 1)
+    hashed = gl_activity(gl)
+
+    key = ["Account", "Month"]
+    pd.testing.assert_frame_equal(hashed.sort_values(key, ignore_index=True), dense.sort_values(key, ignore_index=True))
+
+
+def test_gl_activity_needs_an_account_column():
+    with pytest.raises(ValueError, match="Account"):
+        gl_activity(gl_frame([("Cash", "2024-01-05", 1.0)]).drop(columns="Account"))
+
+
+def test_reconcile_flags_variances_largest_first():
+    activity = gl_activity(gl_frame([
+        ("Cash", "2024-01-05", 100.0), ("Sales", "2024-01-05", -100.0), ("Rent", "2024-01-09", 7.0),
+        ("Cash", "2024-03-01", 1.0),
+    ]))
+    tb = tb_net(tb_frame([
+        ("Cash", JAN, 100.004, 0.0), ("Sales ", JAN, 0.0, 90.0), ("Fees", JAN, 2.0, 0.0),
+    ]))
+
+    variances, unmatched_rows = reconcile_gl_to_tb(activity, tb)
+
+    assert variances[["Account", "Month", "Variance"]].values.tolist() == [
+        ["Sales", JAN, pytest.approx(-10.0)], ["Rent", JAN, pytest.approx(7.0)], ["Fees", JAN, pytest.approx(-2.0)],
+    ]
+    assert unmatched_rows == 1
+
+
+def write_monthly_tb(path, months, rows):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Monthly TB")
+    ws.append(["Trial Balance by Month"])
+    ws.append([])
+    ws.append([None] + [cell for month in months for cell in (f"{month:%b. %Y}", None)])
+    ws.append(["Account"] + ["Debit", "Credit"] * len(months))
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def write_gl(path, sections):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("General Ledger")
+    ws.append(["General Ledger"])
+    ws.append([])
+    ws.append([None, "Date", "Num", "Memo/Description", "Amount", "Balance"])
+    for account, rows in sections.items():
+        ws.append([account])
+        balance = 0.0
+        for i, (date, amount) in enumerate(rows):
+            balance += amount
+            ws.append([None, date, str(i), "Entry", amount, balance])
+        ws.append([f"Total for {account}", None, None, None, balance])
+    wb.save(path)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_reconcile_files(tmp_path, compact):
+    gl_path, tb_path, out = str(tmp_path / "gl.xlsx"), str(tmp_path / "tb.xlsx"), str(tmp_path / "variances.csv")
+    write_gl(gl_path, {
+        "40000 Cash": [("2024-01-05", 100.0), ("2024-02-05", -30.0)],
+        "41000 Sales": [("2024-01-06", -100.0), ("2024-02-09", 30.0), ("2024-03-09", 5.0)],
+    })
+    write_monthly_tb(tb_path, [JAN, FEB], [
+        ["40000 Cash", 100.0, None, None, 30.0],
+        ["41000 Sales", None, 100.0, 25.0, None],
+    ])
+
+    name, result = reconcile_files([gl_path], [tb_path], reader_options={"compact": compact}, out=out)
+
+    assert name == RECONCILIATION_NAME
+    assert result["errors"] == [
+        "1 account-month(s) where GL activity differs from the Trial Balance by more than 0.01 "
+        "(total absolute variance: 5.00).",
+        "41000 Sales, 2024-02: GL activity 30.00, TB net 25.00, variance 5.00.",
+    ]
+    assert result["warnings"] == ["1 GL row(s) fall in months the Trial Balance does not cover and were not reconciled."]
+    assert pd.read_csv(out)["Variance"].tolist() == [5.0]
+
+
+def test_reconcile_files_needs_both_sides():
+    _, result = reconcile_files([], ["tb.xlsx"])
+
+    assert result["errors"] == ["Reconciliation needs at least one General Ledger and one monthly Trial Balance."]
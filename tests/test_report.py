@@ -0,0 +1,43 @@
+from report import MAX_FINDINGS_PER_SECTION, generate_html_report, group_findings, split_finding
+
+
+def test_row_messages_split_into_rule_row_and_value():
+    assert split_finding("Row 7: Invalid numeric format in 'Amount' field: 'n/a'.") == (
+        "Invalid numeric format in 'Amount' field", "7", "n/a")
+    assert split_finding("Row 3: Missing required field: 'Date'.") == ("Missing required field: 'Date'", "3", None)
+    assert split_finding("Trial Balance data is empty.") == ("Trial Balance data is empty.", None, None)
+
+
+def test_findings_are_grouped_with_bounded_samples():
+    messages = [f"Row {row}: Invalid numeric format in 'Amount' field: 'x{row}'." for row in range(1, 1001)]
+
+    findings, overflow = group_findings(messages + ["Trial Balance data is empty."], samples=3)
+
+    assert overflow == (0, 0)
+    assert findings == [
+        {"rule": "Invalid numeric format in 'Amount' field", "count": 1000,
+         "samples": [("1", "x1"), ("2", "x2"), ("3", "x3")]},
+        {"rule": "Trial Balance data is empty.", "count": 1, "samples": []},
+    ]
+
+
+def test_distinct_findings_beyond_the_limit_are_only_counted():
+    messages = [f"Free text message {i}" for i in range(MAX_FINDINGS_PER_SECTION + 5)] + ["Free text message 0"]
+
+    findings, overflow = group_findings(messages)
+
+    assert len(findings) == MAX_FINDINGS_PER_SECTION and findings[0]["count"] == 2
+    assert overflow == (5, 5)
+
+
+def test_report_lists_each_rule_once():
+    errors = [f"Row {row}: Invalid numeric format in 'Amount' field: '<{row}>'." for row in range(1, 501)]
+
+    report = generate_html_report({"gl.xlsx": {"errors": errors, "warnings": []},
+                                   "tb.xlsx": {"errors": [], "warnings": []}})
+
+    assert "Total Errors: 500, Total Warnings: 0" in report
+    assert report.count("Invalid numeric format") == 1
+    assert "&times; 500" in report and "and 490 more" in report
+    assert "&lt;1&gt;" in report and "<1>" not in report
+    assert "No issues found." in report
@@ -0,0 +1,30 @@
+import pytest
+
+from readers import workbook_loader
+from services import serve
+from services.validation import FILE_KINDS
+
+
+def test_warm_up_runs_every_file_kind(monkeypatch):
+    outcomes = {}
+    validate_file = serve.validate_file
+
+    def _validate_file(kind, path, **options):
+        outcomes[kind] = validate_file(kind, path, **options)[1]
+
+    monkeypatch.setattr(serve, "validate_file", _validate_file)
+    monkeypatch.setattr(workbook_loader, "_sheet_workers", None)  # warm_up sets this process's budget
+    serve.warm_up()
+
+    assert list(outcomes) == FILE_KINDS
+    assert all(outcome == {"errors": [], "warnings": []} for outcome in outcomes.values())
+
+
+def test_serve_socket_does_not_replace_other_files(tmp_path):
+    path = tmp_path / "not-a-socket"
+    path.write_text("keep me")
+    server = serve.ValidationServer.__new__(serve.ValidationServer)
+
+    with pytest.raises(ValueError, match="not a socket"):
+        server.serve_socket(str(path))
+    assert path.read_text() == "keep me"
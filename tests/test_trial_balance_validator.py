@@ -0,0 +1,34 @@
+import random
+
+import pandas as pd
+
+from validators.trial_balance_validator import validate_trial_balance, validate_trial_balance_debits_equal_credits
+
+
+def balanced_tb_rows(n_rows=100_000, seed=0):
+    """Large amounts with cents, posted once as debits and once, shuffled, as credits."""
+    rng = random.Random(seed)
+    amounts = [round(rng.uniform(1e5, 1e7), 2) for _ in range(n_rows)]
+    credits = amounts[:]
+    rng.shuffle(credits)
+    return ([{"Account": f"D{i}", "Debit": amount, "Credit": 0.0} for i, amount in enumerate(amounts)] +
+            [{"Account": f"C{i}", "Debit": 0.0, "Credit": amount} for i, amount in enumerate(credits)])
+
+
+def test_large_balanced_float_tb_stays_balanced():
+    rows = balanced_tb_rows()
+    # The float sums alone differ by far more than a rounding tolerance would allow
+    assert sum(row["Debit"] for row in rows) != sum(row["Credit"] for row in rows)
+
+    assert validate_trial_balance(pd.DataFrame(rows)) == ([], [])
+    assert validate_trial_balance_debits_equal_credits(rows)["is_valid"]
+
+
+def test_one_cent_is_unbalanced_in_a_large_tb():
+    rows = balanced_tb_rows()
+    rows[0]["Debit"] = round(rows[0]["Debit"] + 0.01, 2)
+
+    errors, _ = validate_trial_balance(pd.DataFrame(rows))
+
+    assert len(errors) == 1 and "Difference: 0.01" in errors[0]
+    assert not validate_trial_balance_debits_equal_credits(rows)["is_valid"]
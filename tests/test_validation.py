@@ -0,0 +1,51 @@
+import io
+
+import pytest
+
+from readers.file_type import SNIFF_SIZE, XLS_MAGIC, sniff_file_type
+from services.validation import validate_upload
+
+TB_CSV_WITH_TITLES = (
+    "Acme Corp\n"
+    "Trial balance as of 2024-01-31\n"
+    "\n"
+    "Account,Debit,Credit\n"
+    "Cash,100,0\n"
+    "Sales,0,90\n"
+)
+
+GL_CSV_WITH_TITLES = (
+    "Acme Corp,,,\n"
+    "General ledger,,,\n"
+    "Date,Account,Description,Amount\n"
+    "2024-01-05,Cash,Bank fee,5.00\n"
+    "2024-01-06,Cash,Bank fee,n/a\n"
+)
+
+
+def test_csv_title_rows_are_skipped_when_validating():
+    tb = validate_upload(io.BytesIO(TB_CSV_WITH_TITLES.encode()), "tb.csv")
+    gl = validate_upload(io.BytesIO(GL_CSV_WITH_TITLES.encode()), "gl.csv")
+
+    assert tb == {"document_type": "Trial Balance", "warnings": [],
+                  "errors": ["Trial Balance is unbalanced. Total Debits: 100.00, Total Credits: 90.00"]}
+    assert gl == {"document_type": "General Ledger", "warnings": [],
+                  "errors": ["Row 2: Invalid numeric format in 'Amount' field: 'n/a'."]}
+
+
+def test_file_type_is_sniffed_from_the_content(write_workbook):
+    with open(write_workbook("tb.xlsx", [["Account", "Debit", "Credit"]]), "rb") as f:
+        assert sniff_file_type(f) == "xlsx"
+    assert sniff_file_type(io.BytesIO(XLS_MAGIC + b"\x00" * 100)) == "xls"
+    assert sniff_file_type(io.BytesIO(b"Date,Amount\x00\n")) is None
+    assert sniff_file_type(io.BytesIO(b"")) is None
+    # A full sample cut in the middle of a multi-byte character is still text
+    assert sniff_file_type(io.BytesIO(("x" * (SNIFF_SIZE - 1) + "é").encode())) == "csv"
+    assert sniff_file_type(io.BytesIO(b"\xff\xfe" + b"x" * 100)) is None
+
+
+def test_uploads_that_are_not_csv_or_xlsx_are_rejected():
+    with pytest.raises(ValueError, match="legacy .xls"):
+        validate_upload(io.BytesIO(XLS_MAGIC + b"\x00" * 100), "tb.xls")
+    with pytest.raises(ValueError, match="neither an XLSX workbook nor a CSV"):
+        validate_upload(io.BytesIO(b"\x00\x01\x02"), "tb.csv")
@@ -0,0 +1,104 @@
+import io
+import threading
+import time
+
+import pytest
+
+import web_app
+from services.jobs import JobQueue
+
+GL_CSV = (
+    "Date,Account,Description,Amount\n"
+    "2024-01-05,Cash,Bank fee,5.00\n"
+    "2024-01-06,Cash,Bank fee,n/a\n"
+)
+
+
+@pytest.fixture
+def client():
+    web_app.app.config["TESTING"] = True
+    return web_app.app.test_client()
+
+
+def wait_for_result(client, result_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get(result_url)
+        if response.status_code != 202:
+            return response
+        time.sleep(0.02)
+    raise AssertionError("The job did not finish in time")
+
+
+def test_upload_returns_a_job_and_the_result_is_polled(client):
+    response = client.post("/upload", data={"file": (io.BytesIO(GL_CSV.encode()), "gl.csv")},
+                           content_type="multipart/form-data")
+
+    assert response.status_code == 202
+    job = response.get_json()
+    assert client.get(job["status_url"]).get_json()["status"] in ("queued", "running", "done")
+
+    result = wait_for_result(client, job["result_url"])
+    assert result.status_code == 200
+    body = result.get_json()
+    assert body["status"] == "done"
+    assert body["document_type"] == "General Ledger"
+    assert body["errors"] == ["Row 2: Invalid numeric format in 'Amount' field: 'n/a'."]
+
+
+def test_xlsx_upload_goes_through_the_excel_readers(client, write_workbook):
+    path = write_workbook("tb.xlsx", [["Account", "Debit", "Credit"], ["1000 Cash", 250.0, None],
+                                      ["4000 Sales", None, 250.0]])
+    with open(path, "rb") as f:
+        content = f.read()
+
+    response = client.post("/upload", data={"file": (io.BytesIO(content), "tb.xlsx")},
+                           content_type="multipart/form-data")
+    body = wait_for_result(client, response.get_json()["result_url"]).get_json()
+
+    assert body["document_type"] == "Trial Balance"
+    assert body["errors"] == []
+
+
+@pytest.mark.parametrize("data, message", [
+    ({}, "No file part"),
+    ({"file": (io.BytesIO(b"x"), "notes.txt")}, "Unsupported file type"),
+    ({"file": (io.BytesIO(b"\x00\x01\x02binary"), "fake.csv")}, "not a CSV or XLSX"),
+])
+def test_rejected_uploads(client, data, message):
+    response = client.post("/upload", data=data, content_type="multipart/form-data")
+
+    assert response.status_code == 400
+    assert message in response.get_json()["error"]
+
+
+def test_unknown_job_is_404(client):
+    assert client.get("/jobs/nope").status_code == 404
+    assert client.get("/jobs/nope/result").status_code == 404
+
+
+def test_job_queue_runs_jobs_in_the_background_and_records_failures():
+    queue = JobQueue(max_workers=2)
+    release = threading.Event()
+    try:
+        slow = queue.submit(lambda: release.wait(5) and "done")
+        failing = queue.submit(lambda: 1 / 0)
+
+        # submit() returned before the slow job could finish
+        assert queue.status(slow)["status"] in ("queued", "running")
+        release.set()
+    finally:
+        queue.shutdown(wait=True)
+
+    assert queue.result(slow)["result"] == "done"
+    assert queue.result(failing)["status"] == "failed"
+    assert "division by zero" in queue.result(failing)["error"]
+    assert "result" not in queue.status(slow)
+
+
+def test_job_queue_keeps_a_bounded_number_of_finished_jobs():
+    queue = JobQueue(max_workers=1, max_finished_jobs=3)
+    ids = [queue.submit(lambda i=i: i) for i in range(6)]
+    queue.shutdown(wait=True)
+
+    assert [queue.status(job_id) is not None for job_id in ids] == [False] * 3 + [True] * 3
@@ -0,0 +1,170 @@
+import openpyxl
+import pandas
+import pytest
+
+from readers import workbook_loader
+from readers.gl_reader import read_gl_excel_dynamic
+from readers.monthly_tb_reader import read_monthly_tb_excel_dynamic
+from readers.single_tb_reader import read_single_tb_excel_dynamic
+
+TITLE_ROWS = [["ACME Holdings Ltd."], ["Report"], ["Generated for the tests"], []]
+
+
+def single_tb_rows(accounts=40):
+    rows = [["Account", "Debit", "Credit"]]
+    rows += [[f"{10000 + i} Account {i}", 100.0 if i % 2 == 0 else None, 100.0 if i % 2 else None]
+             for i in range(accounts)]
+    return TITLE_ROWS + rows
+
+
+def monthly_tb_rows(accounts=10, months=("Jan. 2024", "Feb. 2024", "Mar. 2024")):
+    rows = [[None] + [cell for month in months for cell in (month, None)],
+            ["Account"] + ["Debit", "Credit"] * len(months)]
+    for i in range(accounts):
+        rows.append([f"{10000 + i} Account {i}"] + ([50.0, None] if i % 2 == 0 else [None, 50.0]) * len(months))
+    return TITLE_ROWS + rows
+
+
+def gl_rows(transactions=300):
+    rows = [[None, "Date", "Transaction Type", "Num", "Name", "Memo/Description", "Split", "Amount", "Balance"],
+            ["40000 Sales"]]
+    balance = 0.0
+    for i in range(transactions):
+        balance += 10.0
+        rows.append([None, f"2024-01-{i % 28 + 1:02d}", "Invoice", str(1000 + i), "Acme", f"Invoice {1000 + i}",
+                     "Accounts Receivable", 10.0, balance])
+    return TITLE_ROWS + rows + [["Total for 40000 Sales", None, None, None, None, None, None, balance]]
+
+
+READERS = [
+    ("single_tb", read_single_tb_excel_dynamic, single_tb_rows),
+    ("monthly_tb", read_monthly_tb_excel_dynamic, monthly_tb_rows),
+    ("gl", read_gl_excel_dynamic, gl_rows),
+]
+
+
+@pytest.fixture
+def parse_counts(monkeypatch):
+    """
+    Counts workbook loads and full pandas parses. Both the libraries and the
+    loader's lazy module proxies are patched, so calls made by pandas itself count too.
+    """
+    counts = {"load_workbook": 0, "read_excel": 0}
+
+    def counting(name, function):
+        def _counted(*args, **kwargs):
+            counts[name] += 1
+            return function(*args, **kwargs)
+        return _counted
+
+    load_workbook = counting("load_workbook", openpyxl.load_workbook)
+    read_excel = counting("read_excel", pandas.read_excel)
+    monkeypatch.setattr(openpyxl, "load_workbook", load_workbook)
+    monkeypatch.setattr(workbook_loader.openpyxl, "load_workbook", load_workbook)
+    monkeypatch.setattr(pandas, "read_excel", read_excel)
+    monkeypatch.setattr(workbook_loader.pd, "read_excel", read_excel)
+    return counts
+
+
+@pytest.mark.parametrize("kind, reader, rows", READERS, ids=[kind for kind, _, _ in READERS])
+def test_each_reader_loads_and_parses_a_file_once(write_workbook, parse_counts, kind, reader, rows):
+    path = write_workbook(f"{kind}.xlsx", rows())
+
+    result = reader(path)
+
+    df = result[0] if kind == "gl" else result
+    assert len(df) > 0
+    assert parse_counts == {"load_workbook": 1, "read_excel": 1}
+
+
+def test_header_detection_scans_only_the_first_rows(write_workbook):
+    path = write_workbook("gl.xlsx", gl_rows())
+    wb = workbook_loader.open_workbook(path)
+    try:
+        index, header_rows = workbook_loader.find_header(wb.active, lambda rows: "date" in rows[0])
+    finally:
+        wb.close()
+
+    assert index == 4  # Below the title rows
+    assert header_rows[0][1] == "Date"
+
+
+def test_missing_header_raises_value_error(tmp_path):
+    path = tmp_path / "notes.xlsx"
+    wb = openpyxl.Workbook()
+    wb.active.append(["Just a note"])
+    wb.save(path)
+
+    with pytest.raises(ValueError, match="Debit"):
+        read_single_tb_excel_dynamic(str(path))
+
+
+@pytest.fixture
+def multi_sheet_tb(tmp_path):
+    """Single TBs on three entity sheets, after a cover sheet without a header."""
+    path = str(tmp_path / "entities.xlsx")
+    wb = openpyxl.Workbook()
+    wb.active.title = "Cover"
+    wb.active.append(["Consolidation pack"])
+    for entity in range(3):
+        ws = wb.create_sheet(f"Entity {entity}")
+        ws.append(["Account", "Debit", "Credit"])
+        for account in range(entity + 2):
+            ws.append([f"{1000 + account} Account", 10.0 * (entity + 1), None])
+    wb.save(path)
+    return path
+
+
+def test_sheets_read_in_the_pool_match_an_in_process_read(multi_sheet_tb):
+    in_process = read_single_tb_excel_dynamic(multi_sheet_tb, sheets="all")
+    pooled = workbook_loader.read_workbook_sheets(read_single_tb_excel_dynamic, multi_sheet_tb, "all", max_workers=2)
+
+    assert list(pooled) == list(in_process) == ["Cover", "Entity 0", "Entity 1", "Entity 2"]
+    assert isinstance(pooled["Cover"], ValueError)
+    for name in ["Entity 0", "Entity 1", "Entity 2"]:
+        pandas.testing.assert_frame_equal(pooled[name], in_process[name])
+    assert len(pooled["Entity 2"]) == 4
+
+
+def test_buffers_are_read_in_process(multi_sheet_tb):
+    with open(multi_sheet_tb, "rb") as f:
+        results = workbook_loader.read_workbook_sheets(read_single_tb_excel_dynamic, f, "entity *", max_workers=2)
+
+    assert [len(results[name]) for name in results] == [2, 3, 4]
+
+
+def test_one_pool_serves_every_workbook(multi_sheet_tb, tmp_path):
+    pool = workbook_loader.sheet_pool(2)
+    workbook_loader.read_workbook_sheets(read_single_tb_excel_dynamic, multi_sheet_tb, "all", max_workers=2)
+
+    assert workbook_loader.sheet_pool(2) is pool
+
+
+def test_pool_workers_do_not_rely_on_fork(multi_sheet_tb):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Spawned workers start from a fresh interpreter and reopen the workbook by path
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        results, records = executor.submit(workbook_loader._read_sheets_in_worker, read_single_tb_excel_dynamic,
+                                           multi_sheet_tb, ["Entity 1"], {}, True, False).result()
+
+    assert len(results["Entity 1"]) == 3
+    assert any(record["stage"] == "workbook opening" for record in records)
+
+
+def test_workers_of_another_pool_read_sheets_in_process(monkeypatch):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        assert executor.submit(workbook_loader.sheet_workers).result() == 1
+
+    monkeypatch.setattr(workbook_loader, "_sheet_workers", None)
+    assert workbook_loader.sheet_workers() == workbook_loader.MAX_SHEET_WORKERS
+    workbook_loader.set_sheet_workers(0)
+    assert workbook_loader.sheet_workers() == 1
+
+
+def test_sheet_pool_spawns_its_workers():
+    assert workbook_loader.sheet_pool(2)._mp_context.get_start_method() == "spawn"
@@ -0,0 +1,353 @@
+import bisect
+import difflib
+import re
+import zlib
+from collections import defaultdict
+
+from lazy_imports import lazy_import
+from readers.compact import gl_amounts
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Columns of the canonical GL frame that identify a posting; an exact duplicate
+# repeats all of those present (Account keeps two sides of a journal apart)
+DUPLICATE_KEY_COLUMNS = ["Account", "parsed_date", "#", "Name", "parsed_amount"]
+
+# Near-duplicates: same account and amount, dates at most this many days apart...
+NEAR_DUPLICATE_DAYS = 3
+# ...and memos at least this similar (difflib ratio of the normalized text)
+MEMO_SIMILARITY = 0.8
+
+# Memo pairs compared with difflib per run of nearby postings; past it only rows
+# with the same normalized memo are linked, so a bulk posting cannot stall the check
+MAX_MEMO_COMPARISONS = 10_000
+
+# MinHash bands over the character 3-grams of a memo; memos are only compared
+# with difflib when they share a band key
+MEMO_HASH_BANDS = 4
+_MERSENNE_61 = 2 ** 61 - 1
+_BAND_HASHES = [((0x9E3779B97F4A7C15 * (band + 1)) % _MERSENNE_61, (0x632BE59BD9B4E019 * (band + 1)) % _MERSENNE_61)
+                for band in range(MEMO_HASH_BANDS)]
+
+# Clusters listed one by one in the messages (the frame has all of them)
+MAX_CLUSTERS_IN_MESSAGES = 20
+
+_NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+
+
+def _key_columns(frames):
+    """
+    Stacks the key columns of several GL frames into flat arrays (missing
+    columns as ""), with the frame number and row position of every row.
+
+    Returns:
+        dict: column -> ndarray, plus "source" and "row".
+    """
+    columns = {}
+    for col in DUPLICATE_KEY_COLUMNS + ["Memo/Description"]:
+        parts = []
+        for _, df in frames:
+            if col == "parsed_amount":
+                parts.append(gl_amounts(df).to_numpy(dtype=float))
+            elif col not in df.columns:
+                parts.append(np.full(len(df), "", dtype=object))
+            elif col == "parsed_date":
+                parts.append(pd.to_datetime(df[col], errors="coerce").to_numpy(dtype="datetime64[ns]"))
+            else:
+                parts.append(df[col].to_numpy(dtype=object))
+        columns[col] = np.concatenate(parts)
+    columns["source"] = np.concatenate([np.full(len(df), i) for i, (_, df) in enumerate(frames)])
+    columns["row"] = np.concatenate([np.arange(len(df)) for _, df in frames])
+    return columns
+
+
+def posting_index(keys):
+    """
+    Blocking index shared by both detectors: the rows with a date and a
+    non-zero amount, sorted once by (account, amount, date).
+
+    Account and amount are hash-factorized, dates are ranked; the three codes
+    form one int64 sort key (a lexsort when they do not fit), so equal and
+    nearby postings become neighbours without any pairwise comparison.
+
+    Returns:
+        (rows, block, date_code, day): the sorted row positions, their
+        (account, amount) block code, date rank and day number.
+    """
+    dates, amounts = keys["parsed_date"], keys["parsed_amount"]
+    rows = np.flatnonzero(~np.isnat(dates) & ~np.isnan(amounts) & (amounts != 0))
+    account, accounts = pd.factorize(keys["Account"][rows])
+    amount, amount_values = pd.factorize(amounts[rows])
+    date_code, date_values = pd.factorize(dates[rows], sort=True)
+    block = account.astype(np.int64) * len(amount_values) + amount
+
+    if len(accounts) * len(amount_values) * max(len(date_values), 1) < 2 ** 62:
+        order = np.argsort(block * len(date_values) + date_code, kind="stable")
+    else:
+        order = np.lexsort((date_code, amount, account))
+    day = dates[rows].astype("datetime64[D]").astype(np.int64)
+    return rows[order], block[order], date_code[order], day[order]
+
+
+def exact_duplicate_groups(keys, index):
+    """
+    Groups rows with identical key values.
+
+    Rows sharing account, amount and date are neighbours in the posting index;
+    only those are then grouped (hash-based) on the remaining key columns.
+
+    Returns:
+        ndarray: group id per row, -1 for rows without a duplicate.
+    """
+    groups = np.full(len(keys["row"]), -1, dtype=np.int64)
+    rows, block, date_code, _ = index
+    if len(rows) < 2:
+        return groups
+    same = (block[1:] == block[:-1]) & (date_code[1:] == date_code[:-1])
+    candidates = rows[np.append(same, False) | np.insert(same, 0, False)]
+    if not len(candidates):
+        return groups
+    frame = pd.DataFrame({col: keys[col][candidates] for col in DUPLICATE_KEY_COLUMNS})
+    ids = frame.groupby(DUPLICATE_KEY_COLUMNS, sort=False, dropna=False).ngroup().to_numpy()
+    keep = np.bincount(ids)[ids] > 1
+    groups[candidates[keep]] = pd.factorize(ids[keep])[0]
+    return groups
+
+
+def without_repeats(index, groups):
+    """
+    Drops all but the first row of every exact duplicate group from the
+    posting index, so that a group takes part in near-duplicate detection once.
+    """
+    rows = index[0]
+    ids = groups[rows]
+    keep = (ids < 0) | ~pd.Series(ids).duplicated().to_numpy()
+    return tuple(part[keep] for part in index)
+
+
+def near_duplicate_runs(keys, index, days=NEAR_DUPLICATE_DAYS):
+    """
+    Candidate regions of near-duplicates: in the posting index, a new run
+    starts wherever the (account, amount) block changes or the gap to the
+    previous date exceeds `days`. Every pair of rows at most `days` apart
+    falls in one run; the pairs themselves are checked by near_duplicate_clusters.
+
+    Returns:
+        ndarray: run id per row, -1 for rows alone in their run.
+    """
+    runs = np.full(len(keys["row"]), -1, dtype=np.int64)
+    rows, block, _, day = index
+    if len(rows) < 2:
+        return runs
+    new_run = np.ones(len(rows), dtype=bool)
+    new_run[1:] = (block[1:] != block[:-1]) | (np.diff(day) > days)
+    run_ids = np.cumsum(new_run) - 1
+    shared = np.bincount(run_ids)[run_ids] > 1
+    runs[rows[shared]] = pd.factorize(run_ids[shared])[0]
+    return runs
+
+
+def memo_band_keys(text):
+    """
+    MinHash keys of a normalized memo: per band, the smallest hash of its
+    character 3-grams (of the whole text when shorter). Memos sharing most of
+    their 3-grams share a band key with high probability.
+    """
+    shingles = {text[i:i + 3] for i in range(len(text) - 2)} or {text}
+    base = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles]
+    return [(band, min((a * h + b) % _MERSENNE_61 for h in base)) for band, (a, b) in enumerate(_BAND_HASHES)]
+
+
+def similar_memos(texts, memo_similarity=MEMO_SIMILARITY, max_comparisons=MAX_MEMO_COMPARISONS):
+    """
+    Finds the pairs of distinct normalized memos at least `memo_similarity`
+    similar (difflib ratio). Only memos sharing a band key (see memo_band_keys)
+    are compared, each pair once and at most `max_comparisons` pairs in all.
+
+    Returns:
+        list: per memo, the set of positions of the memos similar to it (itself included).
+    """
+    similar = [{i} for i in range(len(texts))]
+    buckets = defaultdict(list)
+    for i, text in enumerate(texts):
+        for key in memo_band_keys(text):
+            buckets[key].append(i)
+
+    compared = set()
+    matcher = difflib.SequenceMatcher(None)
+    for bucket in buckets.values():
+        for position, first in enumerate(bucket):
+            matcher.set_seq2(texts[first])  # The matcher indexes its second sequence once
+            for second in bucket[position + 1:]:
+                if second in similar[first] or (first, second) in compared:
+                    continue
+                if len(compared) >= max_comparisons:
+                    return similar
+                compared.add((first, second))
+                matcher.set_seq1(texts[second])
+                if (matcher.real_quick_ratio() >= memo_similarity and matcher.quick_ratio() >= memo_similarity
+                        and matcher.ratio() >= memo_similarity):
+                    similar[first].add(second)
+                    similar[second].add(first)
+    return similar
+
+
+def near_duplicate_clusters(row_days, texts, days=NEAR_DUPLICATE_DAYS, memo_similarity=MEMO_SIMILARITY,
+                            max_comparisons=MAX_MEMO_COMPARISONS):
+    """
+    Clusters the rows of one run, sorted by day: two rows are linked when
+    their dates are at most `days` apart and their memos are similar (see
+    similar_memos), and a cluster is a connected group of linked rows.
+
+    Every row is linked to the next row of each memo similar to its own
+    (its own included) if that row is within `days`; later rows of that memo
+    within `days` follow through the rows of the memo itself. The work grows
+    with the rows times the similar memos, not with the rows squared.
+
+    Args:
+        row_days (list): Day number of each row, ascending.
+        texts (list): Normalized memo of each row.
+
+    Returns:
+        list: lists of positions in the run, one per cluster of 2 or more.
+    """
+    memo_ids, distinct = {}, []
+    for text in texts:
+        if text not in memo_ids:
+            memo_ids[text] = len(distinct)
+            distinct.append(text)
+    row_memos = [memo_ids[text] for text in texts]
+    occurrences = defaultdict(list)
+    for position, memo in enumerate(row_memos):
+        occurrences[memo].append(position)
+    similar = similar_memos(distinct, memo_similarity, max_comparisons)
+
+    parent = list(range(len(texts)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for position, memo in enumerate(row_memos):
+        last_day = row_days[position] + days
+        for other in similar[memo]:
+            rows = occurrences[other]
+            following = bisect.bisect_right(rows, position)
+            if following < len(rows) and row_days[rows[following]] <= last_day:
+                parent[root(rows[following])] = root(position)
+
+    clusters = defaultdict(list)
+    for position in range(len(texts)):
+        clusters[root(position)].append(position)
+    return [cluster for cluster in clusters.values() if len(cluster) > 1]
+
+
+def _normalized_memo(value):
+    return _NON_ALPHANUMERIC.sub(" ", str(value).lower()).strip() if value is not None and value == value else ""
+
+
+def find_duplicate_transactions(frames, days=NEAR_DUPLICATE_DAYS, memo_similarity=MEMO_SIMILARITY):
+    """
+    Finds exact and near-duplicate postings within and across GL frames.
+
+    - exact: rows repeating Account, date, '#', Name and amount (see exact_duplicate_groups).
+    - near: rows of one account with the same amount, linked to another by a
+      date at most `days` apart and a memo at least `memo_similarity` similar
+      (see near_duplicate_runs and near_duplicate_clusters). An exact group
+      takes part through its first row only, so its other rows are not
+      reported again. Memos are only compared inside these runs, and only
+      when they share a MinHash band key.
+
+    Args:
+        frames (list): (name, DataFrame) pairs of canonical GL frames (read_gl_excel_dynamic).
+        days (int): Largest date difference of near-duplicates.
+        memo_similarity (float): Smallest memo similarity of near-duplicates (0-1).
+
+    Returns:
+        DataFrame [Cluster, Kind, File, Row, Account, Date, #, Name, Amount, Memo/Description]:
+        one line per row of every cluster (Row is 1-based, as in the validators'
+        messages), exact clusters first, then near ones.
+    """
+    columns = ["Cluster", "Kind", "File", "Row", "Account", "Date", "#", "Name", "Amount", "Memo/Description"]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    keys = _key_columns(frames)
+    index = posting_index(keys)
+    exact = exact_duplicate_groups(keys, index)
+    runs = near_duplicate_runs(keys, without_repeats(index, exact), days)
+
+    # Near clusters: the linked rows of each run, walked in date order
+    near = np.full(len(keys["row"]), -1, dtype=np.int64)
+    members = np.flatnonzero(runs >= 0)
+    day = keys["parsed_date"][members].astype("datetime64[D]").astype(np.int64)
+    order = np.lexsort((day, runs[members]))
+    members, day = members[order], day[order]
+    bounds = np.flatnonzero(np.diff(runs[members])) + 1
+    memos = keys["Memo/Description"]
+    cluster = 0
+    for run, run_days in zip(np.split(members, bounds), np.split(day, bounds)) if len(members) else []:
+        texts = [_normalized_memo(memos[i]) for i in run]
+        for linked in near_duplicate_clusters(run_days.tolist(), texts, days, memo_similarity):
+            near[run[linked]] = cluster
+            cluster += 1
+
+    names = np.array([name for name, _ in frames], dtype=object)
+    parts = []
+    for kind, ids in (("exact", exact), ("near", near)):
+        rows = np.flatnonzero(ids >= 0)
+        rows = rows[np.argsort(ids[rows], kind="stable")]
+        offset = sum(part["Cluster"].nunique() for part in parts)
+        parts.append(pd.DataFrame({
+            "Cluster": ids[rows] + offset,
+            "Kind": kind,
+            "File": names[keys["source"][rows]],
+            "Row": keys["row"][rows] + 1,
+            "Account": keys["Account"][rows],
+            "Date": keys["parsed_date"][rows],
+            "#": keys["#"][rows],
+            "Name": keys["Name"][rows],
+            "Amount": keys["parsed_amount"][rows],
+            "Memo/Description": keys["Memo/Description"][rows],
+        }, columns=columns))
+    return pd.concat(parts, ignore_index=True)
+
+
+def duplicate_messages(duplicates, max_clusters=MAX_CLUSTERS_IN_MESSAGES):
+    """
+    Formats find_duplicate_transactions output: a count per kind, then the
+    first `max_clusters` clusters of each kind with their file rows.
+    """
+    messages = []
+    titles = {"exact": "Duplicate posting", "near": "Possible duplicate posting"}
+    for kind, group in duplicates.groupby("Kind", sort=False):
+        clusters = group.groupby("Cluster", sort=False)
+        messages.append(f"{clusters.ngroups} {titles[kind].lower()} group(s) covering {len(group)} rows.")
+        for _, cluster in list(clusters)[:max_clusters]:
+            first = cluster.iloc[0]
+            places = "; ".join(
+                f"{file} row(s) {', '.join(str(row) for row in rows)}"
+                for file, rows in cluster.groupby("File", sort=False)["Row"]
+            )
+            messages.append(f"{titles[kind]}: {places} ({pd.Timestamp(first['Date']):%Y-%m-%d}, "
+                            f"#{first['#']}, {first['Name']}, {first['Amount']:.2f}).")
+        if clusters.ngroups > max_clusters:
+            messages.append(f"... and {clusters.ngroups - max_clusters} more {titles[kind].lower()} group(s).")
+    return messages
+
+
+if __name__ == '__main__':
+    # Example: an invoice exported twice and a re-keyed copy with a slightly different memo
+    gl = pd.DataFrame({
+        "Account": ["Sales", "Sales", "Sales", "Rent"],
+        "parsed_date": pd.to_datetime(["2024-01-05", "2024-01-05", "2024-01-07", "2024-01-05"]),
+        "#": ["1001", "1001", "1001-A", "77"],
+        "Name": ["Acme", "Acme", "Acme", "Landlord"],
+        "parsed_amount": [150.0, 150.0, 150.0, -2500.0],
+        "Memo/Description": ["Invoice 1001", "Invoice 1001", "Invoice 1001.", "January rent"],
+    })
+    duplicates = find_duplicate_transactions([("gl.xlsx", gl)])
+    print(duplicates)
+    print(duplicate_messages(duplicates))
@@ -0,0 +1,269 @@
+from array import array
+from collections.abc import Sequence
+
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+ERROR = 0
+WARNING = 1
+SEVERITY_NAMES = {ERROR: "error", WARNING: "warning"}
+
+# Free-text findings (e.g. "Trial Balance data is empty."), available in every container
+MESSAGE_RULE = "message"
+
+# Sample occurrences returned per rule by Findings.summary
+SAMPLES_PER_RULE = 10
+# Messages shown by repr() of a FindingMessages list
+REPR_MESSAGES = 20
+
+
+class Findings:
+    """
+    Columnar store of validation findings.
+
+    Each finding is one entry in parallel typed arrays: row position, rule code,
+    column code, severity and a value reference (source, position), 15 bytes
+    per finding instead of one formatted string (~130 bytes) per bad cell.
+    Values are looked up in registered sources (e.g. the validated column) only
+    when a message is rendered, so bulk findings store no Python objects at all.
+
+    Rules map a name to (title, detail) templates; a finding renders as
+    "Row N: " (when it has a row) + title.format(column=...) + detail.format(value=...).
+
+    Args:
+        rules (dict): rule name -> (title, detail).
+        row_offset (int): added to row positions when rendered (1 = 1-based rows).
+    """
+
+    def __init__(self, rules=None, row_offset=1):
+        self.rules = {MESSAGE_RULE: ("{value}", "")}
+        self.rules.update(rules or {})
+        self.row_offset = row_offset
+        self._rule_codes, self._rule_names = {}, []
+        self._column_codes, self._column_names = {}, []
+        # Source 0 holds values added one at a time
+        self._sources = [[]]
+        self._rows = array("i")
+        self._rule = array("h")
+        self._column = array("h")
+        self._severity = array("b")
+        self._source = array("h")
+        self._position = array("i")
+
+    # --- building -------------------------------------------------------------
+
+    @staticmethod
+    def _code(codes, names, name):
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+    def _rule_code(self, rule):
+        if rule not in self.rules:
+            raise ValueError(f"Unknown finding rule: {rule}")
+        return self._code(self._rule_codes, self._rule_names, rule)
+
+    def _column_code(self, column):
+        return self._code(self._column_codes, self._column_names, column)
+
+    def add(self, rule, row=-1, column=None, value=None, severity=ERROR):
+        """
+        Appends one finding. `value` is kept as is (rendered only when needed).
+        """
+        self._rows.append(int(row))
+        self._rule.append(self._rule_code(rule))
+        self._column.append(self._column_code(column))
+        self._severity.append(severity)
+        if value is None:
+            self._source.append(-1)
+            self._position.append(-1)
+        else:
+            self._source.append(0)
+            self._position.append(len(self._sources[0]))
+            self._sources[0].append(value)
+
+    def add_message(self, text, severity=ERROR):
+        """
+        Appends a free-text finding that is not tied to a row.
+        """
+        self.add(MESSAGE_RULE, value=text, severity=severity)
+
+    def extend(self, rule, rows, column=None, values=None, severity=ERROR):
+        """
+        Appends one finding per row position in `rows` in a single bulk copy.
+
+        Args:
+            rows (array-like): integer row positions.
+            values: optional Series/array indexed by row position (e.g. the whole
+                    validated column); it is referenced, not copied, and only the
+                    flagged positions are ever read.
+        """
+        rows = np.asarray(rows, dtype=np.int32)
+        n = len(rows)
+        if n == 0:
+            return
+        self._rows.frombytes(rows.tobytes())
+        self._rule.frombytes(np.full(n, self._rule_code(rule), dtype=np.int16).tobytes())
+        self._column.frombytes(np.full(n, self._column_code(column), dtype=np.int16).tobytes())
+        self._severity.frombytes(np.full(n, severity, dtype=np.int8).tobytes())
+        if values is None:
+            self._source.frombytes(np.full(n, -1, dtype=np.int16).tobytes())
+            self._position.frombytes(np.full(n, -1, dtype=np.int32).tobytes())
+        else:
+            self._sources.append(values.to_numpy() if hasattr(values, "to_numpy") else values)
+            self._source.frombytes(np.full(n, len(self._sources) - 1, dtype=np.int16).tobytes())
+            self._position.frombytes(rows.tobytes())
+
+    def extend_mask(self, rule, mask, column=None, values=None, severity=ERROR):
+        """
+        Appends one finding per True entry of a boolean mask over row positions.
+        """
+        self.extend(rule, np.flatnonzero(np.asarray(mask, dtype=bool)), column, values, severity)
+
+    # --- columnar access ------------------------------------------------------
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __repr__(self):
+        return (f"Findings({self.count(ERROR)} {SEVERITY_NAMES[ERROR]}s, "
+                f"{self.count(WARNING)} {SEVERITY_NAMES[WARNING]}s)")
+
+    @property
+    def rows(self):
+        return np.frombuffer(self._rows, dtype=np.int32) if len(self) else np.empty(0, dtype=np.int32)
+
+    @property
+    def rule_codes(self):
+        return np.frombuffer(self._rule, dtype=np.int16) if len(self) else np.empty(0, dtype=np.int16)
+
+    @property
+    def severities(self):
+        return np.frombuffer(self._severity, dtype=np.int8) if len(self) else np.empty(0, dtype=np.int8)
+
+    def rule_names(self):
+        """
+        Rule names in code order (code i is rule_names()[i]).
+        """
+        return list(self._rule_names)
+
+    def count(self, severity=None, rule=None):
+        """
+        Number of findings, optionally of one severity and/or rule.
+        """
+        return int(self._select(severity, rule).sum()) if (severity is not None or rule is not None) else len(self)
+
+    def _select(self, severity=None, rule=None):
+        selected = np.ones(len(self), dtype=bool)
+        if severity is not None:
+            selected &= self.severities == severity
+        if rule is not None:
+            selected &= self.rule_codes == self._rule_codes.get(rule, -1)
+        return selected
+
+    def value(self, i):
+        source = self._source[i]
+        return None if source < 0 else self._sources[source][self._position[i]]
+
+    # --- rendering ------------------------------------------------------------
+
+    def message(self, i):
+        """
+        Renders finding i as text.
+        """
+        rule = self._rule_names[self._rule[i]]
+        column = self._column_names[self._column[i]]
+        title, detail = self.rules[rule]
+        fields = {"column": column, "value": self.value(i)}
+        prefix = f"Row {self._rows[i] + self.row_offset}: " if self._rows[i] >= 0 else ""
+        return prefix + title.format(**fields) + detail.format(**fields)
+
+    def order(self, severity=None, by_row=False):
+        """
+        Positions of the findings of `severity`, in insertion order or sorted by
+        (row, rule code), i.e. the order a row-by-row validator would report them.
+        """
+        positions = np.flatnonzero(self._select(severity))
+        if by_row:
+            positions = positions[np.lexsort((self.rule_codes[positions], self.rows[positions]))]
+        return positions
+
+    def messages(self, severity=ERROR, by_row=False):
+        """
+        Lazy list-like view of the rendered messages (see FindingMessages).
+        """
+        return FindingMessages(self, self.order(severity, by_row), severity)
+
+    def summary(self, severity=ERROR, samples=SAMPLES_PER_RULE):
+        """
+        Groups the findings of `severity` by rule and column in order of first
+        appearance, from the arrays alone (only the sample values are read).
+
+        Returns:
+            list of {"rule": title, "count": n, "samples": [(row, value), ...]};
+            free-text findings each form their own group.
+        """
+        positions = np.flatnonzero(self._select(severity))
+        if not len(positions):
+            return []
+        key = self.rule_codes[positions].astype(np.int64) * (len(self._column_names) + 1) + \
+            np.frombuffer(self._column, dtype=np.int16)[positions]
+        message_code = self._rule_codes.get(MESSAGE_RULE, -1)
+        uniques, first, counts = np.unique(key, return_index=True, return_counts=True)
+
+        groups = []
+        for k in np.argsort(first, kind="stable"):
+            members = positions[key == uniques[k]]
+            i = int(members[0])
+            rule = self._rule_names[self._rule[i]]
+            if self._rule[i] == message_code:
+                groups.extend((int(j), {"rule": self.message(int(j)), "count": 1, "samples": []}) for j in members)
+                continue
+            column = self._column_names[self._column[i]]
+            title = self.rules[rule][0].format(column=column, value="")
+            sample_rows = [
+                (int(self._rows[j]) + self.row_offset if self._rows[j] >= 0 else None, self.value(int(j)))
+                for j in members[:samples]
+            ]
+            groups.append((i, {"rule": title, "count": int(counts[k]), "samples": sample_rows}))
+        groups.sort(key=lambda item: item[0])
+        return [group for _, group in groups]
+
+
+class FindingMessages(Sequence):
+    """
+    Read-only list of messages rendered on demand from a Findings container.
+
+    Behaves like the list of strings the validators used to return (len, index,
+    iterate, compare with a list) without creating the strings up front.
+    """
+
+    def __init__(self, findings, positions, severity=ERROR):
+        self.findings = findings
+        self.severity = severity
+        self._positions = positions
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.findings.message(int(i)) for i in self._positions[index]]
+        return self.findings.message(int(self._positions[index]))
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, FindingMessages)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        # Shown like the list it stands in for, truncated for very long lists
+        shown = repr(self[:REPR_MESSAGES])
+        return shown if len(self) <= REPR_MESSAGES else f"{shown[:-1]}, ... ({len(self)} in total)]"
+
+    def __reduce__(self):
+        # Sent between processes as plain strings; sources stay in the worker
+        return list, (list(self),)
@@ -1,50 +1,72 @@
-import datetime
+from lazy_imports import lazy_import
+from profiling import stage
+from readers.compact import gl_amounts
+from readers.date_parser import matches_format, invalid_format_mask
+from validators.findings import Findings
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Canonical columns produced by read_gl_excel_dynamic that every GL row needs
+GL_REQUIRED_COLUMNS = ["Date", "Amount"]
+
+# Number of row numbers listed per rule in summary messages
+MAX_ROWS_IN_MESSAGE = 10
+
+# Largest difference between 'Balance' and the running balance still considered equal
+RUNNING_BALANCE_TOLERANCE = 0.005
+
+# Row-level findings of validate_general_ledger_data / validate_general_ledger_frame:
+# rule -> (title, detail), rendered as "Row N: " + title + detail (see validators.findings)
+GL_ROW_RULES = {
+    "missing_field": ("Missing required field: '{column}'", "."),
+    "invalid_date": ("Invalid date format in 'Date' field. Expected format: YYYY-MM-DD", ", got: '{value}'."),
+    "invalid_amount": ("Invalid numeric format in 'Amount' field", ": '{value}'."),
+}
 
 def validate_general_ledger_data(data):
     """
     Validates General Ledger data for required fields and data types.
 
     Args:
-        data (list): A list of dictionaries representing General Ledger transaction data.
+        data (iterable): A list of dictionaries, or a row iterator such as iter_csv_rows /
+                       iter_xlsx_rows, representing General Ledger transaction data.
                        Each dictionary is expected to have keys like 'Date', 'Account',
-                       'Description', and 'Amount' (case-insensitive).
+                       'Description', and 'Amount' (case-insensitive). Rows are consumed
+                       one at a time, so iterators are never materialized.
 
     Returns:
         dict: A dictionary containing validation results:
-              {'is_valid': True/False, 'errors': [list of error messages]}
+              {'is_valid': True/False, 'errors': [list of error messages], 'findings': Findings}
               'errors' will be a list of error messages if validation fails,
-              or an empty list if validation is successful.
+              or an empty list if validation is successful. It is rendered lazily
+              from 'findings', the structured (columnar) record of the same issues.
     """
-    errors = []
+    findings = Findings(GL_ROW_RULES)
     required_headers = ['date', 'account', 'description', 'amount'] # Expected headers (lowercase for matching)
-
-    if not data:
-        return {'is_valid': False, 'errors': ["General Ledger data is empty."]}
-
-    # Check for required headers in the first row (if headers are present)
-    if data and data[0]:
-        data_headers = [header.lower() for header in data[0].keys() if header] # Get headers, lowercase
-        missing_headers = [header for header in required_headers if header not in data_headers]
-        if missing_headers:
-            errors.append(f"Missing required headers: {', '.join(missing_headers)}. Required headers are: {', '.join(required_headers)}")
-            return {'is_valid': False, 'errors': errors} # Early exit if required headers are missing
-
+    row_count = 0
 
     for index, row in enumerate(data):
-        row_num = index + 1 # For user-friendly error messages (row numbers start from 1)
+        row_count = index + 1 # Findings store the 0-based index and report 1-based row numbers
+        row = {str(header).lower(): value for header, value in row.items() if header} # Lowercase keys
+
+        # Check for required headers in the first row (if headers are present)
+        if index == 0 and row:
+            missing_headers = [header for header in required_headers if header not in row]
+            if missing_headers:
+                findings.add_message(f"Missing required headers: {', '.join(missing_headers)}. Required headers are: {', '.join(required_headers)}")
+                return {'is_valid': False, 'errors': findings.messages(), 'findings': findings} # Early exit if required headers are missing
 
         # Check for missing required fields in each row
         for header in required_headers:
             if not row.get(header): # Use .get() to avoid KeyError, handles missing columns
-                errors.append(f"Row {row_num}: Missing required field: '{header}'.")
+                findings.add('missing_field', row=index, column=header)
 
         # Validate 'Date' field
         date_str = row.get('date')
         if date_str:
-            try:
-                datetime.datetime.strptime(date_str, '%Y-%m-%d') # Example date format, adjust if needed
-            except ValueError:
-                errors.append(f"Row {row_num}: Invalid date format in 'Date' field. Expected format: YYYY-MM-DD, got: '{date_str}'.")
+            if not matches_format(date_str, '%Y-%m-%d'): # Example date format, adjust if needed
+                findings.add('invalid_date', row=index, column='date', value=date_str)
 
         # Validate 'Amount' field
         amount_str = row.get('amount')
@@ -52,12 +74,379 @@ def validate_general_ledger_data(data):
             try:
                 float(amount_str) # Try converting to float to check if it's numeric
             except ValueError:
-                errors.append(f"Row {row_num}: Invalid numeric format in 'Amount' field: '{amount_str}'.")
+                findings.add('invalid_amount', row=index, column='amount', value=amount_str)
+
+    if row_count == 0:
+        findings.add_message("General Ledger data is empty.")
+
+    return {'is_valid': not len(findings), 'errors': findings.messages(), 'findings': findings}
+
 
-    if errors:
-        return {'is_valid': False, 'errors': errors}
+def _missing_mask(series):
+    """
+    True where a value is absent (None/NaN) or an empty string.
+
+    Two whole-array passes over the objects: a bool cast finds the falsy
+    values (None and "", but also 0), which are then narrowed down to None
+    and "", and NaN / NaT are the values unequal to themselves.
+    """
+    values = series.to_numpy(dtype=object)
+    try:
+        falsy = np.flatnonzero(~values.astype(bool))
+    except (TypeError, ValueError):  # pd.NA has no truth value
+        return series.isna() | (series == "")
+    missing = np.asarray(values != values, dtype=bool)
+    missing[falsy] = [value is None or value == "" for value in values[falsy]]
+    return pd.Series(missing, index=series.index)
+
+
+def _parses_as_float(value):
+    try:
+        float(value)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+def _invalid_numbers(series):
+    """
+    True where float() rejects the value. Amount columns are mostly distinct
+    values, so they are checked directly rather than factorized first.
+    """
+    values = series.to_numpy(dtype=object)
+    try:
+        values.astype(float)  # The cast calls float() on each value and stops at the first it rejects
+        return pd.Series(False, index=series.index)
+    except (ValueError, TypeError):
+        pass
+    # float() applied element by element through a ufunc: accepts exactly what the row loop does
+    parses = np.frompyfunc(_parses_as_float, 1, 1)(values)
+    return pd.Series(~parses.astype(bool), index=series.index)
+
+
+def general_ledger_error_masks(df, required_headers=('date', 'account', 'description', 'amount')):
+    """
+    Computes one boolean mask per rule of validate_general_ledger_data over a DataFrame.
+
+    Args:
+        df (DataFrame): GL rows with (case-insensitive) 'Date', 'Account',
+                        'Description' and 'Amount' columns, as strings.
+
+    Returns:
+        dict: rule name -> (boolean Series over df.index, column name). Rules are
+              'missing:<header>' for each required header, 'invalid_date' and
+              'invalid_amount', in the order the row-by-row validator reports them.
+    """
+    columns = {str(col).lower(): col for col in df.columns if col}
+    masks = {}
+    for header in required_headers:
+        masks[f"missing:{header}"] = (_missing_mask(df[columns[header]]), columns[header])
+
+    date_col, amount_col = columns['date'], columns['amount']
+    masks['invalid_date'] = (
+        ~masks['missing:date'][0] & invalid_format_mask(df[date_col], '%Y-%m-%d'), date_col
+    )
+    masks['invalid_amount'] = (
+        ~masks['missing:amount'][0] & _invalid_numbers(df[amount_col]), amount_col
+    )
+    return masks
+
+
+def summarize_masks(masks):
+    """
+    Reduces rule masks to counts and row indexes.
+
+    Returns:
+        dict: rule name -> {'count': int, 'rows': numpy array of the flagged index labels}
+    """
+    summary = {}
+    for rule, (mask, _column) in masks.items():
+        rows = mask.index.to_numpy()[mask.to_numpy()]
+        summary[rule] = {'count': len(rows), 'rows': rows}
+    return summary
+
+
+def validate_general_ledger_frame(df):
+    """
+    DataFrame-native equivalent of validate_general_ledger_data.
+
+    Every rule is evaluated as a whole-column boolean mask; error messages are
+    only formatted for flagged cells. For string data (as read from CSV/XLSX)
+    the findings, their wording and their order match the row-by-row validator.
+
+    Args:
+        df (DataFrame): GL rows, one per transaction.
+
+    Returns:
+        dict: {'is_valid': True/False, 'errors': [...], 'summary': {rule: {'count', 'rows'}},
+               'findings': Findings}
+        'errors' is rendered lazily from 'findings', which holds one array entry per
+        flagged cell (no message strings are built unless they are read).
+    """
+    required_headers = ['date', 'account', 'description', 'amount']
+    findings = Findings(GL_ROW_RULES)
+
+    if df is None or df.empty:
+        findings.add_message("General Ledger data is empty.")
+        return {'is_valid': False, 'errors': findings.messages(), 'summary': {}, 'findings': findings}
+
+    data_headers = [str(col).lower() for col in df.columns if col]
+    missing_headers = [header for header in required_headers if header not in data_headers]
+    if missing_headers:
+        findings.add_message(f"Missing required headers: {', '.join(missing_headers)}. Required headers are: {', '.join(required_headers)}")
+        return {'is_valid': False, 'errors': findings.messages(), 'summary': {}, 'findings': findings}
+
+    masks = general_ledger_error_masks(df, required_headers)
+    summary = summarize_masks(masks)
+
+    # Bulk-append every rule's flagged positions; values stay in the frame's columns
+    for rule, (mask, column) in masks.items():
+        if rule.startswith('missing:'):
+            findings.extend_mask('missing_field', mask.to_numpy(), column=rule.split(':', 1)[1])
+        else:
+            findings.extend_mask(rule, mask.to_numpy(), column=column, values=df[column])
+
+    # Sorted by row, then rule, the way the row loop emits them
+    errors = findings.messages(by_row=True)
+    return {'is_valid': not errors, 'errors': errors, 'summary': summary, 'findings': findings}
+
+
+def gl_error_masks(df):
+    """
+    Computes rule masks over the canonical frame returned by read_gl_excel_dynamic,
+    reusing its 'parsed_date' / 'parsed_amount' (or 'amount_minor') columns
+    instead of re-parsing.
+
+    Returns:
+        dict: rule name -> (boolean Series over df.index, column name)
+    """
+    date_missing = _missing_mask(df["Date"])
+    # Only unparsed amounts need their raw text (compact frames keep nothing else)
+    amount_unparsed = gl_amounts(df).isna()
+    amount_missing = amount_unparsed & _missing_mask(df["Amount"])
+    return {
+        "missing_date": (date_missing, "Date"),
+        "missing_amount": (amount_missing, "Amount"),
+        "invalid_date": (~date_missing & df["parsed_date"].isna(), "Date"),
+        "invalid_amount": (amount_unparsed & ~amount_missing, "Amount"),
+    }
+
+
+def _format_rule(description, info):
+    rows = ", ".join(str(r + 1) for r in info["rows"][:MAX_ROWS_IN_MESSAGE])
+    more = ", ..." if info["count"] > MAX_ROWS_IN_MESSAGE else ""
+    return f"{info['count']} row(s) with {description} (rows {rows}{more})."
+
+
+# validate_gl's rules (see gl_error_masks), as described in its messages
+GL_RULE_DESCRIPTIONS = {
+    "missing_date": "missing 'Date'",
+    "missing_amount": "missing 'Amount'",
+    "invalid_date": "an invalid date in 'Date'",
+    "invalid_amount": "a non-numeric value in 'Amount'",
+}
+
+
+def validate_gl(df, parse_info=None):
+    """
+    Validates a GL DataFrame from read_gl_excel_dynamic with whole-column masks,
+    and its 'Balance' column against the running balance of each account
+    (see running_balance_summary).
+
+    Args:
+        df (DataFrame): canonical GL frame with 'parsed_date' / 'parsed_amount' columns.
+        parse_info (dict): parse statistics returned alongside the frame. The masks
+                           recount the same issues per row, so it is not required.
+
+    Returns:
+        (errors, warnings): lists of messages, one per rule that flagged rows,
+                            each with the row count and the first row numbers.
+    """
+    if df is None or df.empty:
+        return ["General Ledger data is empty."], []
+
+    missing_columns = [col for col in GL_REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        return [f"Missing required columns: {', '.join(missing_columns)}."], []
+
+    with stage("validate_gl", rows=len(df)):
+        with stage("row checks", rows=len(df)):
+            errors, warnings = gl_summary_messages(summarize_masks(gl_error_masks(df)), df.columns)
+        with stage("running balances", rows=len(df)):
+            errors.extend(running_balance_messages(running_balance_summary(df)))
+    return errors, warnings
+
+
+def gl_summary_messages(summary, columns):
+    """
+    Formats validate_gl's messages from per-rule counts and row numbers.
+
+    Args:
+        summary (dict): rule -> {'count', 'rows'} (see summarize_masks); only the
+                        first MAX_ROWS_IN_MESSAGE rows are used.
+        columns: columns of the validated frame.
+
+    Returns:
+        (errors, warnings)
+    """
+    errors, warnings = [], []
+    for rule, description in GL_RULE_DESCRIPTIONS.items():
+        info = summary.get(rule)
+        if info and info["count"]:
+            errors.append(_format_rule(description, info))
+
+    if "Memo/Description" not in columns:
+        warnings.append("No 'Memo/Description' column found.")
+
+    return errors, warnings
+
+
+def running_balance_summary(df, tolerance=RUNNING_BALANCE_TOLERANCE, carry=None, row_offset=0):
+    """
+    Checks the 'Balance' column of a canonical GL frame against the running
+    balance implied by 'parsed_amount', per account (rows of an account keep
+    their export order, so interleaved accounts are checked separately).
+
+    Each account's opening balance is taken from its first row with a Balance
+    (Balance minus the amounts up to and including that row); the expected
+    balance of every row is then opening + grouped cumulative sum of the
+    amounts. The difference to 'Balance' is the drift; a break is a row where
+    the drift changes, i.e. the step from the previous balance does not match
+    the row's amount. Rows without a date (subtotals) are skipped. Compact
+    frames are compared exactly in minor units.
+
+    Args:
+        df (DataFrame): canonical GL frame (read_gl_excel_dynamic).
+        tolerance (float): Largest difference still considered equal.
+        carry (DataFrame): summary of the rows preceding `df` in the same export
+                           (e.g. from an earlier incremental run), continued here.
+        row_offset (int): position of df's first row in the export (for row numbers).
+
+    Returns:
+        DataFrame with one row per account: [Account, Rows, Breaks, FirstBreakRow,
+        FirstBreakBalance, FirstBreakExpected, Drift, Opening, Cumulative].
+        FirstBreakRow is 1-based (NaN without a break); Drift is the difference
+        at the account's last row with a Balance. Empty without a 'Balance' column.
+    """
+    columns = ["Account", "Rows", "Breaks", "FirstBreakRow", "FirstBreakBalance", "FirstBreakExpected",
+               "Drift", "Opening", "Cumulative"]
+    if "Balance" not in df.columns:
+        return pd.DataFrame(columns=columns)
+
+    scale = 1
+    if "balance_minor" in df.columns and "amount_minor" in df.columns:
+        scale = 10 ** df.attrs.get("currency_precision", 2)
+        amount = df["amount_minor"].to_numpy(dtype=float, na_value=np.nan) / scale
+        balance = df["balance_minor"].to_numpy(dtype=float, na_value=np.nan) / scale
     else:
-        return {'is_valid': True, 'errors': []}
+        amount = gl_amounts(df).to_numpy(dtype=float)
+        balance = pd.to_numeric(df["Balance"], errors="coerce").to_numpy(dtype=float)
+    # Rows without a date (e.g. 'Total for ...' rows) are not transactions
+    undated = np.zeros(len(df), dtype=bool)
+    if "Date" in df.columns:
+        # Only rows without a parsed date can have an empty 'Date'
+        candidates = np.flatnonzero(df["parsed_date"].isna().to_numpy()) if "parsed_date" in df.columns \
+            else np.arange(len(df))
+        undated[candidates] = _missing_mask(df["Date"].iloc[candidates]).to_numpy()
+    amount[undated] = np.nan
+    balance[undated] = np.nan
+
+    if "Account" in df.columns:
+        codes, labels = pd.factorize(df["Account"], use_na_sentinel=False)
+    else:
+        codes, labels = np.zeros(len(df), dtype=np.intp), pd.Index([""])
+    labels = np.asarray(labels, dtype=object)
+    n_groups = len(labels)
+
+    # Carried state of each account from the preceding rows
+    previous = pd.DataFrame(columns=columns) if carry is None else pd.DataFrame(carry, columns=columns)
+    previous = previous.set_index("Account").reindex(labels)
+    carried_cumulative = previous["Cumulative"].fillna(0.0).to_numpy(dtype=float)
+
+    # 1) Grouped cumulative amounts (one linear pass) and each account's opening balance
+    cumulative = pd.Series(np.nan_to_num(amount)).groupby(codes).cumsum().to_numpy() + carried_cumulative[codes]
+    carried_opening = previous["Opening"].to_numpy(dtype=float)
+    opening = _group_reduce(codes, balance - cumulative, "first", n_groups)  # first row with a Balance
+    opening = np.where(np.isnan(carried_opening), opening, carried_opening)
+    expected = opening[codes] + cumulative
+    drift = balance - expected
+
+    # 2) Breaks: rows with a Balance whose drift differs from the previous row's
+    with_balance = np.flatnonzero(~np.isnan(balance))
+    valid_codes = codes[with_balance]
+    prior = pd.Series(drift[with_balance]).groupby(valid_codes).shift(1).to_numpy()
+    carried_drift = previous["Drift"].fillna(0.0).to_numpy(dtype=float)
+    prior = np.where(np.isnan(prior), carried_drift[valid_codes], prior)
+    steps = np.abs(drift[with_balance] - prior)
+    if scale > 1:
+        steps = np.rint(steps * scale) / scale  # Exact minor units: any difference is a break
+    broken = with_balance[steps > tolerance]
+
+    # 3) Per-account aggregates
+    breaks = np.bincount(codes[broken], minlength=n_groups)
+    first_break = _group_reduce(codes[broken], broken, "first", n_groups)
+    has_break = ~np.isnan(first_break)
+    first_position = first_break[has_break].astype(np.intp)
+    first_row, first_balance, first_expected = (np.full(n_groups, np.nan) for _ in range(3))
+    first_row[has_break] = first_position + row_offset + 1
+    first_balance[has_break] = balance[first_position]
+    first_expected[has_break] = expected[first_position]
+    last_drift = _group_reduce(codes, drift, "last", n_groups)
+    carried_first = np.isnan(previous["FirstBreakRow"].to_numpy(dtype=float))
+
+    summary = pd.DataFrame({
+        "Account": labels,
+        "Rows": np.bincount(codes, minlength=n_groups) + previous["Rows"].fillna(0).to_numpy(dtype=np.int64),
+        "Breaks": breaks + previous["Breaks"].fillna(0).to_numpy(dtype=np.int64),
+        "FirstBreakRow": np.where(carried_first, first_row, previous["FirstBreakRow"].to_numpy(dtype=float)),
+        "FirstBreakBalance": np.where(carried_first, first_balance,
+                                      previous["FirstBreakBalance"].to_numpy(dtype=float)),
+        "FirstBreakExpected": np.where(carried_first, first_expected,
+                                       previous["FirstBreakExpected"].to_numpy(dtype=float)),
+        "Drift": np.where(np.isnan(last_drift), previous["Drift"].to_numpy(dtype=float), last_drift),
+        "Opening": opening,
+        "Cumulative": _group_reduce(codes, cumulative, "last", n_groups),
+    })
+
+    # Accounts of the carried rows that do not appear in df
+    if carry is not None:
+        missing = pd.DataFrame(carry, columns=columns)
+        missing = missing[~missing["Account"].isin(labels)]
+        summary = pd.concat([missing, summary], ignore_index=True) if len(missing) else summary
+    return summary
+
+
+def _group_reduce(codes, values, how, n_groups):
+    """
+    First / last non-NaN value per group code (one hashed pass; NaN for groups without one).
+    """
+    reduced = pd.Series(values, dtype=float).groupby(codes, sort=False).agg(how)
+    return reduced.reindex(range(n_groups)).to_numpy(dtype=float)
+
+
+def running_balance_messages(summary, max_accounts=MAX_ROWS_IN_MESSAGE):
+    """
+    Formats a running_balance_summary: one message for all accounts with
+    breaks, then the first break of each (largest drift first, at most
+    `max_accounts`).
+    """
+    broken = summary[summary["Breaks"] > 0]
+    if broken.empty:
+        return []
+    messages = [
+        f"Running balance breaks in {len(broken)} of {len(summary)} account(s) "
+        f"({int(broken['Breaks'].sum())} break(s), total drift {broken['Drift'].abs().sum():.2f})."
+    ]
+    shown = broken.reindex(broken["Drift"].abs().sort_values(ascending=False, kind="stable").index)
+    for row in shown.head(max_accounts).itertuples(index=False):
+        label = f"'{row.Account}'" if row.Account else "The ledger"
+        messages.append(
+            f"{label}: running balance breaks at row {int(row.FirstBreakRow)} (Balance {row.FirstBreakBalance:.2f}, "
+            f"expected {row.FirstBreakExpected:.2f}); {int(row.Breaks)} break(s), drift {row.Drift:.2f}."
+        )
+    if len(broken) > max_accounts:
+        messages.append(f"... and {len(broken) - max_accounts} more account(s) with breaks.")
+    return messages
 
 
 if __name__ == '__main__':
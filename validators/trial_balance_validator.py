@@ -1,43 +1,217 @@
+from lazy_imports import lazy_import
+from profiling import stage
+from readers.compact import DEFAULT_CURRENCY_PRECISION, to_minor_units
+from validators.findings import Findings
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Row-level findings of validate_trial_balance_debits_equal_credits (see validators.findings)
+TB_ROW_RULES = {
+    "invalid_number": ("Invalid debit or credit value", ": {value}. Must be a number."),
+    "row_error": ("Error processing row", ": {value}"),
+}
+
+# Largest difference (in currency units) between total debits and total credits
+# still considered balanced. Amounts are rounded to the currency precision and
+# summed as integer minor units, so float rounding in large TBs cannot add up to
+# an imbalance and any real difference of one minor unit is caught.
+BALANCE_TOLERANCE = 0
+
+
 def validate_trial_balance_debits_equal_credits(data):
     """
     Validates if total debits equal total credits in a Trial Balance data set.
+    Each amount is rounded to DEFAULT_CURRENCY_PRECISION decimals and the totals
+    are compared in exact minor units.
 
     Args:
-        data (list): A list of dictionaries representing Trial Balance data.
+        data (iterable): A list of dictionaries, or a row iterator such as iter_csv_rows /
+                       iter_xlsx_rows, representing Trial Balance data.
                        Each dictionary should have 'Debit' and 'Credit' keys
                        (case-insensitive). Debit and Credit values should be convertible to numbers.
 
     Returns:
         dict: A dictionary containing validation results:
-              {'is_valid': True/False, 'errors': [list of error messages]}
-              'errors' will be an empty list if validation is successful.
+              {'is_valid': True/False, 'errors': [list of error messages], 'findings': Findings}
+              'errors' will be an empty list if validation is successful. It is
+              rendered lazily from 'findings'.
     """
-    total_debits = 0
+    scale = 10 ** DEFAULT_CURRENCY_PRECISION
+    total_debits = 0  # Minor units
     total_credits = 0
-    errors = []
-
-    if not data:
-        return {'is_valid': False, 'errors': ["Trial Balance data is empty."]}
+    findings = Findings(TB_ROW_RULES)
+    row_count = 0
 
-    for row in data:
+    for index, row in enumerate(data):
+        row_count += 1
         try:
-            debit = float(row.get('debit', 0)) # Get debit, default to 0 if missing, convert to float
-            credit = float(row.get('credit', 0)) # Get credit, default to 0 if missing, convert to float
-            total_debits += debit
-            total_credits += credit
+            values = {str(key).lower(): value for key, value in row.items() if key} # Lowercase keys
+            debit = float(values.get('debit', 0)) # Get debit, default to 0 if missing, convert to float
+            credit = float(values.get('credit', 0)) # Get credit, default to 0 if missing, convert to float
+            total_debits += round(debit * scale)
+            total_credits += round(credit * scale)
         except ValueError:
-            errors.append(f"Invalid debit or credit value in row: {row}. Must be a number.")
+            findings.add('invalid_number', row=index, value=row)
         except Exception as e:
-            errors.append(f"Error processing row: {row}. Error: {e}")
+            findings.add('row_error', row=index, value=f"{row}. Error: {e}")
+
+    if row_count == 0:
+        findings.add_message("Trial Balance data is empty.")
+    # If there were errors during data processing, validation fails without a balance check
+    elif not len(findings) and abs(total_debits - total_credits) > BALANCE_TOLERANCE * scale:
+        findings.add_message(f"Trial Balance is unbalanced. Total Debits: {total_debits / scale:.2f}, "
+                             f"Total Credits: {total_credits / scale:.2f}")
+
+    return {'is_valid': not len(findings), 'errors': findings.messages(), 'findings': findings}
+
+
+def trial_balance_summary(df, period_col="Month", top_n=5, tolerance=BALANCE_TOLERANCE):
+    """
+    Balance engine for single and monthly trial balances.
+
+    Computes per-period debit/credit totals and the imbalance with one grouped
+    aggregation (np.bincount over factorized periods), then ranks, for each
+    unbalanced period only, the accounts whose net amount pushes in the
+    direction of the imbalance.
 
-    if errors: # If there were errors during data processing, validation fails
-        return {'is_valid': False, 'errors': errors}
+    Amounts are summed as int64 minor units and compared exactly: frames read
+    with compact=True carry them in 'debit_minor' / 'credit_minor', other
+    frames have theirs rounded to the currency precision first.
 
-    if abs(total_debits - total_credits) > 1e-6: # Use a small tolerance for floating point comparison
-        errors.append(f"Trial Balance is unbalanced. Total Debits: {total_debits:.2f}, Total Credits: {total_credits:.2f}")
-        return {'is_valid': False, 'errors': errors}
+    Args:
+        df (DataFrame): Long TB frame with 'Account', 'Debit', 'Credit' and, for
+                        monthly TBs, a period column (as from read_monthly_tb_excel_dynamic).
+                        A frame without `period_col` is treated as a single period.
+        period_col (str): Name of the period column.
+        top_n (int): Number of contributing accounts reported per unbalanced period.
+        tolerance (float): Largest absolute difference (currency units) still considered balanced.
+
+    Returns:
+        (totals, contributors, invalid)
+        - totals: DataFrame with one row per period: [Period, Debit, Credit, Imbalance, Balanced].
+                  Period is None for a single TB.
+        - contributors: DataFrame [Period, Account, Net] with up to `top_n` accounts
+                        per unbalanced period, largest contribution first.
+        - invalid: number of non-empty Debit/Credit values that are not numeric.
+    """
+    precision = df.attrs.get("currency_precision", DEFAULT_CURRENCY_PRECISION)
+    scale = 10 ** precision
+    if "debit_minor" in df.columns and "credit_minor" in df.columns:
+        debit = df["debit_minor"].to_numpy(dtype=np.int64)
+        credit = df["credit_minor"].to_numpy(dtype=np.int64)
+        invalid = 0
+    else:
+        debit_raw = pd.to_numeric(df["Debit"], errors="coerce")
+        credit_raw = pd.to_numeric(df["Credit"], errors="coerce")
+        invalid = int(((debit_raw.isna() & df["Debit"].notna()) | (credit_raw.isna() & df["Credit"].notna())).sum())
+        debit = to_minor_units(debit_raw, precision).fillna(0).to_numpy(dtype=np.int64)
+        credit = to_minor_units(credit_raw, precision).fillna(0).to_numpy(dtype=np.int64)
+
+    if period_col in df.columns:
+        codes, periods = pd.factorize(df[period_col])
     else:
-        return {'is_valid': True, 'errors': []} # Validation successful
+        codes, periods = np.zeros(len(df), dtype=np.intp), pd.Index([None], dtype=object)
+
+    # 1) Per-period totals in a single pass
+    n_periods = len(periods)
+    total_debit = _group_sum(codes, debit, n_periods)
+    total_credit = _group_sum(codes, credit, n_periods)
+    imbalance = total_debit - total_credit
+    balanced = np.abs(imbalance) <= tolerance * scale
+
+    totals = pd.DataFrame({
+        "Period": list(periods),
+        "Debit": total_debit / scale,
+        "Credit": total_credit / scale,
+        "Imbalance": imbalance / scale,
+        "Balanced": balanced,
+    })
+
+    # 2) Largest contributors, only for rows of unbalanced periods that push towards the imbalance
+    net = debit - credit
+    signed_net = net * np.sign(imbalance)[codes]
+    candidates = np.flatnonzero(~balanced[codes] & (signed_net > 0))
+    candidate_codes = codes[candidates].astype(np.int32)
+    order = np.argsort(candidate_codes, kind="stable")  # radix-style bucketing by period
+    candidates = candidates[order]
+    bounds = np.searchsorted(candidate_codes[order], np.arange(n_periods + 1))
+
+    picked = []
+    for code in np.flatnonzero(~balanced):
+        rows = candidates[bounds[code]:bounds[code + 1]]
+        if len(rows) > top_n:
+            rows = rows[np.argpartition(-signed_net[rows], top_n - 1)[:top_n]]
+        picked.append(rows[np.argsort(-signed_net[rows], kind="stable")])
+    picked = np.concatenate(picked) if picked else np.array([], dtype=np.intp)
+
+    contributors = pd.DataFrame({
+        "Period": periods.take(codes[picked]) if len(picked) else [],
+        "Account": df["Account"].to_numpy()[picked],
+        "Net": net[picked] / scale,
+    })
+
+    return totals, contributors, invalid
+
+
+def _group_sum(codes, values, n_groups):
+    """Sums `values` per group code; integer values are summed exactly as int64."""
+    if values.dtype.kind == "i":
+        sums = np.zeros(n_groups, dtype=np.int64)
+        np.add.at(sums, codes, values)
+        return sums
+    return np.bincount(codes, weights=values, minlength=n_groups)
+
+
+def validate_trial_balance(df, period_col="Month", top_n=5):
+    """
+    Validates that debits equal credits for a single TB or for every period of a monthly TB.
+
+    A single TB (no `period_col` column) is checked as a one-period case of the
+    same engine; a monthly TB is checked for all periods at once.
+
+    Args:
+        df (DataFrame): Output of read_single_tb_excel_dynamic or read_monthly_tb_excel_dynamic.
+
+    Returns:
+        (errors, warnings): lists of messages.
+    """
+    errors, warnings = [], []
+
+    if df is None or df.empty:
+        return ["Trial Balance data is empty."], warnings
+
+    with stage("validate_trial_balance", rows=len(df)):
+        totals, contributors, invalid = trial_balance_summary(df, period_col=period_col, top_n=top_n)
+
+    if invalid:
+        warnings.append(f"{invalid} non-numeric Debit/Credit value(s) were treated as 0.")
+
+    errors.extend(message for _, message in unbalanced_period_messages(totals, contributors))
+
+    return errors, warnings
+
+
+def unbalanced_period_messages(totals, contributors):
+    """
+    Formats one error per unbalanced period of a trial_balance_summary result.
+
+    Returns:
+        list: (period, message) in the order of `totals`.
+    """
+    by_period = {}
+    for period, account, net in contributors.itertuples(index=False):
+        by_period.setdefault(period, []).append(f"{account} ({net:.2f})")
+
+    messages = []
+    for row in totals[~totals["Balanced"]].itertuples(index=False):
+        label = "" if row.Period is None else f" for {row.Period}"
+        message = (f"Trial Balance is unbalanced{label}. Total Debits: {row.Debit:.2f}, "
+                   f"Total Credits: {row.Credit:.2f}, Difference: {row.Imbalance:.2f}")
+        if row.Period in by_period:
+            message += f". Largest contributing accounts: {', '.join(by_period[row.Period])}"
+        messages.append((row.Period, message))
+    return messages
 
 
 if __name__ == '__main__':
@@ -1,32 +1,117 @@
-from flask import Flask, request, jsonify, render_template # Import render_template
-from readers import csv_reader, xlsx_reader
-from services import document_identifier
+from flask import Flask, Request, request, jsonify, url_for
+from readers.file_type import sniff_file_type
+from services.jobs import JobQueue
+from services.validation import validate_upload
+from tempfile import SpooledTemporaryFile
+import io
 import os
 
-app = Flask(__name__)
-
-UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'csv', 'xlsx'}
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# Uploads up to this size are parsed in memory; larger ones spill to a temporary file
+MAX_IN_MEMORY_UPLOAD = int(os.environ.get('MAX_IN_MEMORY_UPLOAD_MB', 32)) * 1024 * 1024
+VALIDATION_WORKERS = int(os.environ.get('VALIDATION_WORKERS', 4))
+
+
+class SpooledUploadRequest(Request):
+    """
+    Receives uploaded files directly into size-bounded buffers, which the
+    readers then parse in place (no separate save and re-open).
+    """
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return SpooledTemporaryFile(max_size=app.config['MAX_IN_MEMORY_UPLOAD'], mode='w+b')
+
+
+app = Flask(__name__, static_folder='static')
+app.request_class = SpooledUploadRequest
+app.config['MAX_IN_MEMORY_UPLOAD'] = MAX_IN_MEMORY_UPLOAD
+
+# Identification, reading and validation run here, off the request threads
+jobs = JobQueue(max_workers=VALIDATION_WORKERS)
 
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def detach_upload(file_storage):
+    """
+    Takes the upload's buffer out of the request, which would otherwise
+    close it when the request ends (before the background job has read it).
+    """
+    buffer = file_storage.stream
+    file_storage.stream = io.BytesIO()
+    return buffer
+
+def process_upload(buffer, filename, profile=False):
+    """
+    Background job: validates an upload buffer, then releases it.
+    """
+    try:
+        return validate_upload(buffer, filename, profile=profile)
+    finally:
+        buffer.close()
+
 @app.route('/') # Add a route for the root URL '/'
 def index():
     """
     Serves the index.html page for file upload UI.
     """
-    return render_template('index.html') # Flask will look for index.html in the 'templates' folder by default
+    return app.send_static_file('index.html')
 
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
-    # ... (rest of your upload_file() function code remains exactly the same as before) ...
-    # ... (no changes needed in upload_file() for this step) ...
+    """
+    Queues the uploaded file for validation, straight from its upload buffer.
+
+    Returns 202 with the job ID right away; poll /jobs/<id> for progress
+    and /jobs/<id>/result for the findings. With ?profile=1 the result also
+    has a 'profile' field with the time spent in each stage.
+    """
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file part in the request'}), 400
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+    if not allowed_file(file.filename):
+        return jsonify({'error': 'Unsupported file type. Allowed: ' + ', '.join(sorted(ALLOWED_EXTENSIONS))}), 400
+
+    # The name can lie; check the content's magic bytes too
+    if sniff_file_type(file.stream) not in ALLOWED_EXTENSIONS:
+        return jsonify({'error': 'File content is not a CSV or XLSX file'}), 400
+
+    profile = request.args.get('profile', '').lower() in ('1', 'true', 'yes')
+    job_id = jobs.submit(process_upload, detach_upload(file), file.filename, profile)
+    return jsonify({
+        'job_id': job_id,
+        'status_url': url_for('job_status', job_id=job_id),
+        'result_url': url_for('job_result', job_id=job_id)
+    }), 202
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    status = jobs.status(job_id)
+    if status is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(status)
+
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """
+    Returns the job's findings once it is done (200), its status while it is
+    still queued or running (202), or its error if it failed (500).
+    """
+    job = jobs.result(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    if job['status'] == 'done':
+        return jsonify(dict(job['result'], job_id=job_id, status='done'))
+    if job['status'] == 'failed':
+        return jsonify({'job_id': job_id, 'status': 'failed', 'error': job['error']}), 500
+    return jsonify({'job_id': job_id, 'status': job['status']}), 202
 
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    # Threaded so status polls are answered while uploads are being received
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', threaded=True)